@@ -28,21 +28,35 @@ import signal
 import os
 import sys
 import socket # for inet_aton
+import threading
+import bisect
+import itertools
+import collections
+import struct
+import mmap
+
+from mibtree import MIBTree
+import mibobjects
 
 # export names
 __all__ = [
 	'AgentX',
+	'AgentXBase',
+	'AgentXData',
 ]
 
 # snmp agentx library
+# (required by the AgentX class only; the data classes are also used
+# by the pure python transport in aio_agentx)
 snmp	= None
 axl	= None
 try:
-	snmp	= ctypes.cdll.LoadLibrary(ctypes.util.find_library('netsnmphelpers'))
-	axl	= ctypes.cdll.LoadLibrary(ctypes.util.find_library('netsnmpagent'))
+	if ctypes.util.find_library('netsnmpagent'):
+		snmp	= ctypes.cdll.LoadLibrary(ctypes.util.find_library('netsnmphelpers'))
+		axl	= ctypes.cdll.LoadLibrary(ctypes.util.find_library('netsnmpagent'))
 except:
-	print('ERROR: agentx module requires net-snmp libraries.')
-	sys.exit(1)
+	snmp	= None
+	axl	= None
 
 # constants
 NETSNMP_DS_APPLICATION_ID	= 1
@@ -77,6 +91,8 @@ ASN_TIMETICKS			= ASN_APPLICATION | 0x3
 ASN_APP_FLOAT			= ASN_APPLICATION | 0x8
 ASN_APP_DOUBLE			= ASN_APPLICATION | 0x9
 
+ASN_PRIV_RETRY			= ASN_PRIVATE | 0x7
+
 
 # python lacks some primitive types to represent
 # some snmp types. define some wrapper types:
@@ -221,11 +237,12 @@ netsnmp_request_info._fields_ = [
 
 
 # various functions argument types
-axl.read_objid.argtypes = [ctypes.c_char_p, ctypes.POINTER(oidOID_t), ctypes.POINTER(ctypes.c_size_t)]
-axl.snmp_set_var_typed_value.argtypes = [ctypes.POINTER(netsnmp_variable_list), ctypes.c_ubyte, ctypes.POINTER(ctypes.c_ubyte), ctypes.c_int]
-axl.snprint_objid.argtypes = [strOID_t, ctypes.c_int, ctypes.POINTER(oid_t), ctypes.c_int]
-axl.snmp_varlist_add_variable.argtypes = [ctypes.POINTER(netsnmp_variable_list_p), ctypes.POINTER(oid_t), ctypes.c_long, ctypes.c_ubyte, ctypes.c_char_p, ctypes.c_long]
-axl.send_v2trap.argtypes = [netsnmp_variable_list_p]
+if axl:
+	axl.read_objid.argtypes = [ctypes.c_char_p, ctypes.POINTER(oidOID_t), ctypes.POINTER(ctypes.c_size_t)]
+	axl.snmp_set_var_typed_value.argtypes = [ctypes.POINTER(netsnmp_variable_list), ctypes.c_ubyte, ctypes.POINTER(ctypes.c_ubyte), ctypes.c_int]
+	axl.snprint_objid.argtypes = [strOID_t, ctypes.c_int, ctypes.POINTER(oid_t), ctypes.c_int]
+	axl.snmp_varlist_add_variable.argtypes = [ctypes.POINTER(netsnmp_variable_list_p), ctypes.POINTER(oid_t), ctypes.c_long, ctypes.c_ubyte, ctypes.c_char_p, ctypes.c_long]
+	axl.send_v2trap.argtypes = [netsnmp_variable_list_p]
 
 # convert text oid to oid list
 def ReadOID(TextOID):
@@ -237,6 +254,26 @@ def ReadOID(TextOID):
 	oid = newOID_t(*oidOID[0:oidOID_len.value])
 	return oid
 
+# convert text oid to numeric oid (tuple of ints)
+# names are resolved through the MIB only once, instance suffixes
+# (e.g. bgpPeerState.10.0.0.1) are appended to the resolved name
+_OIDCache = {}
+def ReadOIDTuple(TextOID):
+	oid = _OIDCache.get(TextOID)
+	if oid is not None:
+		return oid
+	name, suffix = TextOID, ''
+	start = TextOID.find('::') + 2 if '::' in TextOID else 0
+	dot = TextOID.find('.', start)
+	if dot > start and TextOID[start].isalpha():
+		name, suffix = TextOID[:dot], TextOID[dot + 1:]
+	if suffix and suffix.replace('.', '').isdigit():
+		oid = ReadOIDTuple(name) + tuple(int(i) for i in suffix.split('.'))
+	else:
+		oid = tuple(ReadOID(TextOID))
+	_OIDCache[TextOID] = oid
+	return oid
+
 # convert to text oid
 def ReadTOID(oid):
 	strOID = strOID_t()
@@ -249,26 +286,468 @@ def ReadTOID(oid):
 class OperationalError(Exception): pass
 
 
+# sort the parallel lists keys and values by key; of equal keys
+# the one registered last is kept
+def _SortParallel(keys, values):
+	order = sorted(range(len(keys)), key=keys.__getitem__)
+	skeys, svalues = [], []
+	for i in order:
+		if skeys and skeys[-1] == keys[i]:
+			svalues[-1] = values[i]
+		else:
+			skeys.append(keys[i])
+			svalues.append(values[i])
+	return skeys, svalues
+
+# agentx table
+# a conceptual table stored row by row: the sorted row indexes and, in
+# parallel, one record per row. the oid of a cell (entry.column.index)
+# is only built when it is returned, the values of a row are stored
+# once, not once per column oid. records are tuples of column values,
+# or any object the values are read from on request by value(record,
+# key), keys being the columns as given to RegisterTable.
+class AgentXTable(object):
+	__slots__ = ['entry', 'columns', 'keys', 'value', 'prefixes', 'indexes', 'rows']
+
+	# saved to snapshot files (see AgentXData.Save)
+	Snapshot = True
+
+	def __init__(self, entry, columns, keys=None, value=None):
+		# entry oid, column subids in ascending order
+		self.entry	= entry
+		self.columns	= tuple(columns)
+		self.keys	= tuple(keys or columns)
+		self.value	= value
+		self.prefixes	= [entry + (column,) for column in self.columns]
+		self.indexes	= []
+		self.rows	= []
+
+	# numeric index of a tuple, int or dotted text ("10.0.0.1")
+	@staticmethod
+	def IndexOID(index):
+		if type(index) is tuple:
+			return index
+		if isinstance(index, int):
+			return (index,)
+		return tuple(int(i) for i in index.split('.'))
+
+	# set the rows, an iterable of (index, column values)
+	def Fill(self, rows):
+		indexes, values = [], []
+		for index, row in rows:
+			if len(row) != len(self.columns):
+				raise OperationalError('Row %s has %d values for %d columns.' % (index, len(row), len(self.columns)))
+			indexes.append(self.IndexOID(index))
+			values.append(tuple(row))
+		self.indexes, self.rows = _SortParallel(indexes, values)
+
+	# set the rows from records, index(record) being the row index
+	def FillRecords(self, records, index):
+		records = list(records)
+		indexes = [self.IndexOID(index(record)) for record in records]
+		self.indexes, self.rows = _SortParallel(indexes, records)
+
+	# replace the rows of records (new indexes are inserted) and drop the
+	# rows of the indexes in removed; the other rows are kept as they are
+	def UpdateRecords(self, records, index, removed=()):
+		for oid in removed:
+			oid = self.IndexOID(oid)
+			row = bisect.bisect_left(self.indexes, oid)
+			if row < len(self.indexes) and self.indexes[row] == oid:
+				del self.indexes[row]
+				del self.rows[row]
+		for record in records:
+			oid = self.IndexOID(index(record))
+			row = bisect.bisect_left(self.indexes, oid)
+			if row < len(self.indexes) and self.indexes[row] == oid:
+				self.rows[row] = record
+			else:
+				self.indexes.insert(row, oid)
+				self.rows.insert(row, record)
+
+	def Copy(self):
+		table = AgentXTable(self.entry, self.columns, self.keys, self.value)
+		table.indexes = list(self.indexes)
+		table.rows = list(self.rows)
+		return table
+
+	def __len__(self):
+		return len(self.columns) * len(self.indexes)
+
+	# (column position, row position) of a cell oid, or None
+	def Find(self, oid):
+		length = len(self.entry)
+		if len(oid) <= length + 1:
+			return None
+		column = bisect.bisect_left(self.columns, oid[length])
+		row = bisect.bisect_left(self.indexes, oid[length + 1:])
+		if column < len(self.columns) and self.columns[column] == oid[length] and \
+				row < len(self.indexes) and self.indexes[row] == oid[length + 1:]:
+			return column, row
+		return None
+
+	# value of the cell at column, row position
+	def Cell(self, column, row):
+		if self.value is None:
+			return self.rows[row][column]
+		return self.value(self.rows[row], self.keys[column])
+
+	# value of a cell
+	def Get(self, oid):
+		cell = self.Find(oid)
+		if cell is None:
+			raise KeyError(oid)
+		return self.Cell(*cell)
+
+	# set the value of a cell; records are turned into value tuples first
+	def Update(self, oid, value):
+		column, row = self.Find(oid)
+		if self.value is not None:
+			self.rows = [tuple(self.Cell(c, r) for c in range(len(self.columns))) for r in range(len(self.rows))]
+			self.value = None
+		values = list(self.rows[row])
+		values[column] = value
+		self.rows[row] = tuple(values)
+
+	# (oid, value) of the cells following oid, in MIB (column-major) order
+	def Items(self, oid=None):
+		column, row = 0, 0
+		length = len(self.entry)
+		if oid is not None and oid[:length] == self.entry and len(oid) > length:
+			column = bisect.bisect_left(self.columns, oid[length])
+			if column < len(self.columns) and self.columns[column] == oid[length]:
+				row = bisect.bisect_right(self.indexes, oid[length + 1:])
+		elif oid is not None and oid > self.entry:
+			return
+		indexes, rows, value = self.indexes, self.rows, self.value
+		for column in range(column, len(self.columns)):
+			prefix = self.prefixes[column]
+			if value is None:
+				for row in range(row, len(indexes)):
+					yield prefix + indexes[row], rows[row][column]
+			else:
+				key = self.keys[column]
+				for row in range(row, len(indexes)):
+					yield prefix + indexes[row], value(rows[row], key)
+			row = 0
+
+# agentx view table
+# a read-only table served from an external store sorted by row index,
+# e.g. a large table kept in compact arrays. the store provides len(),
+# columns (subids in ascending order), find(index) -> row or None,
+# successor(index) -> first row after index, index(row) -> index tuple
+# and value(row, column). the store is shared by the data generations
+# (it is replaced, not modified) and not saved to snapshot files.
+class AgentXViewTable(AgentXTable):
+	__slots__ = ['store']
+
+	Snapshot = False
+
+	def __init__(self, entry, store):
+		AgentXTable.__init__(self, entry, store.columns)
+		self.store = store
+
+	def Copy(self):
+		return self
+
+	def __len__(self):
+		return len(self.columns) * len(self.store)
+
+	def Find(self, oid):
+		length = len(self.entry)
+		if len(oid) <= length + 1 or oid[:length] != self.entry or oid[length] not in self.columns:
+			return None
+		row = self.store.find(oid[length + 1:])
+		if row is None:
+			return None
+		return oid[length], row
+
+	def Cell(self, column, row):
+		return self.store.value(row, column)
+
+	def Update(self, oid, value):
+		raise OperationalError('Table %(entry)s is read-only.' % { 'entry' : '.'.join(map(str, self.entry)) })
+
+	def Items(self, oid=None):
+		first, row = 0, 0
+		length = len(self.entry)
+		if oid is not None and oid[:length] == self.entry and len(oid) > length:
+			first = bisect.bisect_left(self.columns, oid[length])
+			if first < len(self.columns) and self.columns[first] == oid[length]:
+				row = self.store.successor(oid[length + 1:])
+		elif oid is not None and oid > self.entry:
+			return
+		store = self.store
+		for column in self.columns[first:]:
+			prefix = self.entry + (column,)
+			for row in range(row, len(store)):
+				yield prefix + store.index(row), store.value(row, column)
+			row = 0
+
 # agentx data object
-class AgentXData(dict):
+# one complete data set (snapshot); it is built by OnUpdate, then frozen
+# and published as a whole. published snapshots are never modified,
+# changes are done on a copy which is published in turn.
+# objects are kept in parallel lists sorted by oid: OIDs holds the
+# numeric oids of scalars and the entry oids of tables, Values the
+# scalar values and AgentXTable objects. a table owns the subtree of
+# its entry.
+class AgentXData(object):
 	def __init__(self):
-		dict.__init__(self)
 		self.ResponseLast	= None
 		self.container		= None
+		self.generation		= 0
+		self.frozen		= False
+		# text oid -> numeric oid, net-snmp's MIB lookup by default
+		self.resolver		= None
+		# registered oids in lexicographic (MIB) order and their values
+		self.OIDs		= []
+		self.Values		= []
+		self.unsorted		= False
+		# collection time; stale data was loaded from a snapshot file
+		self.timestamp		= 0
+		self.stale		= False
+		# built by a partial refresh (see AgentXRefresher)
+		self.partial		= False
+
+	# refuse modification of published data
+	def CheckWritable(self):
+		if self.frozen:
+			raise OperationalError('Data generation %(gen)d is published and read-only.' % { 'gen' : self.generation })
+
+	# make data read-only
+	def Freeze(self):
+		self.Sort()
+		self.frozen = True
+
+	# restore oid order after out-of-order registrations
+	def Sort(self):
+		if self.unsorted:
+			self.OIDs, self.Values = _SortParallel(self.OIDs, self.Values)
+			self.unsorted = False
+
+	# writable copy of this data set
+	def Copy(self):
+		self.Sort()
+		axd = AgentXData()
+		axd.container = self.container
+		axd.resolver = self.resolver
+		axd.ResponseLast = self.ResponseLast
+		axd.OIDs = list(self.OIDs)
+		axd.Values = [value.Copy() if isinstance(value, AgentXTable) else value for value in self.Values]
+		axd.timestamp = self.timestamp
+		axd.stale = self.stale
+		return axd
 
 	# clear data
 	def Clear(self):
-		self.clear()
+		self.CheckWritable()
 		self.ResponseLast = None
+		self.OIDs = []
+		self.Values = []
+		self.unsorted = False
+
+	# number of objects (scalars and table cells)
+	def __len__(self):
+		return sum([len(value) if isinstance(value, AgentXTable) else 1 for value in self.Values])
+
+	def __contains__(self, oid):
+		return self.Find(self.Resolve(oid)) is not None
+
+	def __iter__(self):
+		for oid, value in self.Items():
+			yield oid
+
+	# (position, table or None) of a registered numeric oid, or None
+	def Find(self, oid):
+		self.Sort()
+		pos = bisect.bisect_right(self.OIDs, oid) - 1
+		if pos < 0:
+			return None
+		value = self.Values[pos]
+		if isinstance(value, AgentXTable):
+			if value.Find(oid) is not None:
+				return pos, value
+		elif self.OIDs[pos] == oid:
+			return pos, None
+		return None
+
+	# value of a registered oid
+	def Get(self, oid):
+		oid = self.Resolve(oid)
+		found = self.Find(oid)
+		if found is None:
+			raise KeyError(oid)
+		pos, table = found
+		if table is not None:
+			return table.Get(oid)
+		return self.Values[pos]
+
+	# (oid, value) of the objects following oid (all if None), in MIB order
+	def Items(self, oid=None):
+		self.Sort()
+		pos = 0
+		if oid is not None:
+			oid = self.Resolve(oid)
+			pos = bisect.bisect_right(self.OIDs, oid)
+			# oid may be inside the subtree of the preceding table
+			if pos and isinstance(self.Values[pos - 1], AgentXTable):
+				pos -= 1
+		for pos in range(pos, len(self.OIDs)):
+			value = self.Values[pos]
+			if isinstance(value, AgentXTable):
+				for item in value.Items(oid):
+					yield item
+			else:
+				yield self.OIDs[pos], value
+
+	# snapshot file: header, then one record per oid in MIB order:
+	# subid count, subids, value type tag, value
+	SnapshotHeader	= struct.Struct('<4sHHId')
+	SnapshotMagic	= b'AXDS'
+	SnapshotVersion	= 1
+	SnapshotTypes	= [type(None), int, SnmpCounter32, SnmpGauge32, SnmpIpAddress, str, tuple, float]
+
+	# write the data set to filename (atomically replaced)
+	def Save(self, filename):
+		self.Sort()
+		items = []
+		for pos, value in enumerate(self.Values):
+			if not isinstance(value, AgentXTable):
+				items.append((self.OIDs[pos], value))
+			elif value.Snapshot:
+				items.extend(value.Items())
+		parts = [self.SnapshotHeader.pack(self.SnapshotMagic, self.SnapshotVersion, 0, len(items), self.timestamp)]
+		for oid, value in items:
+			vtype = type(value)
+			if vtype not in self.SnapshotTypes:
+				# other values are saved as their text (octet string)
+				if not isinstance(value, bytes):
+					value = value.encode('utf-8') if hasattr(value, 'encode') else str(value)
+				vtype = str
+			tag = self.SnapshotTypes.index(vtype)
+			parts.append(struct.pack('<B%dIB' % len(oid), len(oid), *(oid + (tag,))))
+			if vtype in (int, float):
+				parts.append(struct.pack('<q' if vtype == int else '<d', value))
+			elif vtype in (SnmpCounter32, SnmpGauge32):
+				parts.append(struct.pack('<I', value & 0xffffffff))
+			elif vtype == SnmpIpAddress:
+				parts.append(socket.inet_aton(value))
+			elif vtype == str:
+				data = value if isinstance(value, bytes) else value.encode('utf-8')
+				parts.append(struct.pack('<I', len(data)) + data)
+			elif vtype == tuple:
+				parts.append(struct.pack('<B%dI' % len(value), len(value), *value))
+		tmpname = '%s.%d' % (filename, os.getpid())
+		with open(tmpname, 'wb') as snapshot:
+			snapshot.write(b''.join(parts))
+		os.rename(tmpname, filename)
+
+	# data set saved by Save, or None if filename is missing or invalid
+	@staticmethod
+	def Load(filename):
+		try:
+			with open(filename, 'rb') as snapshot:
+				data = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+		except (IOError, OSError, ValueError):
+			return None
+		axd = AgentXData()
+		try:
+			magic, version, reserved, count, axd.timestamp = AgentXData.SnapshotHeader.unpack_from(data, 0)
+			if magic != AgentXData.SnapshotMagic or version != AgentXData.SnapshotVersion:
+				return None
+			pos = AgentXData.SnapshotHeader.size
+			for i in range(count):
+				length = ord(data[pos:pos + 1])
+				oid = struct.unpack_from('<%dI' % length, data, pos + 1)
+				pos += 1 + 4 * length
+				vtype = AgentXData.SnapshotTypes[ord(data[pos:pos + 1])]
+				pos += 1
+				if vtype in (int, float):
+					value, = struct.unpack_from('<q' if vtype == int else '<d', data, pos)
+					pos += 8
+				elif vtype in (SnmpCounter32, SnmpGauge32):
+					value = vtype(struct.unpack_from('<I', data, pos)[0])
+					pos += 4
+				elif vtype == SnmpIpAddress:
+					value = SnmpIpAddress(socket.inet_ntoa(data[pos:pos + 4]))
+					pos += 4
+				elif vtype == str:
+					length, = struct.unpack_from('<I', data, pos)
+					value = data[pos + 4:pos + 4 + length]
+					if not isinstance(value, str):
+						value = value.decode('utf-8')
+					pos += 4 + length
+				elif vtype == tuple:
+					length = ord(data[pos:pos + 1])
+					value = struct.unpack_from('<%dI' % length, data, pos + 1)
+					pos += 1 + 4 * length
+				else:
+					value = None
+				axd.OIDs.append(oid)
+				axd.Values.append(value)
+		except (struct.error, IndexError, TypeError, UnicodeDecodeError):
+			return None
+		finally:
+			data.close()
+		axd.stale = True
+		return axd
 
 	# register variable
 	def RegisterVar(self, oid, value=None):
+		self.CheckWritable()
 		# normalize
-		oid = self.NormOID(oid)
-		if self:
-			self[self.ResponseLast]['noid'] = oid
+		oid = self.Resolve(oid)
+		if self.OIDs and oid <= self.OIDs[-1]:
+			self.unsorted = True
+		self.OIDs.append(oid)
+		self.Values.append(value)
 		self.ResponseLast = oid
-		self[oid] = { 'value' : value, 'noid' : None }
+
+	# register a table: entry object and its column objects (in any order)
+	# and the rows, either an iterable of (index, column values) in column
+	# order or, with an index extractor, of records: index(record) is the
+	# row index and value(record, column) a cell value, read on request
+	# (record[column] by default); indexes are numeric tuples, ints or
+	# dotted text ("10.0.0.1.0")
+	def RegisterTable(self, entry, columns, rows, index=None, value=None):
+		self.CheckWritable()
+		entry = self.Resolve(entry)
+		columns = list(columns)
+		subids = []
+		for column in columns:
+			column = (column,) if isinstance(column, int) else self.Resolve(column)
+			if column[:-1] not in ((), entry):
+				raise OperationalError('%(column)s is not a column of %(entry)s' % {
+					'column' : '.'.join(map(str, column)), 'entry' : '.'.join(map(str, entry)) })
+			subids.append(column[-1])
+		order = sorted(range(len(subids)), key=subids.__getitem__)
+		if index is None:
+			table = AgentXTable(entry, [subids[i] for i in order])
+			table.Fill((row, [values[i] for i in order]) for row, values in rows)
+		else:
+			table = AgentXTable(entry, [subids[i] for i in order], [columns[i] for i in order],
+				value or (lambda record, column: record[column]))
+			table.FillRecords(rows, index)
+		self.RegisterVar(entry, table)
+		return table
+
+	# update a table registered with records (see RegisterTable) in place:
+	# records replace the rows of their index, the rows of the indexes in
+	# removed are dropped; returns the table, None if entry has no such
+	# table (it is to be registered then)
+	def UpdateTable(self, entry, records, index, removed=()):
+		self.CheckWritable()
+		self.Sort()
+		entry = self.Resolve(entry)
+		pos = bisect.bisect_left(self.OIDs, entry)
+		if pos == len(self.OIDs) or self.OIDs[pos] != entry:
+			return None
+		table = self.Values[pos]
+		if type(table) is not AgentXTable or table.value is None:
+			return None
+		table.UpdateRecords(records, index, removed)
+		return table
 
 	# prepare snmp table data
 	def Table(self, entry, columns):
@@ -280,14 +759,33 @@ class AgentXData(dict):
 				i += 1
 
 	# get next object id
+	# the lexicographic successor, oid itself need not be registered
+	# (column prefixes, partial indexes, oids between two rows)
 	def GetNext(self, oid):
-		return self[oid]['noid']
+		for noid, value in self.Items(oid):
+			return noid
+		return None
+
+	# get up to count following object ids
+	def GetNextSlice(self, oid, count):
+		return [noid for noid, value in self.GetNextItems(oid, count)]
+
+	# get up to count following (oid, value) pairs
+	def GetNextItems(self, oid, count):
+		return list(itertools.islice(self.Items(oid), max(count, 0)))
 
 	# set value
 	def Update(self, oid, value):
-		if oid not in self:
-			raise OperationalError('No such object registered: %(oid)s' % { 'oid' : oid })
-		self[oid]["value"] = value
+		self.CheckWritable()
+		oid = self.Resolve(oid)
+		found = self.Find(oid)
+		if found is None:
+			raise OperationalError('No such object registered: %(oid)s' % { 'oid' : '.'.join(map(str, oid)) })
+		pos, table = found
+		if table is not None:
+			table.Update(oid, value)
+		else:
+			self.Values[pos] = value
 
 	# normalize text id
 	def NormOID(self, tid):
@@ -297,21 +795,29 @@ class AgentXData(dict):
 			tid = '%(mib)s::%(oid)s' % { 'mib': self.container, 'oid': tid }
 		return tid
 
+	# numeric oid (data key) of a text or numeric oid
+	def Resolve(self, oid):
+		if type(oid) is tuple:
+			return oid
+		return (self.resolver or ReadOIDTuple)(self.NormOID(oid))
+
 # forward declaration
 AXObject = None
 
 # snmp agentx request object
 class RequestObject(object):
-	__slots__ = ['oid', 'mode', 'value', 'data', '__ax', '__request', '__reqinfo']
+	__slots__ = ['oid', 'mode', 'value', 'data', '__ax', '__axd', '__request', '__reqinfo']
 	# class constructor
-	def __init__(self, ax, request, reqinfo):
+	def __init__(self, ax, request, reqinfo, axd=None):
 		self.__ax	= ax
+		self.__axd	= axd or ax.AXData
 		self.__request	= request
 		self.__reqinfo	= reqinfo
 
 	# set next object id
 	def SetNext(self, objid):
-		oidOID = ReadOID(objid)
+		objid = self.__axd.Resolve(objid)
+		oidOID = (oid_t * len(objid))(*objid)
 		axl.snmp_set_var_objid(self.__request.requestvb, oidOID,  len(oidOID))
 		self.oid = objid
 
@@ -319,14 +825,16 @@ class RequestObject(object):
 	def GetNext(self, oid=None):
 		if not oid:
 			oid = self.oid
-		return self.__ax.AXData.GetNext(oid)
+		return self.__axd.GetNext(oid)
 
 	# set value
 	def SetValue(self, value):
 		# set object type
 		otype = None
 		size = 8
-		if type(value) == str:
+		if type(value) in (str, bytes):
+			if not isinstance(value, bytes):
+				value = value.encode('utf-8')
 			otype = ASN_OCTET_STR
 			size = len(value)
 			value = ctypes.c_char_p(value)
@@ -364,49 +872,68 @@ HandlerWrapperFunc = ctypes.CFUNCTYPE(
 # high level handler
 def _handler_wrapper(handler, reginfo, reqinfo, requests):
 	r = requests.contents
-	# get current time
-	timestamp = time.time()
-	if AXObject.CacheInterval and timestamp - AXObject.UpdateTime > AXObject.CacheInterval:
-		# need to update data now
-		AXObject.AXData.Clear()
-		AXObject.GlobalsRun('OnUpdate')
-		AXObject.UpdateTime = timestamp
+	# data is refreshed by the background refresher only, requests
+	# are always answered from the last complete data set. the snapshot
+	# is pinned here so all varbinds of this request see one generation.
+	axd = AXObject.AXData
 	# handler loop
 	while True:
-		# get object id
-		strOID = strOID_t()
-		axl.snprint_objid(strOID, OID_LEN, r.requestvb.contents.name, r.requestvb.contents.name_length)
+		# get numeric object id, no MIB lookup on the request path
+		vb = r.requestvb.contents
 
 		# do some magic here
-		req = RequestObject(AXObject, r, reqinfo)
-		req.oid = strOID.value
-		# python 3.x stores oid in bytes object
-		if type(req.oid) != str:
-			req.oid = req.oid.decode()
+		req = RequestObject(AXObject, r, reqinfo, axd)
+		req.oid = tuple(vb.name[:vb.name_length])
 		req.mode = reqinfo.contents.mode
 
 		if req.mode == SNMP_MSG_GET:
-			if req.oid in AXObject.AXData:
-				req.SetValue(AXObject.AXData[req.oid]['value'])
+			if req.oid in axd:
+				req.SetValue(axd.Get(req.oid))
 				# run read-write and read-only handlers
 				for handler in AXObject.RequestHandlers[PAX_RW] + AXObject.RequestHandlers[PAX_RO]:
-					value = handler(req, AXObject, AXObject.AXData)
+					value = handler(req, AXObject, axd)
 					if value:
 						req.SetValue(value)
 		elif req.mode == SNMP_MSG_GETNEXT:
-			if req.oid in AXObject.AXData:
-				if AXObject.AXData[req.oid]['noid'] is None:
-					# only set current objid
-					req.SetNext(req.oid)
-				else:
-					# req.SetNext changes req.oid value
-					req.SetNext(AXObject.AXData[req.oid]['noid'])
-					req.SetValue(AXObject.AXData[req.oid]['value'])
-					# run read-write and read-only handlers
-					for handler in AXObject.RequestHandlers[PAX_RW] + AXObject.RequestHandlers[PAX_RO]:
-						value = handler(req, AXObject, AXObject.AXData)
-						if value:
-							req.SetValue(value)
+			items = axd.GetNextItems(req.oid, 1)
+			if not items:
+				# only set current objid
+				req.SetNext(req.oid)
+			else:
+				# req.SetNext changes req.oid value
+				noid, value = items[0]
+				req.SetNext(noid)
+				req.SetValue(value)
+				# run read-write and read-only handlers
+				for handler in AXObject.RequestHandlers[PAX_RW] + AXObject.RequestHandlers[PAX_RO]:
+					value = handler(req, AXObject, axd)
+					if value:
+						req.SetValue(value)
+		elif req.mode == SNMP_MSG_GETBULK:
+			# all repetitions of this varbind are answered from one slice
+			# of the oid list; the repetitions are chained by next_variable
+			# (see netsnmp_bulk_to_next_fix_requests). a slice shorter than
+			# repeat + 1 (our data ends) leaves the varbind after its last
+			# item as ASN_PRIV_RETRY with that oid and the repetitions left
+			# in r.repeat: the agent continues it on the following subtree,
+			# or answers endOfMibView. an empty slice leaves the varbind
+			# unanswered, the agent moves it on like a GETNEXT past our data
+			for noid, value in axd.GetNextItems(req.oid, r.repeat + 1):
+				req.SetNext(noid)
+				req.SetValue(value)
+				for handler in AXObject.RequestHandlers[PAX_RW] + AXObject.RequestHandlers[PAX_RO]:
+					value = handler(req, AXObject, axd)
+					if value:
+						req.SetValue(value)
+				vb = r.requestvb.contents
+				if r.repeat <= 0 or not vb.next_variable:
+					break
+				# prepare next repetition; if our data ends here the
+				# agent retries it on the following subtree
+				r.repeat -= 1
+				axl.snmp_set_var_objid(vb.next_variable, vb.name, vb.name_length)
+				vb.next_variable.contents.type = ASN_PRIV_RETRY
+				r.requestvb = vb.next_variable
 		elif req.mode == SNMP_MSG_INTERNAL_SET_COMMIT:
 			# FIXME: MAX-ACCESS is now ignored :(
 			if r.requestvb.contents.type in (ASN_INTEGER, ASN_UNSIGNED):
@@ -424,30 +951,175 @@ def _handler_wrapper(handler, reginfo, reqinfo, requests):
 				AXObject.Shutdown()
 			# run read-write and write-only handlers
 			for handler in AXObject.RequestHandlers[PAX_RW] + AXObject.RequestHandlers[PAX_WO]:
-				value = handler(req, AXObject, AXObject.AXData)
+				value = handler(req, AXObject, axd)
 				if value:
 					req.value = value
-			# save value
-			try:
-				AXObject.AXData.Update(req.oid, req.value)
-			except OperationalError:
-				AXObject.AXData.RegisterVar(req.oid, req.value)
+			# save value in a copy of the current data and publish it
+			if axd is AXObject.AXData:
+				axd = axd.Copy()
+			if req.oid in axd:
+				axd.Update(req.oid, req.value)
+			else:
+				axd.RegisterVar(req.oid, req.value)
 		if not r.next:
 			break
 		r = r.next.contents
+	if not axd.frozen:
+		AXObject.Publish(axd)
 	return SNMP_ERR_NOERROR
 # low level handler
 handler_wrapper = HandlerWrapperFunc(_handler_wrapper)
 
 
-# AgentX object declaration
-class AgentX(object):
-	def __init__(self, Globals, **args):
-		self.alarm	= 0
+# background refresher
+# runs OnUpdate outside of snmp requests every CacheInterval seconds;
+# requests keep being served from the previous data until the new
+# data set is complete (stale-while-revalidate)
+class AgentXRefresher(threading.Thread):
+	def __init__(self, ax, interval, partial_interval=0):
+		threading.Thread.__init__(self, name='%s-refresher' % ax.Name)
+		self.daemon	= True
+		self.ax		= ax
+		self.interval	= interval
+		self.partial_interval = partial_interval
+		self.running	= True
+		self.wakeup	= threading.Event()
+		# a full refresh was requested by Trigger
+		self.full	= False
+
+	# refresh loop; full refreshes every interval seconds, partial ones
+	# in between every partial_interval seconds (if set) and when
+	# triggered so. the wakeup is cleared before each refresh, so a
+	# Trigger during the refresh wakes the next wait instead of being
+	# cleared with the one that started it
+	def run(self):
+		partial = False
+		while True:
+			self.wakeup.clear()
+			if not self.running:
+				break
+			if self.full:
+				self.full = False
+				partial = False
+			if not partial:
+				due = time.time() + self.interval
+			try:
+				self.ax.Refresh(partial)
+			except Exception as e:
+				# keep refreshing, the previous data stays published
+				print('ERROR: refresh failed: %s' % e)
+			if not self.interval:
+				# CacheInterval 0: collect once, never refresh
+				break
+			timeout = due - time.time()
+			if self.partial_interval:
+				timeout = min(timeout, self.partial_interval)
+			triggered = self.wakeup.wait(max(timeout, 0))
+			partial = bool(triggered or self.partial_interval) and time.time() < due
+
+	# refresh now instead of waiting for the interval; a partial refresh
+	# may reuse results of the last refresh for what did not change
+	def Trigger(self, partial=False):
+		if not partial:
+			self.full = True
+		self.wakeup.set()
+
+	# end refresh loop
+	def Stop(self):
+		self.running = False
+		self.wakeup.set()
+
+
+# trap queue
+# traps are queued by the refresher and sent by the main thread (see
+# AgentXBase.FlushTraps). traps are coalesced per key (e.g. a peer): a
+# trap queued while an earlier one of its key is still pending replaces
+# it, and after a trap is sent the next one of its key waits holddown
+# seconds, so a flapping peer yields one trap per holddown with its last
+# state. all keys share a token bucket of rate traps per second.
+class AgentXTrapQueue(object):
+	def __init__(self, holddown, rate, burst):
+		self.holddown	= holddown
+		self.rate	= rate
+		self.burst	= burst
+		self.tokens	= burst
+		self.updated	= time.time()
+		self.lock	= threading.Lock()
+		# key -> (oid, varbinds), in queueing order
+		self.pending	= collections.OrderedDict()
+		# key -> time its last trap was sent
+		self.sent	= {}
+		self.coalesced	= 0
+
+	# queue a trap, replacing a pending one of the same key
+	def Queue(self, key, oid, args):
+		with self.lock:
+			if key in self.pending:
+				del self.pending[key]
+				self.coalesced += 1
+			self.pending[key] = (oid, args)
+
+	# traps due now, as (oid, varbinds)
+	def Due(self, now=None):
+		now = now or time.time()
+		due = []
+		with self.lock:
+			self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+			self.updated = now
+			for key in list(self.pending):
+				if self.tokens < 1:
+					break
+				if now - self.sent.get(key, 0) < self.holddown:
+					continue
+				due.append(self.pending.pop(key))
+				self.sent[key] = now
+				self.tokens -= 1
+			for key in [key for key in self.sent if now - self.sent[key] >= self.holddown]:
+				del self.sent[key]
+		return due
+
+
+# transport independent part of an agent: settings, callbacks,
+# background collection and publishing of the data;
+# AgentX (net-snmp) and aio_agentx.AgentX (asyncio) derive from it
+class AgentXBase(object):
+	# default settings
+	Defaults = {
+		'Name'			: os.path.splitext(os.path.basename(sys.argv[0]))[0],
+		'CacheInterval'		: 30,
+		'TimerInterval'		: 30,
+		'Master'		: False,
+		'MIBFile'		: (),
+		'RootOID'		: None,
+		'ReloadOID'		: None,
+		'StopOID'		: None,
+		# file the collected data is saved to after every refresh and
+		# served from at startup (marked stale) until the first refresh
+		'SnapshotFile'		: None,
+		# older snapshots are not served
+		'SnapshotMaxAge'	: 3600,
+		# partial refreshes (OnUpdate finds axd.partial set) every
+		# PartialInterval seconds between the full ones every
+		# CacheInterval (0: only when triggered)
+		'PartialInterval'	: 0,
+		# queued traps are sent every TrapInterval seconds, at most
+		# TrapRate per second (bursts of TrapBurst), one per key and
+		# TrapHoldDown seconds
+		'TrapInterval'		: 1,
+		'TrapRate'		: 5,
+		'TrapBurst'		: 20,
+		'TrapHoldDown'		: 10,
+	}
+
+	# common initialization
+	def Setup(self, Globals, args):
 		self.loop	= False
 		self.AXData	= AgentXData()
+		self.Generation	= 0
+		self.PublishLock = threading.Lock()
 		self.Globals	= Globals
 		self.UpdateTime	= 0
+		self.Refresher	= None
 
 		# save global constants in object's namespace
 		for c in globals():
@@ -456,21 +1128,26 @@ class AgentX(object):
 					setattr(self, c, globals()[c])
 					break
 
-		# default settings
-		defaults = {
-			'Name'			: os.path.splitext(os.path.basename(sys.argv[0]))[0],
-			'CacheInterval'		: 30,
-			'TimerInterval'		: 30,
-			'Master'		: False,
-			'MIBFile'		: (),
-			'RootOID'		: None,
-			'ReloadOID'		: None,
-			'StopOID'		: None,
-		}
-
 		# initialize variables
-		for key in defaults:
-			setattr(self, key, args.get(key, defaults[key]))
+		for key in self.Defaults:
+			setattr(self, key, args.get(key, self.Defaults[key]))
+		if not type(self.MIBFile) in (list, tuple):
+			self.MIBFile = (self.MIBFile,)
+		self.MIBFile = tuple(mib for mib in self.MIBFile if mib)
+		self.Traps = AgentXTrapQueue(self.TrapHoldDown, self.TrapRate, self.TrapBurst)
+		# oid names are looked up in the MIB files if given (by net-snmp or
+		# mibtree), in the compiled tables of mibobjects otherwise
+		self.MIB = None
+		if not self.MIBFile:
+			self.MIB = MIBTree.compiled(mibobjects.objects, mibobjects.modules)
+			self.AXData.resolver = self.MIB.oid
+		# one or more subtrees, unqualified names belong to the first
+		if not self.RootOID:
+			self.RootOID = ()
+		elif not type(self.RootOID) in (list, tuple):
+			self.RootOID = (self.RootOID,)
+		if self.RootOID:
+			self.AXData.container = self.RootOID[0].split('::', 1)[0]
 
 		# request handlers
 		self.RequestHandlers = {
@@ -479,6 +1156,129 @@ class AgentX(object):
 			PAX_RW	: [],
 		}
 
+	# register handlers and special oids, once oids can be resolved
+	def SetupHandlers(self):
+		# register custom handlers
+		for HandlerName, HandlerMode in (('OnSnmpRequest', PAX_RW), ('OnSnmpRead', PAX_RO), ('OnSnmpWrite', PAX_WO)):
+			if HandlerName in self.Globals and '__call__' in dir(self.Globals[HandlerName]):
+				self.RegisterHandler(self.Globals[HandlerName], HandlerMode)
+		# ReloadOID and StopOID
+		if self.ReloadOID:
+			self.ReloadOID = self.AXData.Resolve(self.ReloadOID)
+		if self.StopOID:
+			self.StopOID = self.AXData.Resolve(self.StopOID)
+
+	# register custom handler
+	def RegisterHandler(self, handler, mode=PAX_RW):
+		assert '__call__' in dir(handler), 'Callable object is required'
+		self.RequestHandlers[mode].append(handler)
+
+	# run globals routine
+	def GlobalsRun(self, name, *args):
+		if name in self.Globals and '__call__' in dir(self.Globals[name]):
+			# call 
+			if args:
+				self.Globals[name](self, self.AXData, *args)
+			else:
+				self.Globals[name](self, self.AXData)
+
+	# start background data collection
+	def StartRefresher(self):
+		self.LoadSnapshot()
+		self.Refresher = AgentXRefresher(self, self.CacheInterval, self.PartialInterval)
+		self.Refresher.start()
+
+	# serve the data saved by the last run until the first refresh
+	def LoadSnapshot(self):
+		if not self.SnapshotFile:
+			return
+		axd = AgentXData.Load(self.SnapshotFile)
+		if axd is None:
+			return
+		if time.time() - axd.timestamp > self.SnapshotMaxAge:
+			print('INFO: snapshot %s is too old, not served' % self.SnapshotFile)
+			return
+		axd.container = self.AXData.container
+		axd.resolver = self.AXData.resolver
+		self.Publish(axd)
+		print('INFO: serving %d objects from snapshot %s (stale, collected %s)' % (
+			len(axd), self.SnapshotFile, time.ctime(axd.timestamp)))
+
+	# new, empty data set
+	def NewData(self):
+		axd = AgentXData()
+		axd.container = self.AXData.container
+		axd.resolver = self.AXData.resolver
+		return axd
+
+	# publish a complete data set
+	# the data is frozen and replaces the current one with a single
+	# reference swap, requests never see a partially built data set
+	def Publish(self, axd):
+		with self.PublishLock:
+			self.Generation += 1
+			axd.generation = self.Generation
+			axd.Freeze()
+			self.AXData = axd
+
+	# collect new data and publish it; OnUpdate finds partial in axd.partial:
+	# a partial refresh starts from a copy of the published data (unless
+	# it is a stale snapshot) and only updates what changed
+	def Refresh(self, partial=False):
+		if not ('OnUpdate' in self.Globals and '__call__' in dir(self.Globals['OnUpdate'])):
+			return
+		if partial and not self.AXData.stale:
+			axd = self.AXData.Copy()
+		else:
+			axd = self.NewData()
+			partial = False
+		axd.partial = partial
+		timestamp = time.time()
+		try:
+			self.Globals['OnUpdate'](self, axd)
+		except Exception as e:
+			# keep serving the previous data
+			print('ERROR: OnUpdate failed: %s' % e)
+			return
+		axd.timestamp = timestamp
+		self.Publish(axd)
+		self.UpdateTime = timestamp
+		if self.SnapshotFile:
+			# a snapshot that cannot be saved (disk, a value Save does
+			# not know) must not stop the refreshes
+			try:
+				axd.Save(self.SnapshotFile)
+			except Exception as e:
+				print('ERROR: saving snapshot %s failed: %s' % (self.SnapshotFile, e))
+
+	# queue a trap (from any thread); traps of one key are coalesced
+	def QueueTrap(self, key, oid, *args):
+		self.Traps.Queue(key, oid, args)
+
+	# send the queued traps that are due (from the main thread)
+	def FlushTraps(self):
+		for oid, args in self.Traps.Due():
+			try:
+				self.Trap(oid, *args)
+			except Exception as e:
+				print('ERROR: sending trap %s failed: %s' % (oid, e))
+
+	# end main loop
+	def Shutdown(self):
+		self.loop = False
+		if self.Refresher:
+			self.Refresher.Stop()
+
+
+# AgentX object declaration
+class AgentX(AgentXBase):
+	def __init__(self, Globals, **args):
+		if not axl:
+			print('ERROR: agentx module requires net-snmp libraries.')
+			sys.exit(1)
+		self.alarm	= 0
+		self.Setup(Globals, args)
+
 		# set global object reference
 		global AXObject
 		AXObject = self
@@ -493,35 +1293,25 @@ class AgentX(object):
 		axl.init_agent(self.Name)
 		axl.init_snmp(self.Name)
 		# register agent
-		if not type(self.MIBFile) in (list, tuple):
-			self.MIBFile = (self.MIBFile,)
 		for mib in self.MIBFile:
 			axl.read_mib(mib)
 
 		# install low level handler
-		if self.RootOID:
-			self.AXData.container = self.RootOID.split('::', 1)[0]
+		axl.netsnmp_create_handler_registration.restype = ctypes.POINTER(netsnmp_handler_registration)
+		for RootOID in self.RootOID:
 			# register handler callback
-			oidOID = ReadOID(self.RootOID)
+			RootOID = self.AXData.Resolve(RootOID)
+			oidOID = (oid_t * len(RootOID))(*RootOID)
 
-			axl.netsnmp_create_handler_registration.restype = ctypes.POINTER(netsnmp_handler_registration)
 			h = axl.netsnmp_create_handler_registration(
 				self.Name,
 				handler_wrapper,
 				oidOID, len(oidOID),
-				HANDLER_CAN_RWRITE,
+				HANDLER_CAN_RWRITE | HANDLER_CAN_GETBULK,
 			)
 			if axl.netsnmp_register_handler(h) != 0:
 				raise OperationalError('SNMP handler registration failure.')
-		# register custom handlers
-		for HandlerName, HandlerMode in (('OnSnmpRequest', PAX_RW), ('OnSnmpRead', PAX_RO), ('OnSnmpWrite', PAX_WO)):
-			if HandlerName in self.Globals and '__call__' in dir(self.Globals[HandlerName]):
-				self.RegisterHandler(self.Globals[HandlerName], HandlerMode)
-		# ReloadOID and StopOID
-		if self.ReloadOID:
-			self.ReloadOID = self.AXData.NormOID(self.ReloadOID)
-		if self.StopOID:
-			self.StopOID = self.AXData.NormOID(self.StopOID)
+		self.SetupHandlers()
 
 		# attach HUP signal
 		def HupHandler(signum, frame):
@@ -531,20 +1321,21 @@ class AgentX(object):
 
 		# run custom init routine
 		self.GlobalsRun('OnInit')
+		# start background data collection
+		self.StartRefresher()
 		if not self.loop:
-			# start timer
-			self.TimerStart(self.TimerInterval)
+			# start timer; the loop wakes up every TrapInterval to send
+			# the queued traps, net-snmp is used by this thread only
+			self.TimerStart(min(self.TimerInterval, self.TrapInterval))
 			self.loop = True
+			timer = 0
 			while self.loop:
-				self.GlobalsRun('OnTimer')
+				if time.time() >= timer:
+					self.GlobalsRun('OnTimer')
+					timer = time.time() + self.TimerInterval
+				self.FlushTraps()
 				self.Process()
 
-
-	# register custom handler
-	def RegisterHandler(self, handler, mode=PAX_RW):
-		assert '__call__' in dir(handler), 'Callable object is required'
-		self.RequestHandlers[mode].append(handler)
-
 	# start itimer
 	def TimerStart(self, interval):
 		try:
@@ -599,24 +1390,12 @@ class AgentX(object):
 			signal.alarm(0)
 		return result
 
-	# run globals routine
-	def GlobalsRun(self, name, *args):
-		if name in self.Globals and '__call__' in dir(self.Globals[name]):
-			# call 
-			if args:
-				self.Globals[name](self, self.AXData, *args)
-			else:
-				self.Globals[name](self, self.AXData)
-
-	# end main loop
-	def Shutdown(self):
-		self.loop = False
-
 	# send trap from within agentx module
 	def Trap(self, oid, *args):
 		sysUpTimeOID	= (oid_t * 9) (1, 3, 6, 1, 2, 1, 1, 3, 0)		# sysUpTimeInstance
 		snmpTrapOID	= (oid_t * 11) (1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0)	# snmpTrapOID.0
-		TrapOID		= ReadOID(self.AXData.NormOID(oid))
+		TrapOID		= self.AXData.Resolve(oid)
+		TrapOID		= (oid_t * len(TrapOID))(*TrapOID)
 
 		TrapVars = netsnmp_variable_list_p()
 		uptime = ctypes.c_long(axl.netsnmp_get_agent_uptime())
@@ -639,16 +1418,26 @@ class AgentX(object):
 
 		# add variable
 		for ArgOID, ArgData in args:
-			ArgOID = ReadOID(
-				self.AXData.NormOID(ArgOID)
-			)
+			ArgOID = self.AXData.Resolve(ArgOID)
+			ArgOID = (oid_t * len(ArgOID))(*ArgOID)
 
 			ArgDataLen = 0
 			ObjType = None
-			if type(ArgData) == str:
+			if type(ArgData) in (str, bytes):
+				if not isinstance(ArgData, bytes):
+					ArgData	= ArgData.encode('utf-8')
 				ObjType		= ASN_OCTET_STR
 				ArgDataLen	= len(ArgData)
 				ArgData		= ctypes.c_char_p(ArgData)
+			elif type(ArgData) == SnmpIpAddress:
+				ObjType		= ASN_IPADDRESS
+				ArgDataLen	= 4
+				ArgData		= ctypes.c_char_p(socket.inet_aton(ArgData))
+			elif type(ArgData) in (SnmpCounter32, SnmpGauge32):
+				ObjType		= ASN_COUNTER32 if type(ArgData) == SnmpCounter32 else ASN_UNSIGNED
+				ArgData		= ctypes.c_uint(ArgData)
+				ArgDataLen	= ctypes.sizeof(ArgData)
+				ArgData		= ctypes.cast(ctypes.byref(ArgData), ctypes.c_char_p)
 			elif type(ArgData) == int:
 				ObjType		= ASN_INTEGER
 				ArgData		= ctypes.c_int(ArgData)
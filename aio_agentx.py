@@ -0,0 +1,504 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+#
+#  AgentX (RFC 2741) subagent speaking the protocol itself on asyncio
+#  (python >= 3.5); an alternative to the net-snmp based adv_agentx.AgentX
+#  with the same callbacks (OnInit, OnUpdate, OnReload, OnTimer,
+#  OnSnmpRead/OnSnmpWrite/OnSnmpRequest) and the same data
+#  (adv_agentx.AgentXData). No net-snmp library is needed, oid names
+#  are resolved by mibtree.
+#
+import asyncio
+import struct
+import socket # for inet_aton
+import signal
+import threading
+import time
+
+from adv_agentx import AgentXBase, AgentXData, OperationalError
+from adv_agentx import SnmpGauge32, SnmpCounter32, SnmpIpAddress
+from adv_agentx import PAX_RO, PAX_WO, PAX_RW
+from adv_agentx import SNMP_MSG_GET, SNMP_MSG_GETNEXT, SNMP_MSG_GETBULK, SNMP_MSG_INTERNAL_SET_COMMIT
+from mibtree import MIBTree
+
+# export names
+__all__ = [
+	'AgentX',
+]
+
+# pdu types
+AGENTX_OPEN_PDU			= 1
+AGENTX_CLOSE_PDU		= 2
+AGENTX_REGISTER_PDU		= 3
+AGENTX_UNREGISTER_PDU		= 4
+AGENTX_GET_PDU			= 5
+AGENTX_GETNEXT_PDU		= 6
+AGENTX_GETBULK_PDU		= 7
+AGENTX_TESTSET_PDU		= 8
+AGENTX_COMMITSET_PDU		= 9
+AGENTX_UNDOSET_PDU		= 10
+AGENTX_CLEANUPSET_PDU		= 11
+AGENTX_NOTIFY_PDU		= 12
+AGENTX_PING_PDU			= 13
+AGENTX_RESPONSE_PDU		= 18
+
+# header flags
+AGENTX_FLAG_INSTANCE_REGISTRATION	= 0x01
+AGENTX_FLAG_NEW_INDEX			= 0x02
+AGENTX_FLAG_ANY_INDEX			= 0x04
+AGENTX_FLAG_NON_DEFAULT_CONTEXT		= 0x08
+AGENTX_FLAG_NETWORK_BYTE_ORDER		= 0x10
+
+# varbind types
+AGENTX_INTEGER			= 2
+AGENTX_OCTET_STRING		= 4
+AGENTX_NULL			= 5
+AGENTX_OBJECT_IDENTIFIER	= 6
+AGENTX_IPADDRESS		= 64
+AGENTX_COUNTER32		= 65
+AGENTX_GAUGE32			= 66
+AGENTX_TIMETICKS		= 67
+AGENTX_OPAQUE			= 68
+AGENTX_COUNTER64		= 70
+AGENTX_NOSUCHOBJECT		= 128
+AGENTX_NOSUCHINSTANCE		= 129
+AGENTX_ENDOFMIBVIEW		= 130
+
+# errors
+AGENTX_NOERROR			= 0
+AGENTX_GENERR			= 5
+AGENTX_NOTWRITABLE		= 17
+AGENTX_OPENFAILED		= 256
+AGENTX_NOTOPEN			= 257
+AGENTX_PARSEERROR		= 266
+AGENTX_PROCESSINGERROR		= 268
+
+# close reasons
+AGENTX_REASON_OTHER		= 1
+AGENTX_REASON_SHUTDOWN		= 5
+
+HEADER_LEN			= 20
+
+INTEGER_MIN			= -0x80000000
+INTEGER_MAX			= 0x7fffffff
+
+sysUpTimeOID			= (1, 3, 6, 1, 2, 1, 1, 3, 0)
+snmpTrapOID			= (1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0)
+
+# --- pdu encoding (always network byte order) ---
+
+# object identifier, with the 1.3.6.1.x prefix compression
+def EncodeOID(oid, include=0):
+	prefix = 0
+	if len(oid) > 4 and oid[:4] == (1, 3, 6, 1) and 0 < oid[4] < 256:
+		prefix = oid[4]
+		oid = oid[5:]
+	return struct.pack('!BBBB%dI' % len(oid), len(oid), prefix, include, 0, *oid)
+
+# octet string, padded to a multiple of 4 bytes
+def EncodeOctets(data):
+	if not isinstance(data, bytes):
+		data = data.encode('utf-8')
+	return struct.pack('!I', len(data)) + data + b'\0' * (-len(data) % 4)
+
+# varbind of a python value, the type is derived like in RequestObject.SetValue
+def EncodeVarBind(oid, value, vtype=None):
+	if vtype is None:
+		if type(value) == SnmpIpAddress:
+			vtype = AGENTX_IPADDRESS
+		elif type(value) == SnmpCounter32:
+			vtype = AGENTX_COUNTER32
+		elif type(value) == SnmpGauge32:
+			vtype = AGENTX_GAUGE32
+		elif type(value) == int:
+			vtype = AGENTX_INTEGER
+		elif type(value) == tuple:
+			vtype = AGENTX_OBJECT_IDENTIFIER
+		elif value is None:
+			vtype = AGENTX_NULL
+		else:
+			vtype = AGENTX_OCTET_STRING
+			if not isinstance(value, bytes):
+				value = str(value)
+	data = b''
+	# python ints are unbounded: INTEGER is clamped to its range (RFC 2578
+	# 7.1.1), Gauge32 latches at its maximum (7.1.7), counters and timeticks wrap
+	if vtype == AGENTX_INTEGER:
+		data = struct.pack('!i', min(max(value, INTEGER_MIN), INTEGER_MAX))
+	elif vtype == AGENTX_GAUGE32:
+		data = struct.pack('!I', min(max(value, 0), 0xffffffff))
+	elif vtype in (AGENTX_COUNTER32, AGENTX_TIMETICKS):
+		data = struct.pack('!I', value & 0xffffffff)
+	elif vtype == AGENTX_COUNTER64:
+		data = struct.pack('!Q', value & 0xffffffffffffffff)
+	elif vtype == AGENTX_IPADDRESS:
+		data = EncodeOctets(socket.inet_aton(value))
+	elif vtype in (AGENTX_OCTET_STRING, AGENTX_OPAQUE):
+		data = EncodeOctets(value)
+	elif vtype == AGENTX_OBJECT_IDENTIFIER:
+		data = EncodeOID(value)
+	return struct.pack('!HH', vtype, 0) + EncodeOID(oid) + data
+
+# complete pdu: header and payload
+def EncodePDU(ptype, session, transaction, packet, payload, flags=0):
+	return struct.pack('!BBBBIIII', 1, ptype, flags | AGENTX_FLAG_NETWORK_BYTE_ORDER, 0,
+		session, transaction, packet, len(payload)) + payload
+
+# --- pdu decoding ---
+
+# sequential reader over one pdu payload, in the byte order of its header
+class PDUReader(object):
+	__slots__ = ['data', 'pos', 'order']
+	def __init__(self, data, flags):
+		self.data	= data
+		self.pos	= 0
+		self.order	= '!' if flags & AGENTX_FLAG_NETWORK_BYTE_ORDER else '<'
+
+	def Unpack(self, fmt, size):
+		values = struct.unpack_from(self.order + fmt, self.data, self.pos)
+		self.pos += size
+		return values
+
+	def More(self):
+		return self.pos < len(self.data)
+
+	# returns (oid, include)
+	def OID(self):
+		n_subid, prefix, include, reserved = self.Unpack('BBBB', 4)
+		oid = self.Unpack('%dI' % n_subid, 4 * n_subid)
+		if prefix:
+			oid = (1, 3, 6, 1, prefix) + oid
+		return oid, include
+
+	def Octets(self):
+		length, = self.Unpack('I', 4)
+		data = self.data[self.pos:self.pos + length]
+		self.pos += length + (-length % 4)
+		return data
+
+	# returns (oid, type, value)
+	def VarBind(self):
+		vtype, reserved = self.Unpack('HH', 4)
+		oid, include = self.OID()
+		value = None
+		if vtype == AGENTX_INTEGER:
+			value, = self.Unpack('i', 4)
+		elif vtype in (AGENTX_COUNTER32, AGENTX_GAUGE32, AGENTX_TIMETICKS):
+			value, = self.Unpack('I', 4)
+		elif vtype == AGENTX_COUNTER64:
+			value, = self.Unpack('Q', 8)
+		elif vtype == AGENTX_IPADDRESS:
+			value = SnmpIpAddress(socket.inet_ntoa(self.Octets()))
+		elif vtype in (AGENTX_OCTET_STRING, AGENTX_OPAQUE):
+			value = self.Octets()
+		elif vtype == AGENTX_OBJECT_IDENTIFIER:
+			value, include = self.OID()
+		return oid, vtype, value
+
+
+# request object passed to OnSnmpRead/OnSnmpWrite/OnSnmpRequest
+class RequestObject(object):
+	__slots__ = ['oid', 'mode', 'value', 'data']
+	def __init__(self, oid, mode, value=None):
+		self.oid	= oid
+		self.mode	= mode
+		self.value	= value
+
+	# set value
+	def SetValue(self, value):
+		self.value = value
+
+
+# AgentX object declaration
+class AgentX(AgentXBase):
+	Defaults = dict(AgentXBase.Defaults,
+		# master agent: unix socket path or tcp:host:port
+		Socket		= '/var/agentx/master',
+		# session timeout announced to the master (seconds)
+		Timeout		= 5,
+		# seconds between reconnection attempts
+		RetryInterval	= 5,
+	)
+
+	def __init__(self, Globals, **args):
+		self.Setup(Globals, args)
+		self.StartTime	= time.time()
+		self.Session	= 0
+		self.PacketID	= 0
+		self.Writer	= None
+		self.Pending	= {}
+		self.SetPending	= None
+		self.Loop	= None
+
+		# oid names are resolved from the MIB files, if given
+		if self.MIBFile:
+			self.MIB = MIBTree(*self.MIBFile)
+			self.AXData.resolver = self.MIB.oid
+		self.RootOIDs = [self.AXData.Resolve(RootOID) for RootOID in self.RootOID]
+		self.SetupHandlers()
+
+		# run custom init routine
+		self.GlobalsRun('OnInit')
+		# start background data collection
+		self.StartRefresher()
+		self.loop = True
+		self.Loop = asyncio.new_event_loop()
+		try:
+			self.Loop.run_until_complete(self.Run())
+		finally:
+			self.Loop.close()
+
+	# main task: (re)connect to the master and serve its requests
+	# (signals only reach the main thread, an agent running in another
+	# thread is stopped by Shutdown)
+	async def Run(self):
+		if threading.current_thread() is threading.main_thread():
+			self.Loop.add_signal_handler(signal.SIGHUP, self.GlobalsRun, 'OnReload')
+			for sig in (signal.SIGINT, signal.SIGTERM):
+				self.Loop.add_signal_handler(sig, self.Shutdown)
+		timer = self.Loop.create_task(self.Timer())
+		traps = self.Loop.create_task(self.TrapTimer())
+		while self.loop:
+			serve = None
+			try:
+				await self.Connect()
+				# responses to open and register arrive through Serve, too
+				serve = self.Loop.create_task(self.Serve())
+				await self.Open()
+				await serve
+			except (OSError, EOFError, asyncio.TimeoutError, OperationalError) as e:
+				if self.loop:
+					print('ERROR: agentx session to %s: %s' % (self.Socket, e))
+			if serve:
+				serve.cancel()
+			self.Disconnect()
+			if self.loop:
+				await asyncio.sleep(self.RetryInterval)
+		timer.cancel()
+		traps.cancel()
+
+	# run OnTimer every TimerInterval seconds
+	async def Timer(self):
+		while self.loop:
+			self.GlobalsRun('OnTimer')
+			await asyncio.sleep(self.TimerInterval)
+
+	# send the queued traps every TrapInterval seconds
+	async def TrapTimer(self):
+		while self.loop:
+			self.FlushTraps()
+			await asyncio.sleep(self.TrapInterval)
+
+	async def Connect(self):
+		if self.Socket.startswith('tcp:'):
+			host, port = self.Socket[4:].rsplit(':', 1)
+			self.Reader, self.Writer = await asyncio.open_connection(host, int(port))
+		else:
+			self.Reader, self.Writer = await asyncio.open_unix_connection(self.Socket)
+		self.Session = 0
+
+	# open a session and register our subtrees
+	async def Open(self):
+		header, response = await self.Request(AGENTX_OPEN_PDU,
+			struct.pack('!BBBB', self.Timeout, 0, 0, 0) + EncodeOID(()) + EncodeOctets(self.Name))
+		self.CheckResponse(response, 'open')
+		self.Session = header[4]
+		for root in self.RootOIDs:
+			header, response = await self.Request(AGENTX_REGISTER_PDU,
+				struct.pack('!BBBB', 0, 127, 0, 0) + EncodeOID(root))
+			self.CheckResponse(response, 'register %s' % '.'.join(map(str, root)))
+
+	def CheckResponse(self, response, what):
+		uptime, error, index = response.Unpack('IHH', 8)
+		if error != AGENTX_NOERROR:
+			raise OperationalError('agentx %s failed: error %d' % (what, error))
+
+	def Disconnect(self):
+		if self.Writer:
+			self.Writer.close()
+		self.Writer = None
+		for future in self.Pending.values():
+			future.cancel()
+		self.Pending = {}
+
+	async def ReadPDU(self):
+		header = await self.Reader.readexactly(HEADER_LEN)
+		flags = header[2] if isinstance(header[2], int) else ord(header[2])
+		order = '!' if flags & AGENTX_FLAG_NETWORK_BYTE_ORDER else '<'
+		header = struct.unpack(order[0] + 'BBBBIIII', header)
+		payload = await self.Reader.readexactly(header[7])
+		return header, payload
+
+	# send a pdu, answers are awaited by packet id
+	def Send(self, ptype, payload, transaction=0, packet=None):
+		if packet is None:
+			self.PacketID = (self.PacketID + 1) & 0xffffffff
+			packet = self.PacketID
+		self.Writer.write(EncodePDU(ptype, self.Session, transaction, packet, payload))
+		return packet
+
+	async def Request(self, ptype, payload):
+		packet = self.Send(ptype, payload)
+		future = self.Loop.create_future()
+		self.Pending[packet] = future
+		return await asyncio.wait_for(future, self.Timeout)
+
+	def Respond(self, header, varbinds=b'', error=AGENTX_NOERROR, index=0):
+		uptime = int((time.time() - self.StartTime) * 100) & 0xffffffff
+		self.Writer.write(EncodePDU(AGENTX_RESPONSE_PDU, header[4], header[5], header[6],
+			struct.pack('!IHH', uptime, error, index) + varbinds))
+
+	# request loop
+	async def Serve(self):
+		while self.loop:
+			header, payload = await self.ReadPDU()
+			ptype = header[1]
+			if ptype == AGENTX_RESPONSE_PDU:
+				future = self.Pending.pop(header[6], None)
+				if future and not future.done():
+					future.set_result((header, PDUReader(payload, header[2])))
+				continue
+			reader = PDUReader(payload, header[2])
+			if header[2] & AGENTX_FLAG_NON_DEFAULT_CONTEXT:
+				reader.Octets()
+			try:
+				if ptype in (AGENTX_GET_PDU, AGENTX_GETNEXT_PDU, AGENTX_GETBULK_PDU):
+					self.Respond(header, self.HandleRead(ptype, reader))
+				elif ptype == AGENTX_TESTSET_PDU:
+					self.SetPending = [reader.VarBind() for i in iter(reader.More, False)]
+					self.Respond(header)
+				elif ptype == AGENTX_COMMITSET_PDU:
+					self.HandleCommit()
+					self.Respond(header)
+				elif ptype == AGENTX_UNDOSET_PDU:
+					self.SetPending = None
+					self.Respond(header)
+				elif ptype == AGENTX_CLEANUPSET_PDU:
+					# no response expected
+					self.SetPending = None
+				elif ptype == AGENTX_CLOSE_PDU:
+					raise OperationalError('session closed by master')
+				else:
+					self.Respond(header, error=AGENTX_PROCESSINGERROR)
+			except struct.error:
+				self.Respond(header, error=AGENTX_PARSEERROR)
+
+	# value of oid in axd, after the read handlers had their say
+	def ReadValue(self, axd, oid, value, mode):
+		handlers = self.RequestHandlers[PAX_RW] + self.RequestHandlers[PAX_RO]
+		if handlers:
+			req = RequestObject(oid, mode, value)
+			for handler in handlers:
+				result = handler(req, self, axd)
+				if result:
+					req.SetValue(result)
+			value = req.value
+		return value
+
+	# (oid, value) successors of start within [start, end), at most count
+	def Successors(self, axd, start, include, end, count):
+		if include and start in axd:
+			items = [(start, axd.Get(start))] + axd.GetNextItems(start, count - 1)
+		else:
+			items = axd.GetNextItems(start, count)
+		if end:
+			items = [item for item in items if item[0] < end]
+		return items
+
+	# get, getnext and getbulk; all varbinds are answered from one snapshot
+	def HandleRead(self, ptype, reader):
+		axd = self.AXData
+		varbinds = []
+		if ptype == AGENTX_GETBULK_PDU:
+			non_repeaters, max_repetitions = reader.Unpack('HH', 4)
+		ranges = []
+		while reader.More():
+			start, include = reader.OID()
+			end, unused = reader.OID()
+			ranges.append((start, include, end))
+
+		if ptype == AGENTX_GET_PDU:
+			for start, include, end in ranges:
+				if start in axd:
+					varbinds.append(EncodeVarBind(start, self.ReadValue(axd, start, axd.Get(start), SNMP_MSG_GET)))
+				elif any(start[:len(root)] == root for root in self.RootOIDs):
+					varbinds.append(EncodeVarBind(start, None, AGENTX_NOSUCHINSTANCE))
+				else:
+					varbinds.append(EncodeVarBind(start, None, AGENTX_NOSUCHOBJECT))
+			return b''.join(varbinds)
+
+		if ptype == AGENTX_GETNEXT_PDU:
+			non_repeaters, max_repetitions = len(ranges), 0
+		for start, include, end in ranges[:non_repeaters]:
+			items = self.Successors(axd, start, include, end, 1)
+			if items:
+				oid, value = items[0]
+				varbinds.append(EncodeVarBind(oid, self.ReadValue(axd, oid, value, SNMP_MSG_GETNEXT)))
+			else:
+				varbinds.append(EncodeVarBind(start, None, AGENTX_ENDOFMIBVIEW))
+
+		# repeaters: one slice per column, returned row by row
+		columns = [(start, self.Successors(axd, start, include, end, max_repetitions))
+			for start, include, end in ranges[non_repeaters:]]
+		for row in range(max_repetitions):
+			if row and all(row >= len(items) for start, items in columns):
+				break
+			for start, items in columns:
+				if row < len(items):
+					oid, value = items[row]
+					varbinds.append(EncodeVarBind(oid, self.ReadValue(axd, oid, value, SNMP_MSG_GETBULK)))
+				else:
+					varbinds.append(EncodeVarBind(items[-1][0] if items else start, None, AGENTX_ENDOFMIBVIEW))
+		return b''.join(varbinds)
+
+	# commit the varbinds of the last testset, like the net-snmp handler:
+	# the values go into a copy of the current data which is published
+	def HandleCommit(self):
+		if not self.SetPending:
+			return
+		axd = self.AXData.Copy()
+		for oid, vtype, value in self.SetPending:
+			req = RequestObject(oid, SNMP_MSG_INTERNAL_SET_COMMIT, value)
+			if self.ReloadOID and self.ReloadOID == oid and value == 1:
+				self.GlobalsRun('OnReload')
+			if self.StopOID and self.StopOID == oid and value == 1:
+				self.Shutdown()
+			for handler in self.RequestHandlers[PAX_RW] + self.RequestHandlers[PAX_WO]:
+				result = handler(req, self, axd)
+				if result:
+					req.value = result
+			if oid in axd:
+				axd.Update(oid, req.value)
+			else:
+				axd.RegisterVar(oid, req.value)
+		self.SetPending = None
+		self.Publish(axd)
+
+	# end main loop
+	def Shutdown(self):
+		AgentXBase.Shutdown(self)
+		if self.Loop:
+			self.Loop.call_soon_threadsafe(self.Close)
+
+	def Close(self):
+		if self.Writer:
+			self.Send(AGENTX_CLOSE_PDU, struct.pack('!BBBB', AGENTX_REASON_SHUTDOWN, 0, 0, 0))
+			self.Disconnect()
+
+	# send trap (notify pdu); may be called from any thread
+	def Trap(self, oid, *args):
+		varbinds = [
+			EncodeVarBind(sysUpTimeOID, int((time.time() - self.StartTime) * 100), AGENTX_TIMETICKS),
+			EncodeVarBind(snmpTrapOID, self.AXData.Resolve(oid)),
+		]
+		for ArgOID, ArgData in args:
+			varbinds.append(EncodeVarBind(self.AXData.Resolve(ArgOID), ArgData))
+		payload = b''.join(varbinds)
+		def Notify():
+			if self.Writer:
+				self.Send(AGENTX_NOTIFY_PDU, payload)
+		self.Loop.call_soon_threadsafe(Notify)
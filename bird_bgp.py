@@ -13,11 +13,17 @@
 # So this code is licensed under the GPLv3 (see COPYING.GPLv3).
 #
 
-from adv_agentx import AgentX
-from adv_agentx import SnmpGauge32, SnmpCounter32
-import time, os
+import os
+## AGENTXTRANSPORT=asyncio selects the pure python AgentX implementation
+if os.environ.get("AGENTXTRANSPORT") == "asyncio":
+	from aio_agentx import AgentX
+else:
+	from adv_agentx import AgentX
+from adv_agentx import SnmpGauge32, SnmpCounter32, SnmpIpAddress
+import time
 
-from birdagent import BirdAgent
+from birdagent import BirdAgent, BirdCollector, BirdWatcher
+from birdroutes import PathAttrTable
 
 ## handle get and getnext requests
 def OnSnmpRead(req, ax, axd):
@@ -36,47 +42,162 @@ def OnInit(ax, axd):
 	pass
 
 ## register some variables
-## this function is called when a new snmp request has been received and
-## if CacheInterval has expired at that time
+## this function is called by the background refresher every CacheInterval
+## seconds, and for partial refreshes (axd.partial) in between; requests
+## are served from the previous data until it returns
 def OnUpdate(ax, axd, state):
 	print('updated bird-bgp state: {0}'.format(time.time()))
 	## register variables
-	axd.RegisterVar('bgp', 0)
+	## (GETNEXT finds the successor of any oid, no placeholders are
+	## needed for the subtree, scalar or column oids)
 	axd.RegisterVar('bgpVersion', "10")
-	axd.RegisterVar('bgpLocalAs', 0)
 	axd.RegisterVar('bgpLocalAs.0', state.get("bgpLocalAs"))
 
-	# reindex by bgpPeerRemoteAddr
+	# reindex by bgpPeerRemoteAddr; the table is indexed by IpAddress,
+	# so IPv6 peers (text addresses) cannot be represented in it
 	peers = {}
 	for peer in state["bgp-peers"].values():
-		peers[peer.get("bgpPeerRemoteAddr")] = peer
-
-	for snmpkey in BirdAgent.bgp_keys:
-		axd.RegisterVar(snmpkey, 0)
-		for peer in sorted(peers.keys(), BirdAgent.ipCompare):
-			oid = "%s.%s"%(snmpkey, peer)
-			if peers[peer].has_key(snmpkey):
-				axd.RegisterVar(oid, peers[peer][snmpkey])
-			else:
-				axd.RegisterVar(oid, BirdAgent.bgp_defaults[snmpkey])
+		if isinstance(peer.get("bgpPeerRemoteAddr"), SnmpIpAddress):
+			peers[peer["bgpPeerRemoteAddr"]] = peer
+
+	# one table of the peer records, the cells are read from them on request;
+	# a partial refresh starts from the published data and only replaces the
+	# rows of the peers it fetched again
+	changed = state.get("changed")
+	table = None
+	if axd.partial and changed is not None:
+		records = [peers[peer["bgpPeerRemoteAddr"]] for peer in
+				(state["bgp-peers"].get(proto, {}) for proto in changed)
+				if peer.get("bgpPeerRemoteAddr") in peers]
+		removed = [address for address in changed.values()
+				if isinstance(address, SnmpIpAddress) and not address in peers]
+		table = axd.UpdateTable('bgpPeerEntry', records,
+				index=lambda peer: peer["bgpPeerRemoteAddr"], removed=removed)
+	if table is None:
+		axd.RegisterTable('bgpPeerEntry', BirdAgent.bgp_keys, peers.values(),
+				index=lambda peer: peer["bgpPeerRemoteAddr"],
+				value=lambda peer, snmpkey: peer[snmpkey] if snmpkey in peer else BirdAgent.bgp_defaults.get(snmpkey))
+
+	# the routing table (BIRDROUTEINTERVAL), served from its compact
+	# arrays; the same table is registered until it is fetched again
+	routes = state.get("bgp4-paths")
+	if routes is not None:
+		entry = axd.Resolve('bgp4PathAttrEntry')
+		axd.RegisterVar(entry, PathAttrTable(entry, routes))
+
+	# the peer states of a refresh whose bird queries failed are those
+	# of the last one (or missing), they are no transitions
+	if not "bird" in state.get("failed", ()):
+		QueueTransitions(ax, axd, peers)
 	return
 
+## queue a notification (RFC 4273) for each peer whose bgpPeerState changed
+## since the published data: bgpEstablishedNotification when it entered
+## established, bgpBackwardTransNotification when it fell back to a lower
+## state; peers new to the table are not notified, nor are those bird did
+## not report (only configured, or missing from a shard). traps are
+## coalesced per peer and rate-limited by the agent (see AgentXTrapQueue)
+def QueueTransitions(ax, axd, peers):
+	previous = ax.AXData
+	for address, peer in peers.items():
+		if not "bgpPeerState" in peer:
+			continue
+		state_oid = axd.Resolve("bgpPeerState.%s"%address)
+		try:
+			old_state = previous.Get(state_oid)
+		except KeyError:
+			continue
+		state = peer["bgpPeerState"]
+		if state == old_state:
+			continue
+		if state == BirdAgent.bgp_states["established"]:
+			notification = "bgpEstablishedNotification"
+		elif state < old_state:
+			notification = "bgpBackwardTransNotification"
+		else:
+			continue
+		ax.QueueTrap(address, axd.Resolve(notification),
+			(axd.Resolve("bgpPeerRemoteAddr.%s"%address), SnmpIpAddress(address)),
+			(axd.Resolve("bgpPeerLastError.%s"%address),
+				peer.get("bgpPeerLastError", BirdAgent.bgp_defaults["bgpPeerLastError"])),
+			(state_oid, state))
+
+## reload requested by HUP signal or ReloadOID:
+## re-read the bird configuration and refresh now
+def OnReload(ax, axd, bird):
+	bird.invalidateConfig()
+	if ax.Refresher:
+		ax.Refresher.Trigger()
+
+## watch bird's protocol summary every interval seconds (BIRDWATCHINTERVAL);
+## a change triggers a partial refresh of the changed protocols
+def StartWatcher(ax, bird, interval):
+	watcher = BirdWatcher(bird, interval,
+			lambda changed: ax.Refresher and ax.Refresher.Trigger(partial=True))
+	watcher.start()
+	return watcher
+
 
 # main program
 if __name__ == '__main__':
 	print('bird-bgp AgentX starting')
 
-	bird = BirdAgent( \
-			os.environ.get("BIRDCONF") or "/etc/bird/bird.conf", \
-			os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
-			os.environ.get("NETSTATCMD") or "netstat -na")
+	## deadlines of the inputs, e.g. BIRDDEADLINES="bird=10,config=5,sessions=5"
+	deadlines = BirdAgent.parseDeadlines(os.environ.get("BIRDDEADLINES"))
+
+	## bgp4PathAttrTable: `show route all` every BIRDROUTEINTERVAL seconds
+	## (unset or 0: not served), at most BIRDROUTELIMIT paths, parsed by
+	## BIRDROUTEWORKERS processes (unset or 0: parsed by the agent)
+	route_interval = int(os.environ.get("BIRDROUTEINTERVAL") or "0") or None
+	route_limit = int(os.environ.get("BIRDROUTELIMIT") or "0") or None
+	route_workers = int(os.environ.get("BIRDROUTEWORKERS") or "0") or None
+
+	## `show protocols all` as BIRDSHARDS name patterns over BIRDSHARDSESSIONS
+	## concurrent control socket sessions (default one per shard)
+	shards = int(os.environ.get("BIRDSHARDS") or "0") or None
+	shard_sessions = int(os.environ.get("BIRDSHARDSESSIONS") or "0") or None
+
+	## partial refreshes polling the protocol summary every BIRDSUMMARYINTERVAL
+	## seconds between the full ones (AGENTCACHEINTERVAL), e.g. 5
+	summary_interval = float(os.environ.get("BIRDSUMMARYINTERVAL") or "0")
+
+	## several bird daemons (BIRDINSTANCES) are queried in parallel
+	if os.environ.get("BIRDINSTANCES"):
+		bird = BirdCollector.fromSpec(os.environ["BIRDINSTANCES"], \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				int(os.environ.get("BIRDRESYNCINTERVAL") or "0") or None, \
+				deadlines, route_interval, route_limit, route_workers, shards, shard_sessions, \
+				poll_summary=bool(summary_interval))
+	else:
+		bird = BirdAgent( \
+				os.environ.get("BIRDCONF") or "/etc/bird/bird.conf", \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				os.environ.get("BIRDSOCKET"), \
+				int(os.environ.get("BIRDRESYNCINTERVAL") or "0") or None, \
+				deadlines, route_interval, route_limit, route_workers, shards, shard_sessions, \
+				poll_summary=bool(summary_interval))
+
+	## sub-second polling of the protocol summary, e.g. BIRDWATCHINTERVAL=0.5
+	watch = float(os.environ.get("BIRDWATCHINTERVAL") or "0")
+
+	## the deadlines and per-input timeout counts, written to
+	## BIRDSTATUSFILE (JSON) after each refresh
+	status_file = os.environ.get("BIRDSTATUSFILE")
+
+	def Update(ax, axd):
+		OnUpdate(ax,axd,bird.getBGPState(partial=axd.partial))
+		if status_file:
+			bird.writeStatus(status_file)
 
 	callbacks = {
 			"OnSnmpRead"    : OnSnmpRead,
 			"OnSnmpWrite"   : OnSnmpWrite,
 			"OnSnmpRequest" : OnSnmpRequest,
-			"OnInit"        : OnInit,
-			"OnUpdate"      : lambda ax, axd: OnUpdate(ax,axd,bird.getBGPState())
+			"OnInit"        : lambda ax, axd: watch and StartWatcher(ax,bird,watch),
+			"OnUpdate"      : Update,
+			"OnReload"      : lambda ax, axd: OnReload(ax,axd,bird),
 			}
 
 	## initialize agentx module and run main loop
@@ -84,9 +205,14 @@ if __name__ == '__main__':
 		callbacks,
 		Name		= 'bird-bgp',
 		#RootOID = '1.3.6.1.2.1.15', # https://tools.ietf.org/html/draft-ietf-idr-bgp4-mib-06
-		MIBFile		= os.environ.get("BGPMIBFILE") or "/usr/share/bird-snmp/BGP4-MIB.txt",
+		Socket		= os.environ.get("AGENTXSOCKET") or "/var/agentx/master",
+		MIBFile		= os.environ.get("BGPMIBFILE"),
 		RootOID = 'BGP4-MIB::bgp', # https://tools.ietf.org/html/draft-ietf-idr-bgp4-mib-06
-		CacheInterval	= int(os.environ.get("AGENTCACHEINTERVAL") or "30")
+		CacheInterval	= int(os.environ.get("AGENTCACHEINTERVAL") or "30"),
+		PartialInterval	= summary_interval,
+		SnapshotFile	= os.environ.get("AGENTSNAPSHOT"),
+		TrapHoldDown	= int(os.environ.get("AGENTTRAPHOLDDOWN") or "10"),
+		TrapRate	= float(os.environ.get("AGENTTRAPRATE") or "5")
 	)
 	print('bird-bgp AgentX terminating')
 
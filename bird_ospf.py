@@ -13,11 +13,16 @@
 # So this code is licensed under the GPLv3 (see COPYING.GPLv3).
 #
 
-from adv_agentx import AgentX
-from adv_agentx import SnmpGauge32, SnmpCounter32, SnmpIpAddress
-import time, os
+import os
+## AGENTXTRANSPORT=asyncio selects the pure python AgentX implementation
+if os.environ.get("AGENTXTRANSPORT") == "asyncio":
+	from aio_agentx import AgentX
+else:
+	from adv_agentx import AgentX
+from adv_agentx import SnmpGauge32, SnmpCounter32, SnmpIpAddress, AgentXViewTable
+import time
 
-from birdagent import BirdAgent
+from birdagent import BirdAgent, BirdCollector
 
 ## handle get and getnext requests
 def OnSnmpRead(req, ax, axd):
@@ -36,8 +41,8 @@ def OnInit(ax, axd):
 	pass
 
 ## register some variables
-## this function is called when a new snmp request has been received and
-## if CacheInterval has expired at that time
+## this function is called by the background refresher every CacheInterval
+## seconds; requests are served from the previous data until it returns
 def OnUpdate(ax, axd, state):
 	def state2int(state):
 		if state.lower().startswith("full"):
@@ -60,41 +65,68 @@ def OnUpdate(ax, axd, state):
 			return 1
 	print('updated bird-ospf state: {0}'.format(time.time()))
 	## register variables
-	axd.RegisterVar('ospf', 0)
-
-	# get ip-sorted neighbors
-	nbrs = []
-	for nbrid in sorted(state["ospf-neighbors"].keys(), BirdAgent.ipCompare):
-		nbrs.append((nbrid, state["ospf-neighbors"][nbrid]))
-
-	# register in MIB-sort:
-	for nbrid, nbr in nbrs:
-		axd.RegisterVar("ospfNbrIpAddr.%s.0"%nbrid, SnmpIpAddress(nbr["rtrip"]))
-	for nbrid, nbr in nbrs:
-		axd.RegisterVar("ospfNbrRtrId.%s.0"%nbrid, SnmpIpAddress(nbrid))
-	for nbrid, nbr in nbrs:
-		axd.RegisterVar("ospfNbrPriority.%s.0"%nbrid, nbr["pri"])
-	for nbrid, nbr in nbrs:
-		axd.RegisterVar("ospfNbrState.%s.0"%nbrid, state2int(nbr["state"]))
+	# one table of the (router id, neighbor) records, indexed by router id
+	# and address-less index 0, the cells are read from them on request
+	columns = {
+		"ospfNbrIpAddr":	lambda nbrid, nbr: SnmpIpAddress(nbr["rtrip"]),
+		"ospfNbrRtrId":		lambda nbrid, nbr: SnmpIpAddress(nbrid),
+		"ospfNbrPriority":	lambda nbrid, nbr: nbr["pri"],
+		"ospfNbrState":		lambda nbrid, nbr: state2int(nbr["state"]),
+	}
+	axd.RegisterTable("ospfNbrEntry", list(columns), state["ospf-neighbors"].items(),
+			index=lambda record: "%s.0"%record[0],
+			value=lambda record, column: columns[column](*record))
+
+	# the link state database (OSPFLSDBINTERVAL), served from its compact
+	# arrays; the same table is registered until it is fetched again
+	lsdb = state.get("ospf-lsdb")
+	if lsdb is not None:
+		entry = axd.Resolve('ospfLsdbEntry')
+		axd.RegisterVar(entry, AgentXViewTable(entry, lsdb))
 	return
 
 # main program
 if __name__ == '__main__':
 	print('bird-ospf AgentX starting')
 
-	bird = BirdAgent( \
-			os.environ.get("BIRDCONF") or "/etc/bird/bird.conf", \
-			os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
-			os.environ.get("NETSTATCMD") or "netstat -na")
+	## deadlines of the inputs, e.g. BIRDDEADLINES="bird=10,config=5,sessions=5"
+	deadlines = BirdAgent.parseDeadlines(os.environ.get("BIRDDEADLINES"))
+
+	## ospfLsdbTable: `show ospf lsadb` every OSPFLSDBINTERVAL seconds
+	## (unset or 0: not served)
+	lsdb_interval = int(os.environ.get("OSPFLSDBINTERVAL") or "0") or None
+
+	## several bird daemons (BIRDINSTANCES) are queried in parallel
+	if os.environ.get("BIRDINSTANCES"):
+		bird = BirdCollector.fromSpec(os.environ["BIRDINSTANCES"], \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				deadlines=deadlines, lsdb_interval=lsdb_interval)
+	else:
+		bird = BirdAgent( \
+				os.environ.get("BIRDCONF") or "/etc/bird/bird.conf", \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				os.environ.get("BIRDSOCKET"), \
+				deadlines=deadlines, lsdb_interval=lsdb_interval)
+
+	instance = os.environ.get("OSPFINSTANCE") or "o_main"
+
+	## the deadlines and per-input timeout counts, written to
+	## BIRDSTATUSFILE (JSON) after each refresh
+	status_file = os.environ.get("BIRDSTATUSFILE")
 
-	instance = "o_main"
+	def Update(ax, axd):
+		OnUpdate(ax,axd,bird.getOSPFState(instance))
+		if status_file:
+			bird.writeStatus(status_file)
 
 	callbacks = {
 			"OnSnmpRead"    : OnSnmpRead,
 			"OnSnmpWrite"   : OnSnmpWrite,
 			"OnSnmpRequest" : OnSnmpRequest,
 			"OnInit"        : OnInit,
-			"OnUpdate"      : lambda ax, axd: OnUpdate(ax,axd,bird.getOSPFState(instance))
+			"OnUpdate"      : Update
 			}
 
 	## initialize agentx module and run main loop
@@ -102,9 +134,11 @@ if __name__ == '__main__':
 		callbacks,
 		Name		= 'bird-ospf',
 		#RootOID = '1.3.6.1.2.1.14',
-		MIBFile		= os.environ.get("OSPFMIBFILE") or "/usr/share/bird-snmp/OSPF-MIB.txt",
+		Socket		= os.environ.get("AGENTXSOCKET") or "/var/agentx/master",
+		MIBFile		= os.environ.get("OSPFMIBFILE"),
 		RootOID = 'OSPF-MIB::ospf',
-		CacheInterval	= int(os.environ.get("AGENTCACHEINTERVAL") or "30")
+		CacheInterval	= int(os.environ.get("AGENTCACHEINTERVAL") or "30"),
+		SnapshotFile	= os.environ.get("AGENTSNAPSHOT")
 	)
 	print('bird-ospf AgentX terminating')
 
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code uses python-agentx library licensed under GPLv3
+# (see agentx.py for details)
+#
+# So this code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+#
+# one agent serving BGP4-MIB and OSPF-MIB from a shared collector:
+# one master agent session, one refresh cycle and one bird connection
+# for both (bird_bgp.py and bird_ospf.py serve one MIB each)
+#
+
+import os
+## AGENTXTRANSPORT=asyncio selects the pure python AgentX implementation
+if os.environ.get("AGENTXTRANSPORT") == "asyncio":
+	from aio_agentx import AgentX
+else:
+	from adv_agentx import AgentX
+
+from birdagent import BirdAgent, BirdCollector
+import bird_bgp, bird_ospf
+
+## MIBs this agent can serve: module, subtree and MIB file
+## (without MIB files the compiled tables of mibobjects are used)
+MIBS = {
+	"bgp":	("BGP4-MIB", "BGP4-MIB::bgp", os.environ.get("BGPMIBFILE")),
+	"ospf":	("OSPF-MIB", "OSPF-MIB::ospf", os.environ.get("OSPFMIBFILE")),
+}
+
+## collect the state of all enabled MIBs in one cycle and register it;
+## unqualified names of each part resolve in that part's MIB
+def OnUpdate(ax, axd, bird, mibs, ospf_instance):
+	state = bird.getState("bgp" in mibs, ospf_instance if "ospf" in mibs else None, axd.partial)
+	if "bgp" in state:
+		axd.container = MIBS["bgp"][0]
+		bird_bgp.OnUpdate(ax, axd, state["bgp"])
+	if "ospf" in state:
+		axd.container = MIBS["ospf"][0]
+		bird_ospf.OnUpdate(ax, axd, state["ospf"])
+
+# main program
+if __name__ == '__main__':
+	print('bird-snmp AgentX starting')
+
+	mibs = [mib.strip() for mib in (os.environ.get("BIRDMIBS") or "bgp,ospf").split(",") if mib.strip()]
+	for mib in mibs:
+		if not mib in MIBS:
+			raise SystemExit("unknown MIB in BIRDMIBS: %s (known: %s)"%(mib, ", ".join(sorted(MIBS))))
+
+	## deadlines of the inputs, e.g. BIRDDEADLINES="bird=10,config=5,sessions=5"
+	deadlines = BirdAgent.parseDeadlines(os.environ.get("BIRDDEADLINES"))
+
+	## bgp4PathAttrTable: `show route all` every BIRDROUTEINTERVAL seconds
+	## (unset or 0: not served), at most BIRDROUTELIMIT paths, parsed by
+	## BIRDROUTEWORKERS processes (unset or 0: parsed by the agent)
+	route_interval = (int(os.environ.get("BIRDROUTEINTERVAL") or "0") or None) if "bgp" in mibs else None
+	route_limit = int(os.environ.get("BIRDROUTELIMIT") or "0") or None
+	route_workers = int(os.environ.get("BIRDROUTEWORKERS") or "0") or None
+
+	## `show protocols all` as BIRDSHARDS name patterns over BIRDSHARDSESSIONS
+	## concurrent control socket sessions (default one per shard)
+	shards = int(os.environ.get("BIRDSHARDS") or "0") or None
+	shard_sessions = int(os.environ.get("BIRDSHARDSESSIONS") or "0") or None
+
+	## ospfLsdbTable: `show ospf lsadb` every OSPFLSDBINTERVAL seconds
+	## (unset or 0: not served)
+	lsdb_interval = (int(os.environ.get("OSPFLSDBINTERVAL") or "0") or None) if "ospf" in mibs else None
+
+	## partial refreshes polling the protocol summary every BIRDSUMMARYINTERVAL
+	## seconds between the full ones (AGENTCACHEINTERVAL), e.g. 5
+	summary_interval = float(os.environ.get("BIRDSUMMARYINTERVAL") or "0") if "bgp" in mibs else 0
+
+	## several bird daemons (BIRDINSTANCES) are queried in parallel
+	if os.environ.get("BIRDINSTANCES"):
+		bird = BirdCollector.fromSpec(os.environ["BIRDINSTANCES"], \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				int(os.environ.get("BIRDRESYNCINTERVAL") or "0") or None, \
+				deadlines, route_interval, route_limit, route_workers, shards, shard_sessions, lsdb_interval, \
+				poll_summary=bool(summary_interval))
+	else:
+		bird = BirdAgent( \
+				os.environ.get("BIRDCONF") or "/etc/bird/bird.conf", \
+				os.environ.get("BIRDCPATH") or "/usr/sbin/birdc", \
+				os.environ.get("NETSTATCMD") or "netstat -na", \
+				os.environ.get("BIRDSOCKET"), \
+				int(os.environ.get("BIRDRESYNCINTERVAL") or "0") or None, \
+				deadlines, route_interval, route_limit, route_workers, shards, shard_sessions, lsdb_interval, \
+				poll_summary=bool(summary_interval))
+
+	instance = os.environ.get("OSPFINSTANCE") or "o_main"
+
+	## sub-second polling of the protocol summary, e.g. BIRDWATCHINTERVAL=0.5
+	watch = float(os.environ.get("BIRDWATCHINTERVAL") or "0") if "bgp" in mibs else 0
+
+	## the deadlines and per-input timeout counts, written to
+	## BIRDSTATUSFILE (JSON) after each refresh
+	status_file = os.environ.get("BIRDSTATUSFILE")
+
+	def Update(ax, axd):
+		OnUpdate(ax,axd,bird,mibs,instance)
+		if status_file:
+			bird.writeStatus(status_file)
+
+	callbacks = {
+			"OnSnmpRead"    : bird_bgp.OnSnmpRead,
+			"OnSnmpWrite"   : bird_bgp.OnSnmpWrite,
+			"OnSnmpRequest" : bird_bgp.OnSnmpRequest,
+			"OnInit"        : lambda ax, axd: watch and bird_bgp.StartWatcher(ax,bird,watch),
+			"OnUpdate"      : Update,
+			"OnReload"      : lambda ax, axd: bird_bgp.OnReload(ax,axd,bird),
+			}
+
+	## initialize agentx module and run main loop
+	AgentX(
+		callbacks,
+		Name		= 'bird-snmp',
+		Socket		= os.environ.get("AGENTXSOCKET") or "/var/agentx/master",
+		MIBFile		= [MIBS[mib][2] for mib in mibs],
+		RootOID		= [MIBS[mib][1] for mib in mibs],
+		CacheInterval	= int(os.environ.get("AGENTCACHEINTERVAL") or "30"),
+		PartialInterval	= summary_interval,
+		SnapshotFile	= os.environ.get("AGENTSNAPSHOT"),
+		TrapHoldDown	= int(os.environ.get("AGENTTRAPHOLDDOWN") or "10"),
+		TrapRate	= float(os.environ.get("AGENTTRAPRATE") or "5")
+	)
+	print('bird-snmp AgentX terminating')
+
+# vim:ts=4:sw=4:noexpandtab
@@ -21,14 +21,145 @@ birdagent - agentx code for the bird routing daemon
 
 from adv_agentx import AgentX
 from adv_agentx import SnmpGauge32,SnmpCounter32,SnmpIpAddress
-import time,re,subprocess,glob
+from birdsocket import BirdSocket
+from birdroutes import RouteParser, RouteTable, ipInt, workerPool
+from birdlsdb import LsdbParser, LsdbTable
+import time,re,subprocess,glob,socket,struct,os,threading,signal,json
+
+class SourceTimeout(Exception):
+	"""
+	an input (config, bird, sessions, routes, lsdb) missed its deadline
+	"""
+	def __init__(self, source):
+		Exception.__init__(self, "%s timed out"%source)
+		self.source = source
+
+class SourceFailed(SourceTimeout):
+	"""
+	an input failed (e.g. the bird socket broke off or birdc failed);
+	handled like a missed deadline, its last result is used
+	"""
+	def __init__(self, source, error):
+		Exception.__init__(self, "%s failed: %s"%(source, error))
+		self.source = source
+		self.error = error
+
+def writeStatus(filename, status):
+	"""
+	write status (see BirdAgent.status) to filename as JSON; the file
+	is replaced, so readers never see a partial one
+	"""
+	tmpname = "%s.%d"%(filename, os.getpid())
+	try:
+		with open(tmpname, "w") as output:
+			json.dump(status, output, indent=1, sort_keys=True)
+			output.write("\n")
+		os.rename(tmpname, filename)
+	except (IOError, OSError) as e:
+		print("ERROR: writing status %s failed: %s"%(filename, e))
+
+class Watchdog:
+	"""
+	kills a child process that is still running after timeout seconds,
+	with its whole process group: children it left holding the output
+	pipe would keep the reader waiting (start it with os.setsid)
+	"""
+
+	def __init__(self, process, timeout):
+		self.process = process
+		self.expired = False
+		self.timer = threading.Timer(timeout, self.kill)
+		self.timer.daemon = True
+		self.timer.start()
+
+	def kill(self):
+		self.expired = True
+		try:
+			os.killpg(self.process.pid, signal.SIGKILL)
+		except OSError:
+			pass
+
+	def cancel(self):
+		self.timer.cancel()
 
 class BirdAgent:
 
-	def __init__(self, cfgfile, birdcli, netstatcmd="netstat -na"):
+	# deadlines (seconds) of the inputs: parsing the configuration,
+	# one bird query, reading the tcp sessions, `show route all`,
+	# `show ospf lsadb`
+	deadlines = {
+		"config":   10,
+		"bird":     30,
+		"sessions": 10,
+		"routes":   300,
+		"lsdb":     60,
+	}
+
+	# commands pipelined at once by fetchProtocols
+	prefetch_batch = 64
+
+	def __init__(self, cfgfile, birdcli, netstatcmd="netstat -na", birdsocket=None, full_resync=None, deadlines=None,
+			route_interval=None, route_limit=None, route_workers=None, shards=None, shard_sessions=None,
+			lsdb_interval=None, poll_summary=False):
 		self.cfgfile = cfgfile
 		self.birdcli = birdcli
 		self.netstatcmd = netstatcmd
+		# parsed configuration and the signature of the files it came from
+		self.config = None
+		self.config_files = None
+		# incremental refresh: protocol properties and summary lines of the
+		# last refresh; everything is fetched again every full_resync seconds
+		# (None: always fetch everything)
+		self.full_resync = full_resync
+		self.last_full_resync = 0
+		self.bgp_protocols = {}
+		self.bgp_summary = {}
+		# watcher: its own control socket session, the summary of its
+		# last poll and the protocols changed since the last refresh
+		self.watchsocket = None
+		self.watch_summary = None
+		self.changed = set()
+		self.changed_lock = threading.Lock()
+		# the protocols the last refresh fetched again, if it was a
+		# partial one, with their properties before (None: all)
+		self.bgp_changed = None
+		# partial refreshes poll the `show protocols` summary themselves
+		# and fetch the protocols changed since the last one (besides
+		# those the watcher found)
+		self.poll_summary = poll_summary
+		# sharding: `show protocols all` is fetched as up to shards name
+		# patterns over shard_sessions concurrent control socket sessions
+		# of their own (default: one per shard); needs the control socket
+		self.shards = shards if shards and shards > 1 and birdsocket else None
+		self.shard_sessions = shard_sessions or shards
+		self.shardsockets = []
+		# query bird through its control socket instead of birdc, if given
+		self.birdsocket = None
+		if birdsocket:
+			self.birdsocket = BirdSocket(birdsocket)
+		# replies of pipelined commands, by command, see prefetch()
+		self.prefetched = {}
+		# an input missing its deadline (or failing) is replaced by its
+		# last result; the misses are counted per input for the log
+		self.deadlines = dict(self.deadlines)
+		self.deadlines.update(deadlines or {})
+		self.timeouts = dict.fromkeys(self.deadlines, 0)
+		self.calls = {}
+		self.bgp_sessions = {}
+		self.ospf_neighbors = {}
+		# bgp4PathAttrTable: the BGP paths of the routing table, fetched
+		# every route_interval seconds (None: never), at most route_limit,
+		# parsed by a pool of route_workers processes (None: inline)
+		self.route_interval = route_interval
+		self.route_limit = route_limit
+		self.route_workers = route_workers
+		self.routes = None
+		self.last_routes = 0
+		# ospfLsdbTable: the link state database, fetched every
+		# lsdb_interval seconds (None: never)
+		self.lsdb_interval = lsdb_interval
+		self.lsdb = None
+		self.last_lsdb = 0
 
 	bgp_states = {
 		"idle":        1,
@@ -41,33 +172,41 @@ class BirdAgent:
 
 	_re_config_include = re.compile("^include\s*\"(/[^\"]*)\".*$")
 	_re_config_bgp_proto_begin = re.compile("^protocol bgp ([a-zA-Z0-9_]+) .* \{$")
-	_re_config_local_as = re.compile("local ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+) as ([0-9]+);")
+	_re_config_local_as = re.compile("local ([0-9a-fA-F:.]+) as ([0-9]+);")
 	_re_config_bgp_holdtime = re.compile("hold time ([0-9]+);")
 	_re_config_bgp_keepalive = re.compile("keepalive time ([0-9]+);")
-	_re_config_remote_peer = re.compile("neighbor ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+) as ([0-9]+);")
+	_re_config_remote_peer = re.compile("neighbor ([0-9a-fA-F:.]+) as ([0-9]+);")
 	_re_config_timeformat = re.compile("\s*timeformat\s+protocol\s*\"%s\"\s*;")
 	_re_config_proto_end = re.compile("^\}$")
 
-	_re_birdcli_bgp_begin = re.compile("([a-zA-Z0-9_]+) *BGP * [a-zA-Z0-9_]+ * [a-zA-Z0-9]+ * ([a-zA-Z0-9:]+) *")
-	_re_birdcli_bgp_peer = {
-			"bgpPeerIdentifier": re.compile("Neighbor ID:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
-			"bgpPeerState": re.compile("BGP state:.* ([a-zA-Z]+)"),
-			"bgpPeerLocalAddr": re.compile("Source address:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
-			"bgpPeerRemoteAddr": re.compile("Neighbor address:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
-			"bgpPeerRemoteAs": re.compile("Neighbor AS:.* ([0-9]+)"),
-			"bgpPeerInUpdates": re.compile("Import updates:\ +([0-9]+) .*[0-9\-]+.*[0-9\-]+.*[0-9\-]+.*[0-9\-]+"),
-			"bgpPeerOutUpdates": re.compile("Export updates:\ +([0-9]+) .*[0-9\-]+.*[0-9\-]+.*[0-9\-]+.*[0-9\-]+"),
-			"bgpPeerHoldTime": re.compile("Hold timer:.* ([0-9]+)/[0-9]+"),
-			"bgpPeerHoldTimeConfigured": re.compile("Hold timer:.* [0-9]+/([0-9]+)"),
-			"bgpPeerKeepAlive": re.compile("Keepalive timer:.* ([0-9]+)/[0-9]+"),
-			"bgpPeerKeepAliveConfigured": re.compile("Keepalive timer:.* [0-9]+/([0-9]+)"),
-			"bgpPeerLastError": re.compile("Last error:\ +[a-zA-Z0-9-_\ ]+$")
+
+	_re_ip4 = re.compile("^[0-9]+\.[0-9]+\.[0-9]+\.[0-9]+$")
+
+	# fields of a BGP protocol in `show protocols all` output:
+	# the keyword before the colon selects the conversion,
+	# which returns (snmpkey, value) pairs (None values are skipped)
+	_birdcli_bgp_fields = {
+			"BGP state": lambda v: [("bgpPeerState",
+					BirdAgent.bgp_states.get(v.split()[-1].lower() if v else "", 1))],
+			"Neighbor address": lambda v: [("bgpPeerRemoteAddr", BirdAgent.ipAddress(v))],
+			"Neighbor AS": lambda v: [("bgpPeerRemoteAs", BirdAgent.birdcliInt(v))],
+			"Neighbor ID": lambda v: [("bgpPeerIdentifier", BirdAgent.birdcliIp4(v))],
+			"Source address": lambda v: [("bgpPeerLocalAddr", BirdAgent.ipAddress(v))],
+			"Import updates": lambda v: [("bgpPeerInUpdates", BirdAgent.birdcliCounter(v))],
+			"Export updates": lambda v: [("bgpPeerOutUpdates", BirdAgent.birdcliCounter(v))],
+			"Hold timer": lambda v: zip(("bgpPeerHoldTime", "bgpPeerHoldTimeConfigured"),
+					BirdAgent.birdcliTimer(v)),
+			"Keepalive timer": lambda v: zip(("bgpPeerKeepAlive", "bgpPeerKeepAliveConfigured"),
+					BirdAgent.birdcliTimer(v)),
 			}
-	_re_birdcli_bgp_end = re.compile("^$")
 
 	_re_birdcli_ospf_neighbor = re.compile("^([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)\s+([0-9]+)\s+(\S+)\s+(\S+)\s+(\S+)\s+([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)")
 
-	_re_netstat = re.compile("^tcp\s+[0-9]+\s+[0-9]+\s+([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+):([0-9]+)\s+([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+):([0-9]+)\s+ESTABLISHED")
+	# tcp socket tables of the kernel, read instead of running netstat
+	proc_tcp_files = ["/proc/net/tcp", "/proc/net/tcp6"]
+	_proc_tcp_established = "01"
+
+	_re_netstat = re.compile("^tcp6?\s+[0-9]+\s+[0-9]+\s+(\S+):([0-9]+)\s+(\S+):([0-9]+)\s+ESTABLISHED")
 
 	bgp_keys = [
 			'bgpPeerIdentifier',
@@ -121,18 +260,29 @@ class BirdAgent:
 			}
 
 
+	@staticmethod
+	def ipKey(ip):
+		"""
+		sort key of an IPv4 address (numeric order)
+		"""
+		return "%3s.%3s.%3s.%3s" % tuple(ip.split("."))
+
 	@staticmethod
 	def ipCompare(ip1, ip2):
-		lst1 = "%3s.%3s.%3s.%3s" % tuple(ip1.split("."))
-		lst2 = "%3s.%3s.%3s.%3s" % tuple(ip2.split("."))
-		return cmp(lst1, lst2)
+		lst1 = BirdAgent.ipKey(ip1)
+		lst2 = BirdAgent.ipKey(ip2)
+		return (lst1 > lst2) - (lst1 < lst2)
 
 	@staticmethod
-	def combinedConfigLines(filename):
+	def combinedConfigLines(filename, files=None):
 		"""
 		yield the whole bird configuration file line by line;
 		all include-statements are resolved/unrolled
+		if files is a list, the signature of every file read and every
+		include-glob expanded is appended to it (see configFileSignature)
 		"""
+		if files is not None:
+			files.append(("file", filename, BirdAgent.configFileSignature("file", filename)))
 		with open(filename, "r") as bird_conf:
 			for line in bird_conf:
 				line = line.strip()
@@ -140,56 +290,644 @@ class BirdAgent:
 				if not match:
 					yield line
 				else:
-					for subconf in glob.glob(match.group(1)):
+					subconfs = glob.glob(match.group(1))
+					if files is not None:
+						files.append(("glob", match.group(1), subconfs))
+					for subconf in subconfs:
 						yield "# subconf: %s (from %s)"%(subconf, line)
-						for subline in BirdAgent.combinedConfigLines(subconf):
+						for subline in BirdAgent.combinedConfigLines(subconf, files):
 							yield subline
 
+	@staticmethod
+	def configFileSignature(kind, name):
+		"""
+		current signature of a configuration file (mtime, inode, size)
+		or of an include-glob (the files it matches)
+		"""
+		if kind == "glob":
+			return glob.glob(name)
+		st = os.stat(name)
+		return (st.st_mtime, st.st_ino, st.st_size)
+
+	def configChanged(self):
+		"""
+		check whether any file of the parsed configuration changed
+		(without reading the files)
+		"""
+		if self.config is None or self.config_files is None:
+			return True
+		for kind, name, signature in self.config_files:
+			try:
+				if self.configFileSignature(kind, name) != signature:
+					return True
+			except OSError:
+				return True
+		return False
+
+	def invalidateConfig(self):
+		"""
+		forget the signature of the parsed configuration, it is read
+		again on next use (until then it stands in, see getBGPState)
+		"""
+		self.config_files = None
+
+	@staticmethod
+	def parseDeadlines(spec):
+		"""
+		deadlines from a "source=seconds,..." specification (BIRDDEADLINES)
+		"""
+		deadlines = {}
+		for item in (spec or "").split(","):
+			if not item.strip():
+				continue
+			source, seconds = item.split("=", 1)
+			if not source.strip() in BirdAgent.deadlines:
+				raise ValueError("unknown deadline %s (known: %s)"%(source,
+						", ".join(sorted(BirdAgent.deadlines))))
+			deadlines[source.strip()] = float(seconds)
+		return deadlines
+
+	def timedOut(self, source, error=None):
+		self.timeouts[source] += 1
+		if isinstance(error, SourceFailed):
+			print("WARNING: %s failed: %s (%d times), using its last result"%(
+					source, error.error, self.timeouts[source]))
+			return
+		print("WARNING: %s missed its deadline of %ss (%d times), using its last result"%(
+				source, self.deadlines[source], self.timeouts[source]))
+
+	def status(self):
+		"""
+		the deadlines of the inputs and how often each missed it (or
+		failed) since the start: {"time": ..., "deadlines": {source:
+		seconds}, "timeouts": {source: count}}
+		"""
+		return {
+			"time": int(time.time()),
+			"deadlines": dict(self.deadlines),
+			"timeouts": dict(self.timeouts),
+		}
+
+	def writeStatus(self, filename):
+		writeStatus(filename, self.status())
+
+	def callWithin(self, source, function, *args):
+		"""
+		call function in a thread and wait for it until the deadline
+		of source; raises SourceTimeout if it is not done by then (it
+		keeps running, and no second call is started while it does),
+		SourceFailed with its exception if it raised one
+		"""
+		call = self.calls.get(source)
+		if call and call[0].is_alive():
+			raise SourceTimeout(source)
+		result = []
+		errors = []
+		def run():
+			try:
+				result.append(function(*args))
+			except Exception as e:
+				errors.append(e)
+		thread = threading.Thread(target=run)
+		thread.daemon = True
+		self.calls[source] = (thread, result)
+		thread.start()
+		thread.join(self.deadlines[source])
+		if thread.is_alive():
+			raise SourceTimeout(source)
+		if errors:
+			raise SourceFailed(source, errors[0])
+		return result[0]
+
 	@staticmethod
 	def bgpKeys():
 		return BirdAgent.bgp_keys
 
-	def getOSPFState(self, ospf_instance):
+	@staticmethod
+	def procTcpAddress(address):
 		"""
-		fetch OSPF-related state from:
-		* parsing `birdc show ospf neighbors $ospf` output
+		convert a /proc/net/tcp{,6} "ADDR:PORT" field to (ip, port);
+		addresses are hex dumps of 32bit words in host byte order,
+		IPv4-mapped IPv6 addresses are returned as IPv4
 		"""
+		addr, port = address.split(":")
+		if len(addr) == 8:
+			ip = socket.inet_ntoa(struct.pack("=I", int(addr, 16)))
+		else:
+			packed = struct.pack("=IIII", *[int(addr[i:i+8], 16) for i in range(0, 32, 8)])
+			if packed[:12] == b"\0" * 10 + b"\xff" * 2:
+				ip = socket.inet_ntoa(packed[12:])
+			else:
+				ip = socket.inet_ntop(socket.AF_INET6, packed)
+		return ip, str(int(port, 16))
+
+	@staticmethod
+	def procTcpSessions(port=179, files=None):
+		"""
+		established tcp sessions from or to port, read in one pass from
+		the kernel's socket tables; returns the 4-tuples
+		(src-addr, src-port, dst-addr, dst-port) keyed by remote address
+		or None if no socket table is readable
+		"""
+		sessions = None
+		hexport = ":%04X"%port
+		for filename in files or BirdAgent.proc_tcp_files:
+			try:
+				table = open(filename, "r")
+			except IOError:
+				continue
+			if sessions is None:
+				sessions = {}
+			with table:
+				for line in table:
+					# cheap prefilter before splitting the line
+					if hexport not in line:
+						continue
+					fields = line.split()
+					if fields[3] != BirdAgent._proc_tcp_established:
+						continue
+					if not (fields[1].endswith(hexport) or fields[2].endswith(hexport)):
+						continue
+					srcip, srcport = BirdAgent.procTcpAddress(fields[1])
+					dstip, dstport = BirdAgent.procTcpAddress(fields[2])
+					sessions[dstip] = (srcip, srcport, dstip, dstport)
+		return sessions
+
+	def netstatSessions(self):
+		"""
+		established tcp:179 sessions from netstat output (fallback
+		for systems without /proc/net/tcp), keyed like procTcpSessions
+		"""
+		bgp_sessions = {}
+		netstat = subprocess.Popen( \
+				"%s | grep '^tcp.*:179.*ESTABLISHED'"%self.netstatcmd,
+				shell=True, stdout=subprocess.PIPE, universal_newlines=True,
+				preexec_fn=os.setsid)
+		watchdog = Watchdog(netstat, self.deadlines["sessions"])
+		try:
+			output = netstat.communicate()[0]
+		finally:
+			watchdog.cancel()
+		if watchdog.expired:
+			raise SourceTimeout("sessions")
+		for line in output.split("\n"):
+			match = self._re_netstat.search(line)
+			if not match:
+				continue
+			# key 4-tuples by remote ip: src-addr, src-port, dst-addr, dst-port
+			srcip, srcport, dstip, dstport = match.groups()
+			srcip, dstip = BirdAgent.ipAddress(srcip), BirdAgent.ipAddress(dstip)
+			bgp_sessions[dstip] = (srcip, srcport, dstip, dstport)
+		return bgp_sessions
+
+	def birdCommand(self, *args):
+		"""
+		run a bird CLI command and yield its output lines as they
+		arrive (the output is never held as a whole);
+		uses the persistent control socket connection if configured,
+		a birdc process otherwise
+		"""
+		return self.birdQuery("bird", args)
+
+	def birdQuery(self, source, args):
+		"""
+		birdCommand within the deadline of source
+		"""
+		if args in self.prefetched:
+			lines = self.prefetched.pop(args)
+			if lines is None:
+				raise SourceTimeout(source)
+			for line in lines:
+				yield line
+			return
+
+		if self.birdsocket:
+			try:
+				for line in self.birdsocket.iterCommand(" ".join(args), self.deadlines[source]):
+					yield line
+			except socket.timeout:
+				raise SourceTimeout(source)
+			except socket.error as e:
+				raise SourceFailed(source, "bird socket %s (%s): %s"%(self.birdsocket.path, " ".join(args), e))
+			return
 
 		# "with"-context-manager for Popen not available in python < 3.2
-		birdc = subprocess.Popen([self.birdcli, "show", "ospf", "neighbors", ospf_instance], \
-				stdout=subprocess.PIPE)
-		output = birdc.communicate()[0]
+		birdc = subprocess.Popen([self.birdcli] + list(args), \
+				stdout=subprocess.PIPE, universal_newlines=True, preexec_fn=os.setsid)
+		# a hung birdc is killed, its output is incomplete then
+		watchdog = Watchdog(birdc, self.deadlines[source])
+		try:
+			for line in birdc.stdout:
+				yield line.rstrip("\n")
+		finally:
+			watchdog.cancel()
+			birdc.stdout.close()
+			birdc.wait()
+		if watchdog.expired:
+			raise SourceTimeout(source)
 		if birdc.returncode != 0:
-			print("ERROR: bird-CLI (querying ospf neighbors) %s failed: %i"%(self.birdcli, birdc.returncode))
+			raise SourceFailed(source, "bird-CLI %s (%s) exited with %i"%(self.birdcli, " ".join(args), birdc.returncode))
 
-		neighbors = {}
-		for line in output.split("\n"):
-			match = self._re_birdcli_ospf_neighbor.search(line)
-			if match:
-				rtrid, pri, state, deadtime, iface, rtrip = match.groups()
-				neighbors[rtrid] = {}
-				neighbors[rtrid]["pri"] = int(pri)
-				neighbors[rtrid]["state"] = state
-				neighbors[rtrid]["deadtime"] = deadtime
-				neighbors[rtrid]["iface"] = iface
-				neighbors[rtrid]["rtrip"] = rtrip
-		return {"ospf-neighbors":neighbors}
+	def prefetch(self, commands):
+		"""
+		send several commands (tuples of arguments) at once, pipelined
+		over the control socket; their replies are then consumed by
+		birdCommand. the replies are read as a whole, so only commands
+		with short replies are prefetched. without a control socket
+		every command still needs its own birdc process and nothing is
+		prefetched.
+		"""
+		if not self.birdsocket or len(commands) < 2:
+			return
+		try:
+			replies = self.birdsocket.commands([" ".join(args) for args in commands], self.deadlines["bird"])
+		except socket.timeout:
+			# all of them missed the deadline, see birdCommand
+			self.prefetched.update((args, None) for args in commands)
+			return
+		except socket.error as e:
+			print("ERROR: bird socket %s failed: %s"%(self.birdsocket.path, e))
+			return
+		self.prefetched.update(zip(commands, replies))
 
-	def getBGPState(self):
+	@staticmethod
+	def ipAddress(value):
 		"""
-		fetch BGP-related state from:
-		* parsing configuration file
-		* parsing `birdc show protocols all` output
-		* parsing `netstat` output
+		normalized address: SnmpIpAddress for IPv4 (and IPv4-mapped
+		IPv6) addresses, the canonical text form for IPv6 addresses
+		(as procTcpAddress returns them), None for anything else
 		"""
+		if BirdAgent._re_ip4.match(value):
+			return SnmpIpAddress(value)
+		try:
+			packed = socket.inet_pton(socket.AF_INET6, value)
+		except (socket.error, ValueError):
+			return None
+		if packed[:12] == b"\0" * 10 + b"\xff" * 2:
+			return SnmpIpAddress(socket.inet_ntoa(packed[12:]))
+		return socket.inet_ntop(socket.AF_INET6, packed)
 
-		current_time = int(time.time())
+	@staticmethod
+	def birdcliIp4(value):
+		if BirdAgent._re_ip4.match(value):
+			return SnmpIpAddress(value)
+		return None
+
+	@staticmethod
+	def birdcliInt(value):
+		try:
+			return int(value.split()[0])
+		except (ValueError, IndexError):
+			return None
+
+	@staticmethod
+	def birdcliCounter(value):
+		value = BirdAgent.birdcliInt(value)
+		if value is None:
+			return None
+		return SnmpCounter32(value)
+
+	@staticmethod
+	def birdcliTimer(value):
+		"""
+		"150/180" (or "150.123/180") -> (150, 180)
+		"""
+		try:
+			current, configured = value.split()[0].split("/")
+			return (int(float(current)), int(configured))
+		except (ValueError, IndexError):
+			return (None, None)
+
+	@staticmethod
+	def parseBGPProtocols(lines, current_time):
+		"""
+		parse `show protocols all` output and yield (name, properties)
+		for every BGP protocol as soon as its block is complete;
+		lines may be a stream (see birdCommand), every line is looked
+		at once and dispatched on its leading keyword:
+		* unindented lines are protocol headers
+		  (name proto table state since info)
+		* indented "keyword: value" lines are protocol properties
+		* blank lines end a protocol block
+		"""
+		fields = BirdAgent._birdcli_bgp_fields
+		proto = None
+		peer = None
+		for line in lines:
+			if not line.strip():
+				if proto:
+					yield proto, peer
+				proto = None
+				continue
+			if line[0] not in " \t":
+				if proto:
+					yield proto, peer
+				proto = None
+				header = line.split()
+				if len(header) >= 5 and header[1] == "BGP":
+					proto, peer = header[0], {}
+					try:
+						peer["bgpPeerFsmEstablishedTime"] = SnmpGauge32(current_time - int(header[4]))
+					except ValueError:
+						pass
+				continue
+			if not proto:
+				continue
+			keyword, colon, value = line.strip().partition(":")
+			convert = fields.get(keyword)
+			if convert:
+				for snmpkey, snmpvalue in convert(value.strip()):
+					if snmpvalue is not None:
+						peer[snmpkey] = snmpvalue
+		if proto:
+			yield proto, peer
+
+	@staticmethod
+	def parseProtocolSummary(lines):
+		"""
+		parse `show protocols` output, return the BGP protocols'
+		(state, since, info) by name
+		"""
+		summary = {}
+		for line in lines:
+			header = line.split(None, 5)
+			if len(header) >= 5 and header[1] == "BGP":
+				summary[header[0]] = (header[3], header[4], header[5].strip() if len(header) > 5 else "")
+		return summary
+
+	def fullResyncDue(self, current_time):
+		return not self.full_resync or current_time - self.last_full_resync >= self.full_resync
+
+	def bgpCommands(self, current_time, partial=False):
+		"""
+		the first query of getBGPProtocols, to batch it with others;
+		only the summary: prefetched replies are held as a whole, the
+		full `show protocols all` is streamed to its parser instead
+		"""
+		if partial and self.bgp_protocols:
+			return [("show", "protocols")] if self.poll_summary else []
+		if self.full_resync or self.shards or self.poll_summary:
+			return [("show", "protocols")]
+		return []
+
+	def watchProtocols(self):
+		"""
+		poll the `show protocols` summary on a control socket session
+		of its own; return the BGP protocols whose summary line (state,
+		since, info) changed since the last poll, they are also marked
+		for the next partial refresh (see getChangedProtocols). the
+		first poll only takes the summary; needs the control socket.
+		"""
+		if not self.birdsocket:
+			return set()
+		if self.watchsocket is None:
+			self.watchsocket = BirdSocket(self.birdsocket.path)
+		try:
+			summary = self.parseProtocolSummary(self.watchsocket.command("show protocols", self.deadlines["bird"]))
+		except (socket.timeout, socket.error):
+			# bird failures are reported by the refreshes
+			return set()
+		previous, self.watch_summary = self.watch_summary, summary
+		if previous is None:
+			return set()
+		changed = set(proto for proto in set(summary) | set(previous)
+				if summary.get(proto) != previous.get(proto))
+		with self.changed_lock:
+			self.changed.update(changed)
+		return changed
+
+	@staticmethod
+	def shardPatterns(names, shards):
+		"""
+		split protocol names into at most shards lists of bird name
+		patterns matching each name once, balanced by the names
+		matched: the largest group of names ("prefix*") is split by one
+		more character (a name equal to the prefix is matched by
+		itself) until every group fits into a shard
+		"""
+		names = sorted(set(names))
+		size = -(-len(names) // shards)
+		groups = [("*", names)] if names else []
+		while True:
+			groups.sort(key=lambda group: len(group[1]))
+			if not groups or len(groups[-1][1]) <= max(size, 1) and len(groups) >= min(shards, len(names)):
+				break
+			pattern, members = groups.pop()
+			prefix = pattern[:-1]
+			split = {}
+			for name in members:
+				if name == prefix:
+					groups.append((name, [name]))
+				else:
+					split.setdefault(name[:len(prefix) + 1] + "*", []).append(name)
+			groups.extend(split.items())
+		patterns = [[] for shard in range(min(shards, len(groups)))]
+		loads = [0] * len(patterns)
+		for pattern, members in reversed(groups):
+			shard = loads.index(min(loads))
+			patterns[shard].append(pattern)
+			loads[shard] += len(members)
+		return patterns
+
+	def getShardedProtocols(self, names, current_time):
+		"""
+		`show protocols all` of the protocols names as shards (see
+		shardPatterns), fetched concurrently over shard_sessions
+		control socket sessions of their own; each session pipelines
+		the patterns of its shards. a shard missing the deadline or
+		failing fails the whole fetch (SourceTimeout, SourceFailed).
+		"""
+		shards = self.shardPatterns(names, self.shards)
+		sessions = min(self.shard_sessions, len(shards))
+		while len(self.shardsockets) < sessions:
+			self.shardsockets.append(BirdSocket(self.birdsocket.path))
+		protocols, errors = {}, []
+		def run(session, patterns):
+			try:
+				for shard in patterns:
+					replies = session.commands(['show protocols all "%s"'%pattern for pattern in shard],
+							self.deadlines["bird"])
+					for reply in replies:
+						protocols.update(self.parseBGPProtocols(reply, current_time))
+			except (socket.timeout, socket.error) as e:
+				errors.append(e)
+		threads = [threading.Thread(target=run, args=(self.shardsockets[n], shards[n::sessions]))
+				for n in range(sessions)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		for error in errors:
+			if isinstance(error, socket.timeout):
+				raise SourceTimeout("bird")
+		if errors:
+			raise SourceFailed("bird", "bird socket %s: %s"%(self.birdsocket.path, errors[0]))
+		return protocols
+
+	def fetchProtocols(self, names, current_time):
+		"""
+		`show protocols all $name` for each of the protocol names,
+		pipelined in batches of prefetch_batch commands so that no
+		more replies than those of one batch are held at once
+		"""
+		protocols = {}
+		for start in range(0, len(names), self.prefetch_batch):
+			batch = [("show", "protocols", "all", proto) for proto in names[start:start + self.prefetch_batch]]
+			self.prefetch(batch)
+			try:
+				for args in batch:
+					protocols.update(self.parseBGPProtocols(self.birdCommand(*args), current_time))
+			finally:
+				for args in batch:
+					self.prefetched.pop(args, None)
+		return protocols
+
+	def getChangedProtocols(self, current_time):
+		"""
+		partial refresh: `show protocols all $name` only for the
+		protocols the watcher found changed, and with poll_summary
+		those whose `show protocols` summary line changed since the
+		last refresh; the others keep their properties from the last
+		refresh
+		"""
+		with self.changed_lock:
+			changed, self.changed = self.changed, set()
+		try:
+			summary = None
+			if self.poll_summary:
+				summary = self.parseProtocolSummary(self.birdCommand("show", "protocols"))
+				changed.update(proto for proto in set(summary) | set(self.bgp_summary)
+						if summary.get(proto) != self.bgp_summary.get(proto))
+			protocols = {}
+			for proto, peer in self.bgp_protocols.items():
+				if proto in changed:
+					continue
+				peer = peer.copy()
+				line = (summary or self.watch_summary or {}).get(proto)
+				try:
+					peer["bgpPeerFsmEstablishedTime"] = SnmpGauge32(current_time - int(line[1]))
+				except (TypeError, ValueError):
+					pass
+				protocols[proto] = peer
+			# protocols gone from the summary are only dropped
+			protocols.update(self.fetchProtocols(sorted(proto for proto in changed
+					if summary is None or proto in summary), current_time))
+		except SourceTimeout:
+			# to be fetched by the next refresh
+			with self.changed_lock:
+				self.changed.update(changed)
+			raise
+		self.bgp_changed = dict((proto, self.bgp_protocols.get(proto)) for proto in changed)
+		self.bgp_protocols = protocols
+		if summary is not None:
+			self.bgp_summary = summary
+		return protocols
+
+	def getBGPProtocols(self, current_time, partial=False):
+		"""
+		BGP protocol properties by name from `show protocols all`;
+		with full_resync set, the cheap `show protocols` summary is
+		fetched and `show protocols all $name` only for the protocols
+		whose summary line (state, since, info) changed; unchanged
+		protocols keep their properties from the last refresh.
+		a partial refresh only fetches the protocols the watcher (or
+		the summary poll) found changed (see getChangedProtocols).
+		"""
+		if partial and self.bgp_protocols:
+			return self.getChangedProtocols(current_time)
+		# everything changed is fetched now
+		with self.changed_lock:
+			self.changed = set()
+		self.bgp_changed = None
+		if self.fullResyncDue(current_time):
+			summary = None
+			if self.full_resync or self.shards or self.poll_summary:
+				summary = self.parseProtocolSummary(self.birdCommand("show", "protocols"))
+			if self.shards:
+				protocols = self.getShardedProtocols(summary, current_time)
+			else:
+				protocols = dict(self.parseBGPProtocols(
+						self.birdCommand("show", "protocols", "all"), current_time))
+			# only once the protocols are in: a failed fetch is redone
+			if summary is not None:
+				self.bgp_summary = summary
+			if self.full_resync:
+				self.last_full_resync = current_time
+			self.bgp_protocols = protocols
+			return protocols
+
+		summary = self.parseProtocolSummary(self.birdCommand("show", "protocols"))
+		protocols, changed = {}, []
+		for proto, line in summary.items():
+			if proto in self.bgp_protocols and self.bgp_summary.get(proto) == line:
+				peer = self.bgp_protocols[proto].copy()
+				try:
+					peer["bgpPeerFsmEstablishedTime"] = SnmpGauge32(current_time - int(line[1]))
+				except ValueError:
+					pass
+				protocols[proto] = peer
+			else:
+				changed.append(proto)
+		protocols.update(self.fetchProtocols(sorted(changed), current_time))
+		self.bgp_summary = summary
+		self.bgp_protocols = protocols
+		return protocols
+
+	def getOSPFState(self, ospf_instance, current_time=None):
+		"""
+		fetch OSPF-related state from:
+		* parsing `show ospf neighbors $ospf` output
+		* parsing `show ospf lsadb $ospf` output, every lsdb_interval
+		if bird misses its deadline, the neighbors (or the LSAs) of the
+		last refresh are returned
+		"""
+
+		if current_time is None:
+			current_time = int(time.time())
+
+		neighbors = {}
+		try:
+			for line in self.birdCommand("show", "ospf", "neighbors", ospf_instance):
+				match = self._re_birdcli_ospf_neighbor.search(line)
+				if match:
+					rtrid, pri, state, deadtime, iface, rtrip = match.groups()
+					neighbors[rtrid] = {}
+					neighbors[rtrid]["pri"] = int(pri)
+					neighbors[rtrid]["state"] = state
+					neighbors[rtrid]["deadtime"] = deadtime
+					neighbors[rtrid]["iface"] = iface
+					neighbors[rtrid]["rtrip"] = rtrip
+		except SourceTimeout as e:
+			self.timedOut("bird", e)
+			neighbors = self.ospf_neighbors.get(ospf_instance, {})
+		self.ospf_neighbors[ospf_instance] = neighbors
+
+		# the link state database, parsed as it streams in; while the
+		# LSAs stay the same only their sequences and ages are replaced
+		if self.lsdb_interval and current_time - self.last_lsdb >= self.lsdb_interval:
+			try:
+				self.lsdb = LsdbTable.refresh(self.lsdb, LsdbParser.parse(
+						self.birdQuery("lsdb", ("show", "ospf", "lsadb", ospf_instance))))
+				self.last_lsdb = current_time
+			except SourceTimeout as e:
+				self.timedOut("lsdb", e)
+		return {"ospf-neighbors":neighbors, "ospf-lsdb":self.lsdb}
+
+	def getBGPConfig(self):
+		"""
+		fetch BGP-related configuration from the configuration files;
+		the result is cached until the mtime/inode/size of one of the
+		files (or the files matched by an include) change or
+		invalidateConfig() is called
+		"""
+		if not self.configChanged():
+			return self.config
 
-		# fetch some data from the configuration:
 		cfg = {}
 		cfg["bgp-peers"] = {}
 		proto = None
-		for line in BirdAgent.combinedConfigLines(self.cfgfile):
+		files = []
+		for line in BirdAgent.combinedConfigLines(self.cfgfile, files):
 			if self._re_config_timeformat:
 				cfg["timeformat"] = True
 			match = self._re_config_bgp_proto_begin.search(line)
@@ -199,16 +937,16 @@ class BirdAgent:
 			if proto:
 				match = self._re_config_local_as.search(line)
 				if match:
-					cfg["bgp-peers"][proto]["bgpPeerLocalAddr"] = SnmpIpAddress(match.group(1))
+					cfg["bgp-peers"][proto]["bgpPeerLocalAddr"] = BirdAgent.ipAddress(match.group(1))
 					cfg["bgp-peers"][proto]["bgpPeerLocalAs"] = int(match.group(2))
-					if not cfg.has_key("bgpLocalAs"):
+					if not "bgpLocalAs" in cfg:
 						cfg["bgpLocalAs"] = int(match.group(2))
 					elif cfg["bgpLocalAs"] != int(match.group(2)):
 						print("WARNING: multiple local AS: %i/%i"% \
 								(cfg["bgpLocalAs"],int(match.group(2))))
 				match = self._re_config_remote_peer.search(line)
 				if match:
-					cfg["bgp-peers"][proto]["bgpPeerRemoteAddr"] = SnmpIpAddress(match.group(1))
+					cfg["bgp-peers"][proto]["bgpPeerRemoteAddr"] = BirdAgent.ipAddress(match.group(1))
 					cfg["bgp-peers"][proto]["bgpPeerRemoteAs"] = int(match.group(2))
 
 				match = self._re_config_bgp_holdtime.search(line)
@@ -221,67 +959,91 @@ class BirdAgent:
 
 			if self._re_config_proto_end.search(line):
 				proto = None
-		if not cfg.has_key("timeformat"):
+		if not "timeformat" in cfg:
 			print("WARNING: timeformat not configured for this agent's use.")
 
+		self.config = cfg
+		self.config_files = files
+		return cfg
+
+	def getRoutes(self, peers):
+		"""
+		the BGP paths of `show route all` as a RouteTable; the output is
+		parsed as it streams in, within the "routes" deadline. peers maps
+		protocol names to the peers' IPv4 addresses.
+		"""
+		lines = self.birdQuery("routes", ("show", "route", "all"))
+		if self.route_workers:
+			routes = RouteTable.buildParallel(lines, peers, workerPool(self.route_workers),
+					self.route_workers, self.route_limit)
+		else:
+			routes = RouteTable.build(RouteParser.parse(lines), peers, self.route_limit)
+		if self.route_limit and len(routes) >= self.route_limit:
+			print("WARNING: route limit %d reached, %d paths left out"%(self.route_limit, routes.dropped))
+		return routes
+
+	def getBGPState(self, current_time=None, partial=False):
+		"""
+		fetch BGP-related state from:
+		* parsing configuration file
+		* parsing `show protocols all` output (see getBGPProtocols)
+		* reading /proc/net/tcp{,6} (or parsing `netstat` output)
+		an input that misses its deadline is taken from the last refresh;
+		a partial refresh only fetches the protocols the watcher (or the
+		summary poll) found changed; the inputs taken from the last
+		refresh are listed in the state's "failed" set. "changed" maps
+		the protocols a partial refresh fetched again to their previous
+		bgpPeerRemoteAddr (None after a full refresh), the other peers
+		are as published before.
+		"""
+
+		if current_time is None:
+			current_time = int(time.time())
+		failed = set()
+
+		# fetch some data from the configuration; the state is built on
+		# a copy, the cached configuration must stay untouched
+		try:
+			cfg = self.callWithin("config", self.getBGPConfig)
+		except SourceTimeout as e:
+			self.timedOut("config", e)
+			failed.add("config")
+			cfg = self.config or {"bgp-peers": {}}
 		state = cfg.copy()
-		bgp_proto = None
-		ospf_proto = None
-		# "with"-context-manager for Popen not available in python < 3.2
-		birdc = subprocess.Popen([self.birdcli, "show", "protocols", "all"], \
-				stdout=subprocess.PIPE)
-		output = birdc.communicate()[0]
-		if birdc.returncode != 0:
-			print("ERROR: bird-CLI %s failed: %i"%(self.birdcli, birdc.returncode))
-		for line in output.split("\n"):
-			match = self._re_birdcli_bgp_begin.search(line)
-			if match:
-				bgp_proto = match.group(1)
-				state["bgp-peers"][bgp_proto] = {}
-				timestamp = int(match.group(2))
-				if not state["bgp-peers"].has_key(bgp_proto):
-					print("WARNING: proto \"%s\" not in config, skipping"%bgp_proto)
-					continue
-				state["bgp-peers"][bgp_proto]["bgpPeerFsmEstablishedTime"] = SnmpGauge32(current_time - timestamp)
-			if bgp_proto:
-				for peerprop_name, peerprop_re in self._re_birdcli_bgp_peer.items():
-					match = peerprop_re.search(line)
-					if match:
-						if peerprop_name == 'bgpPeerState':
-							state["bgp-peers"][bgp_proto][peerprop_name] = \
-									self.bgp_states[match.group(1).lower()]
-						elif peerprop_name in [
-								'bgpPeerIdentifier',
-								'bgpPeerLocalAddr',
-								'bgpPeerRemoteAddr']:
-							state["bgp-peers"][bgp_proto][peerprop_name] = SnmpIpAddress(match.group(1))
-						elif peerprop_name in [
-								'bgpPeerInUpdates', 
-								'bgpPeerOutUpdates']:
-							state["bgp-peers"][bgp_proto][peerprop_name] = SnmpCounter32(match.group(1))
-						else:
-							state["bgp-peers"][bgp_proto][peerprop_name] = int(match.group(1))
-			if self._re_birdcli_bgp_end.search(line):
-				bgp_proto = None
-
-		# use netstat to query for tcp:179 connections
-		bgp_sessions = {}
-		netstat = subprocess.Popen( \
-				"%s | grep '^tcp.*:179.*ESTABLISHED'"%self.netstatcmd,
-				shell=True, stdout=subprocess.PIPE)
-		for line in netstat.communicate()[0].split("\n"):
-			match = self._re_netstat.search(line)
-			if not match:
-				continue
-			# key 4-tuples by remote ip: src-addr, src-port, dst-addr, dst-port
-			bgp_sessions[match.group(3)] = match.groups()
+		state["bgp-peers"] = dict((proto, peer.copy()) for proto, peer in cfg["bgp-peers"].items())
+		state["failed"] = failed
+		try:
+			protocols = self.getBGPProtocols(current_time, partial)
+			changed = self.bgp_changed
+		except SourceTimeout as e:
+			self.timedOut("bird", e)
+			failed.add("bird")
+			protocols = self.bgp_protocols
+			changed = {} if partial else None
+		for proto, peer in protocols.items():
+			state["bgp-peers"][proto] = peer.copy()
+		if changed is not None:
+			changed = dict((proto, (peer or cfg["bgp-peers"].get(proto) or {}).get("bgpPeerRemoteAddr"))
+					for proto, peer in changed.items())
+		state["changed"] = changed
+
+		# query the kernel's socket tables (or netstat) for tcp:179 connections
+		try:
+			bgp_sessions = self.procTcpSessions(179)
+			if bgp_sessions is None:
+				bgp_sessions = self.netstatSessions()
+			self.bgp_sessions = bgp_sessions
+		except SourceTimeout as e:
+			self.timedOut("sessions", e)
+			failed.add("sessions")
+			bgp_sessions = self.bgp_sessions
 
 		# now match the tcp:179 4-tuples with bgp-state,
 		# and enrich state by local+remote ports
 		for proto in state["bgp-peers"].keys():
 			state["bgp-peers"][proto]["bgpPeerLocalPort"] = 0
 			state["bgp-peers"][proto]["bgpPeerRemotePort"] = 0
-			if not bgp_sessions.has_key(state["bgp-peers"][proto]["bgpPeerRemoteAddr"]):
+			if not state["bgp-peers"][proto].get("bgpPeerRemoteAddr") in bgp_sessions:
 				# print("INFO: proto %s has no bgp session."%proto)
 				continue
 			srcip,srcport,dstip,dstport = bgp_sessions[state["bgp-peers"][proto]["bgpPeerRemoteAddr"]]
@@ -292,5 +1054,227 @@ class BirdAgent:
 			state["bgp-peers"][proto]["bgpPeerLocalPort"] = int(srcport)
 			state["bgp-peers"][proto]["bgpPeerRemotePort"] = int(dstport)
 
+		# the routing table, every route_interval (not on partial refreshes)
+		if self.route_interval and not partial and current_time - self.last_routes >= self.route_interval:
+			peers = dict((proto, ipInt(peer.get("bgpPeerRemoteAddr")))
+					for proto, peer in state["bgp-peers"].items()
+					if isinstance(peer.get("bgpPeerRemoteAddr"), SnmpIpAddress))
+			try:
+				self.routes = self.getRoutes(peers)
+				self.last_routes = current_time
+			except SourceTimeout as e:
+				self.timedOut("routes", e)
+				failed.add("routes")
+		state["bgp4-paths"] = self.routes
 		return state
+
+	def getState(self, bgp=True, ospf_instance=None, partial=False):
+		"""
+		one refresh cycle of the enabled MIBs: the first queries of
+		getBGPState and getOSPFState are sent together (see prefetch),
+		returns {"bgp": BGP state, "ospf": OSPF state}
+		"""
+		current_time = int(time.time())
+		commands = []
+		if bgp:
+			commands.extend(self.bgpCommands(current_time, partial))
+		if ospf_instance:
+			commands.append(("show", "ospf", "neighbors", ospf_instance))
+		self.prefetch(commands)
+		state = {}
+		try:
+			if bgp:
+				state["bgp"] = self.getBGPState(current_time, partial)
+			if ospf_instance:
+				state["ospf"] = self.getOSPFState(ospf_instance, current_time)
+		finally:
+			# replies not consumed must not answer the next cycle
+			self.prefetched = {}
+		return state
+
+
+class BirdWatcher(threading.Thread):
+	"""
+	polls the protocol summary of bird (a BirdAgent or BirdCollector,
+	see watchProtocols) every interval seconds and calls changed(names)
+	with the protocols whose state changed
+	"""
+
+	def __init__(self, bird, interval, changed):
+		threading.Thread.__init__(self, name="bird-watcher")
+		self.daemon = True
+		self.bird = bird
+		self.interval = interval
+		self.changed = changed
+		self.running = True
+
+	def run(self):
+		while self.running:
+			changed = self.bird.watchProtocols()
+			if changed:
+				print("INFO: protocols changed: %s"%" ".join(sorted(changed)))
+				self.changed(changed)
+			time.sleep(self.interval)
+
+	def stop(self):
+		self.running = False
+
+
+class BirdCollector:
+	"""
+	several bird daemons (bird and bird6, per-VRF or per-netns
+	instances) queried in parallel, one thread per daemon, so a
+	refresh takes as long as the slowest daemon and not the sum;
+	the results are merged. offers the query methods of BirdAgent
+	the agents use, so it can take a BirdAgent's place.
+	"""
+
+	def __init__(self, agents):
+		# [(name, BirdAgent)]
+		self.agents = agents
+		self.route_limit = None
+		# merged routing tables, by the tables merged
+		self.routes = (None, None)
+
+	@staticmethod
+	def fromSpec(spec, birdcli, netstatcmd="netstat -na", full_resync=None, deadlines=None,
+			route_interval=None, route_limit=None, route_workers=None, shards=None, shard_sessions=None,
+			lsdb_interval=None, poll_summary=False):
+		"""
+		collector for a BIRDINSTANCES specification: whitespace separated
+		NAME:CONFIGFILE:SOCKET entries, e.g.
+		"bird:/etc/bird/bird.conf:/run/bird/bird.ctl bird6:/etc/bird/bird6.conf:/run/bird/bird6.ctl"
+		"""
+		agents = []
+		for entry in spec.split():
+			try:
+				name, cfgfile, birdsocket = entry.split(":", 2)
+			except ValueError:
+				raise ValueError("invalid bird instance (NAME:CONFIGFILE:SOCKET): %s"%entry)
+			agents.append((name, BirdAgent(cfgfile, birdcli, netstatcmd, birdsocket, full_resync, deadlines,
+					route_interval, route_limit, route_workers, shards, shard_sessions, lsdb_interval,
+					poll_summary)))
+		collector = BirdCollector(agents)
+		collector.route_limit = route_limit
+		return collector
+
+	def parallel(self, method, *args):
+		"""
+		call method on all agents at once, return [(name, result)];
+		a failing daemon is reported and left out
+		"""
+		results = {}
+		def run(name, agent):
+			try:
+				results[name] = getattr(agent, method)(*args)
+			except Exception as e:
+				print("ERROR: bird instance %s: %s failed: %s"%(name, method, e))
+		threads = [threading.Thread(target=run, args=agent) for agent in self.agents]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		return [(name, results[name]) for name, agent in self.agents if name in results]
+
+	@staticmethod
+	def mergeBGPStates(states):
+		"""
+		one BGP state of several; protocols are renamed to NAME/PROTOCOL
+		as the daemons may use the same protocol names
+		"""
+		merged = {"bgp-peers": {}, "failed": set()}
+		for name, state in states:
+			for key, value in state.items():
+				if key == "bgp-peers":
+					for proto, peer in value.items():
+						merged["bgp-peers"]["%s/%s"%(name, proto)] = peer
+				elif key == "failed":
+					merged[key].update(value)
+				elif key == "changed":
+					if value is None or merged.get(key, {}) is None:
+						merged[key] = None
+					else:
+						merged.setdefault(key, {}).update(
+								("%s/%s"%(name, proto), address) for proto, address in value.items())
+				elif key == "bgp4-paths":
+					merged.setdefault(key, []).append(value)
+				elif not key in merged:
+					merged[key] = value
+				elif key == "bgpLocalAs" and merged[key] != value:
+					print("WARNING: multiple local AS: %i/%i"%(merged[key], value))
+		return merged
+
+	@staticmethod
+	def mergeOSPFStates(states):
+		merged = {"ospf-neighbors": {}}
+		lsdbs = []
+		for name, state in states:
+			merged["ospf-neighbors"].update(state["ospf-neighbors"])
+			if state.get("ospf-lsdb") is not None:
+				lsdbs.append(state["ospf-lsdb"])
+		merged["ospf-lsdb"] = LsdbTable.merge(lsdbs) if lsdbs else None
+		return merged
+
+	def invalidateConfig(self):
+		for name, agent in self.agents:
+			agent.invalidateConfig()
+
+	def watchProtocols(self):
+		changed = set()
+		for name, agent in self.agents:
+			changed.update("%s/%s"%(name, proto) for proto in agent.watchProtocols())
+		return changed
+
+	def mergeRoutes(self, state):
+		"""
+		one routing table of the daemons' tables in a merged state; the
+		merge is redone only when one of them was fetched again
+		"""
+		if not "bgp4-paths" in state:
+			return state
+		tables = [table for table in state["bgp4-paths"] if table is not None]
+		if self.routes[0] != tables:
+			self.routes = (tables, RouteTable.merge(tables, self.route_limit) if tables else None)
+		state["bgp4-paths"] = self.routes[1]
+		return state
+
+	def mergedBGPState(self, states):
+		"""
+		merged BGP state of the daemons' states; a daemon whose refresh
+		failed as a whole is missing from it, as are its peers
+		"""
+		state = self.mergeRoutes(self.mergeBGPStates(states))
+		if len(states) < len(self.agents):
+			state["failed"].add("bird")
+			# its peers are to be dropped
+			state["changed"] = None
+		return state
+
+	def status(self):
+		"""
+		{"time": ..., "instances": {name: BirdAgent.status()}}
+		"""
+		return {
+			"time": int(time.time()),
+			"instances": dict((name, agent.status()) for name, agent in self.agents),
+		}
+
+	def writeStatus(self, filename):
+		writeStatus(filename, self.status())
+
+	def getBGPState(self, partial=False):
+		return self.mergedBGPState(self.parallel("getBGPState", None, partial))
+
+	def getOSPFState(self, ospf_instance):
+		return self.mergeOSPFStates(self.parallel("getOSPFState", ospf_instance))
+
+	def getState(self, bgp=True, ospf_instance=None, partial=False):
+		states = self.parallel("getState", bgp, ospf_instance, partial)
+		state = {}
+		if bgp:
+			state["bgp"] = self.mergedBGPState([(name, s["bgp"]) for name, s in states])
+		if ospf_instance:
+			state["ospf"] = self.mergeOSPFStates([(name, s["ospf"]) for name, s in states])
+		return state
+
 # vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+birdlsdb - the link state database of a bird OSPF instance for
+	ospfLsdbTable (RFC 4750): a streaming parser of `show ospf lsadb`
+	and a compact table of the area-scope LSAs, sorted by the table
+	index (area, type, LS id, router id)
+"""
+
+import re, bisect, array, itertools
+
+from birdroutes import ipInt, ipOctets, ipText, KEY, WORD
+from adv_agentx import SnmpIpAddress
+
+class LsdbParser:
+	"""
+	`show ospf lsadb` output to LSAs, line by line
+	"""
+
+	#  Type   LS ID           Router          Sequence   Age  Checksum
+	#  0001  10.1.1.1        10.1.1.1        80000005    120    c2a8
+	_re_lsa = re.compile("^\s*([0-9a-fA-F]{4})\s+(\S+)\s+(\S+)\s+([0-9a-fA-F]{8})\s+([0-9]+)\s+([0-9a-fA-F]{4})\s*$")
+
+	@staticmethod
+	def parse(lines):
+		"""
+		yield (area, type, LS id, router id, sequence, age, checksum)
+		for the LSAs of the "Area" sections, addresses as ints; those
+		of AS scope ("Global", see ospfAsLsdbTable) and link scope are
+		left out. lines may be a stream, nothing is buffered.
+		"""
+		area = None
+		for line in lines:
+			match = LsdbParser._re_lsa.match(line)
+			if match:
+				if area is None:
+					continue
+				lsid, router = ipInt(match.group(2)), ipInt(match.group(3))
+				if lsid is None or router is None:
+					continue
+				# the function code of OSPFv3 style types (scope bits cleared)
+				yield (area, int(match.group(1), 16) & 0x1fff, lsid, router,
+					int(match.group(4), 16), int(match.group(5)), int(match.group(6), 16))
+				continue
+			words = line.split()
+			if len(words) == 2 and words[0] == "Area":
+				area = ipInt(words[1])
+			elif words and words[0] in ("Global", "Link"):
+				area = None
+
+class LsdbTable:
+	"""
+	LSAs in parallel arrays, sorted by (area, type, LS id, router id):
+	the (area, type) segments in a sorted list with the row each one
+	starts at, a 64 bit key (LS id << 32 | router id) per LSA, sorted
+	within its segment, and its sequence, age and checksum. rows are
+	also kept in the order of the output (dumped), so a refresh that
+	finds the same LSAs only replaces their values; 20 bytes per LSA.
+	"""
+
+	# ospfLsdbEntry columns (not ospfLsdbAdvertisement, bird does not show it)
+	columns = range(1, 8)
+
+	def __init__(self):
+		self.segments = []
+		self.starts = [0]
+		self.keys = array.array(KEY)
+		self.sequences = array.array(WORD)
+		self.ages = array.array("H")
+		self.checksums = array.array("H")
+		# row of each LSA in output order
+		self.dumped = array.array(WORD)
+
+	def __len__(self):
+		return len(self.keys)
+
+	@staticmethod
+	def build(lsas):
+		"""
+		table of the LSAs yielded by LsdbParser.parse; of LSAs with the
+		same index the first is kept
+		"""
+		lsas = list(lsas)
+		table = LsdbTable()
+		table.starts = []
+		rows = [0] * len(lsas)
+		last = None
+		for n in sorted(range(len(lsas)), key=lambda n: lsas[n][:4]):
+			area, kind, lsid, router, sequence, age, checksum = lsas[n]
+			if lsas[n][:4] == last:
+				rows[n] = len(table.keys) - 1
+				continue
+			if last is None or (area, kind) != last[:2]:
+				table.segments.append((area, kind))
+				table.starts.append(len(table.keys))
+			last = lsas[n][:4]
+			rows[n] = len(table.keys)
+			table.keys.append(lsid << 32 | router)
+			table.sequences.append(sequence)
+			table.ages.append(age)
+			table.checksums.append(checksum)
+		table.starts.append(len(table.keys))
+		table.dumped = array.array(WORD, rows)
+		return table
+
+	@staticmethod
+	def refresh(previous, lsas):
+		"""
+		table of the LSAs yielded by LsdbParser.parse: if they are those
+		of previous (a table or None) in the same order, as long as
+		only sequences, ages and checksums change, previous's index is
+		shared and only these are new; otherwise the table is built
+		again. previous is not modified.
+		"""
+		if previous is None:
+			return LsdbTable.build(lsas)
+		table = LsdbTable()
+		table.segments, table.starts, table.keys, table.dumped = \
+				previous.segments, previous.starts, previous.keys, previous.dumped
+		table.sequences = array.array(WORD, previous.sequences)
+		table.ages = array.array("H", previous.ages)
+		table.checksums = array.array("H", previous.checksums)
+		count = 0
+		for lsa in lsas:
+			row = previous.dumped[count] if count < len(previous.dumped) else None
+			if row is None or previous.lsa(row) != lsa[:4]:
+				# the LSAs changed: the ones so far and the rest
+				return LsdbTable.build(itertools.chain(
+					(table.lsa(table.dumped[n]) + table.values(table.dumped[n]) for n in range(count)),
+					[lsa], lsas))
+			table.sequences[row], table.ages[row], table.checksums[row] = lsa[4:]
+			count += 1
+		if count != len(previous.dumped):
+			return LsdbTable.build(table.lsa(table.dumped[n]) + table.values(table.dumped[n]) for n in range(count))
+		return table
+
+	@staticmethod
+	def merge(tables):
+		"""
+		one table of the LSAs of several (e.g. of several bird daemons)
+		"""
+		tables = [table for table in tables if table is not None]
+		if len(tables) == 1:
+			return tables[0]
+		return LsdbTable.build(table.lsa(row) + table.values(row)
+				for table in tables for row in range(len(table)))
+
+	def lsa(self, row):
+		"""
+		(area, type, LS id, router id) of a row
+		"""
+		segment = bisect.bisect_right(self.starts, row) - 1
+		key = self.keys[row]
+		return self.segments[segment] + (key >> 32, key & 0xffffffff)
+
+	def values(self, row):
+		return (self.sequences[row], self.ages[row], self.checksums[row])
+
+	def index(self, row):
+		"""
+		table index (area, type, LS id, router id subids) of a row
+		"""
+		area, kind, lsid, router = self.lsa(row)
+		return ipOctets(area) + (kind,) + ipOctets(lsid) + ipOctets(router)
+
+	def find(self, index):
+		"""
+		row of an index tuple, or None
+		"""
+		if len(index) != 13 or not all(0 <= i < 256 for i in index):
+			return None
+		area = index[0] << 24 | index[1] << 16 | index[2] << 8 | index[3]
+		segment = bisect.bisect_left(self.segments, (area, index[4]))
+		if segment == len(self.segments) or self.segments[segment] != (area, index[4]):
+			return None
+		lsid = index[5] << 24 | index[6] << 16 | index[7] << 8 | index[8]
+		router = index[9] << 24 | index[10] << 16 | index[11] << 8 | index[12]
+		key = lsid << 32 | router
+		row = bisect.bisect_left(self.keys, key, self.starts[segment], self.starts[segment + 1])
+		if row < self.starts[segment + 1] and self.keys[row] == key:
+			return row
+		return None
+
+	def successor(self, index):
+		"""
+		first row whose index follows index (any tuple of subids)
+		"""
+		low, high = 0, len(self.keys)
+		while low < high:
+			middle = (low + high) // 2
+			if self.index(middle) <= index:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+
+	def value(self, row, column):
+		"""
+		value of an ospfLsdbEntry column of a row
+		"""
+		if column == 5:
+			# Integer32: sequence numbers from 0x80000001 are negative
+			sequence = self.sequences[row]
+			return sequence - (1 << 32) if sequence & 0x80000000 else sequence
+		if column == 6:
+			return self.ages[row]
+		if column == 7:
+			return self.checksums[row]
+		area, kind, lsid, router = self.lsa(row)
+		if column == 1:
+			return SnmpIpAddress(ipText(area))
+		if column == 2:
+			return kind
+		if column == 3:
+			return SnmpIpAddress(ipText(lsid))
+		return SnmpIpAddress(ipText(router))
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,460 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+birdroutes - the BGP paths of bird's routing table for bgp4PathAttrTable
+	(RFC 4273): a streaming parser of `show route all` and a compact
+	table of the paths, sorted by the table index (prefix, prefix
+	length, peer) for O(log n) GET and GETNEXT
+"""
+
+import re, socket, struct, bisect, array, collections, threading, multiprocessing
+
+from adv_agentx import AgentXViewTable
+from adv_agentx import SnmpIpAddress
+
+def _typecode(candidates, size):
+	for typecode in candidates:
+		try:
+			if array.array(typecode).itemsize >= size:
+				return typecode
+		except ValueError:
+			pass
+	raise ValueError("no array type of %d bytes"%size)
+
+# array types of 64 bit keys and 32 bit attribute set ids
+KEY = _typecode("QL", 8)
+WORD = _typecode("IL", 4)
+
+def ipInt(address):
+	"""
+	IPv4 address text to int, None for anything else
+	"""
+	try:
+		return struct.unpack("!I", socket.inet_aton(address))[0]
+	except (socket.error, struct.error, TypeError):
+		return None
+
+def ipOctets(value):
+	return (value >> 24, (value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff)
+
+def ipText(value):
+	return "%d.%d.%d.%d"%ipOctets(value)
+
+class RouteParser:
+	"""
+	`show route all` output to BGP paths, line by line
+	"""
+
+	# route header: [prefix] ... [protocol since [from address]] [*] ...
+	_re_route = re.compile("^(\S+)?\s+.*?\[([^\s\]]+)[^\]]*\](\s+\*)?")
+
+	origins = {"igp": 1, "egp": 2, "incomplete": 3}
+
+	# as path segment types
+	AS_SET = 1
+	AS_SEQUENCE = 2
+	# 4 octet AS numbers in 2 octet fields (RFC 6793)
+	AS_TRANS = 23456
+
+	@staticmethod
+	def asPathSegments(value):
+		"""
+		bgp4PathAttrASPathSegment octets of an as path as bird prints
+		it, e.g. "65001 65002 {65003 65004}"; at most 255 octets
+		"""
+		segments = []
+		kind, members = None, []
+		for token in value.replace("{", " { ").replace("}", " } ").split():
+			if token in ("{", "}"):
+				if members:
+					segments.append((kind, members))
+				kind, members = (RouteParser.AS_SET if token == "{" else None), []
+				continue
+			try:
+				asn = int(token)
+			except ValueError:
+				continue
+			members.append(asn if asn < 65536 else RouteParser.AS_TRANS)
+		if members:
+			segments.append((kind, members))
+		octets = bytearray()
+		for kind, members in segments:
+			for i in range(0, len(members), 255):
+				chunk = members[i:i + 255]
+				octets.append(kind or RouteParser.AS_SEQUENCE)
+				octets.append(len(chunk))
+				for asn in chunk:
+					octets.extend((asn >> 8, asn & 0xff))
+		return bytes(octets[:255])
+
+	@staticmethod
+	def communities(value):
+		"""
+		communities as bird prints them, e.g. "(65000,1) (65000,2)",
+		as a tuple of ints (AS << 16 | value)
+		"""
+		communities = []
+		for community in value.replace("(", " ").replace(")", " ").split():
+			asn, comma, number = community.partition(",")
+			if asn.isdigit() and number.isdigit():
+				communities.append(int(asn) << 16 | int(number))
+		return tuple(communities)
+
+	@staticmethod
+	def chunks(lines, size):
+		"""
+		the lines joined into texts of about size lines, each cut
+		before a route header with a prefix (the paths of a prefix
+		stay together)
+		"""
+		chunk = []
+		for line in lines:
+			if len(chunk) >= size and line[:1] not in ("", " ", "\t"):
+				yield "\n".join(chunk)
+				chunk = []
+			chunk.append(line)
+		if chunk:
+			yield "\n".join(chunk)
+
+	@staticmethod
+	def parse(lines):
+		"""
+		yield (prefix, length, protocol, best, attributes) for every path
+		of an IPv4 prefix as soon as its block is complete; attributes
+		is the tuple (origin, as path octets, next hop, med, local pref,
+		atomic aggregate, aggregator AS, aggregator address, communities)
+		with addresses as ints, missing med and local pref as -1 and
+		missing aggregators as 0. lines may be a stream (see
+		BirdAgent.birdCommand), nothing is buffered but one path.
+		"""
+		route = None
+		prefix = length = None
+		for line in lines:
+			if not line.strip():
+				continue
+			if line[0] not in " \t" or "[" in line and not line.lstrip().startswith("BGP."):
+				match = RouteParser._re_route.match(line)
+				if not match:
+					continue
+				if route:
+					yield tuple(route[:4]) + (tuple(route[4:]),)
+					route = None
+				if match.group(1) and "/" in match.group(1):
+					address, slash, bits = match.group(1).partition("/")
+					prefix, length = ipInt(address), int(bits) if bits.isdigit() else None
+				if prefix is None or length is None:
+					continue
+				# defaults of a path without BGP attributes
+				route = [prefix, length, match.group(2), bool(match.group(3)),
+						3, b"", 0, -1, -1, 1, 0, 0, ()]
+				continue
+			if route is None:
+				continue
+			keyword, colon, value = line.strip().partition(":")
+			value = value.strip()
+			if keyword == "BGP.origin":
+				route[4] = RouteParser.origins.get(value.lower(), 3)
+			elif keyword == "BGP.as_path":
+				route[5] = RouteParser.asPathSegments(value)
+			elif keyword == "BGP.next_hop":
+				route[6] = ipInt(value.split()[0]) or 0 if value else 0
+			elif keyword == "BGP.med" and value.isdigit():
+				route[7] = min(int(value), 0x7fffffff)
+			elif keyword == "BGP.local_pref" and value.isdigit():
+				route[8] = min(int(value), 0x7fffffff)
+			elif keyword == "BGP.atomic_aggr":
+				route[9] = 2
+			elif keyword == "BGP.aggregator":
+				fields = value.split()
+				if len(fields) == 2 and fields[1].upper().startswith("AS") and fields[1][2:].isdigit():
+					route[10] = min(int(fields[1][2:]), 0xffff)
+					route[11] = ipInt(fields[0]) or 0
+			elif keyword == "BGP.community":
+				route[12] = RouteParser.communities(value)
+		if route:
+			yield tuple(route[:4]) + (tuple(route[4:]),)
+
+class RouteTable:
+	"""
+	BGP paths in parallel arrays, sorted by (prefix, length, peer):
+	a 64 bit key per path (prefix << 24 | length << 16 | peer rank,
+	peers ranked by address, so the key order is the table's index
+	order), its best flag and the id of its attribute set. the
+	attribute sets (see RouteParser.parse) repeat across many
+	prefixes and are stored once each, as are their as paths and
+	community sets; a path costs 13 bytes in the arrays.
+	"""
+
+	# positions in an attribute set
+	ORIGIN, ASPATH, NEXTHOP, MED, LOCALPREF, ATOMIC, AGGREGATOR_AS, \
+		AGGREGATOR_ADDR, COMMUNITIES = range(9)
+
+	def __init__(self, peers=()):
+		self.keys = array.array(KEY)
+		self.best = array.array("B")
+		self.attrs = array.array(WORD)
+		# attribute sets by id
+		self.attributes = []
+		# peer addresses (ints) by rank
+		self.peers = sorted(set(peer for peer in peers if peer is not None))[:0x10000]
+		# paths left out (limit, duplicates, unknown protocols)
+		self.dropped = 0
+		# while building: ids of the attribute sets, the shared as paths
+		# and community sets
+		self.interned = ({}, {}, {})
+
+	def __len__(self):
+		return len(self.keys)
+
+	def ranks(self, peers):
+		"""
+		the peer ranks of the protocols of peers (names to addresses)
+		"""
+		rank = dict((peer, n) for n, peer in enumerate(self.peers))
+		return dict((protocol, rank[peer]) for protocol, peer in peers.items() if peer in rank)
+
+	def intern(self, attributes):
+		"""
+		id of an attribute set, added if new
+		"""
+		ids, aspaths, communities = self.interned
+		setid = ids.get(attributes)
+		if setid is None:
+			aspath = aspaths.setdefault(attributes[RouteTable.ASPATH], attributes[RouteTable.ASPATH])
+			community = communities.setdefault(attributes[RouteTable.COMMUNITIES],
+					attributes[RouteTable.COMMUNITIES])
+			attributes = attributes[:RouteTable.ASPATH] + (aspath,) + \
+					attributes[RouteTable.ASPATH + 1:RouteTable.COMMUNITIES] + (community,)
+			setid = ids[attributes] = len(self.attributes)
+			self.attributes.append(attributes)
+		return setid
+
+	def add(self, routes, ranks, limit=None):
+		"""
+		add the paths yielded by RouteParser.parse, ranks mapping the
+		protocol names to peer ranks (see ranks); paths of other
+		protocols are left out, as are those beyond limit
+		"""
+		keys, best, attrs, intern = self.keys, self.best, self.attrs, self.intern
+		for prefix, length, protocol, selected, attributes in routes:
+			rank = ranks.get(protocol)
+			if rank is None or limit and len(keys) >= limit:
+				self.dropped += 1
+				continue
+			keys.append(prefix << 24 | length << 16 | rank)
+			best.append(selected)
+			attrs.append(intern(attributes))
+
+	def addBatch(self, batch, limit=None):
+		"""
+		add the paths of a batch of parseBatch
+		"""
+		keys, best, attrs, sets, dropped = batch
+		room = len(keys) if not limit else max(0, min(len(keys), limit - len(self.keys)))
+		if room < len(keys):
+			# only the sets of the paths within the limit
+			used = set(attrs[:room])
+			ids = [self.intern(attributes) if setid in used else None for setid, attributes in enumerate(sets)]
+		else:
+			ids = [self.intern(attributes) for attributes in sets]
+		self.keys.extend(keys[:room])
+		self.best.extend(best[:room])
+		self.attrs.extend(array.array(WORD, [ids[setid] for setid in attrs[:room]]))
+		self.dropped += dropped + len(keys) - room
+
+	@staticmethod
+	def build(routes, peers, limit=None):
+		"""
+		table of the paths yielded by RouteParser.parse, peers mapping
+		protocol names to peer addresses (ints); paths of other
+		protocols are left out, as are those beyond limit
+		"""
+		table = RouteTable(peers.values())
+		table.add(routes, table.ranks(peers), limit)
+		table.sort()
+		return table
+
+	@staticmethod
+	def buildParallel(lines, peers, pool, workers, limit=None, size=20000):
+		"""
+		build of the `show route all` output lines, parsed by a process
+		pool of workers: the output is cut into chunks of about size
+		lines at prefix boundaries, the workers return their paths as
+		batches (see parseBatch), which are added in the output order
+		"""
+		table = RouteTable(peers.values())
+		ranks = table.ranks(peers)
+		chunks = RouteParser.chunks(lines, size)
+		pending = collections.deque()
+		try:
+			for text in chunks:
+				pending.append(pool.apply_async(parseBatch, (text, ranks)))
+				while len(pending) > 2 * workers:
+					table.addBatch(pending.popleft().get(), limit)
+			while pending:
+				table.addBatch(pending.popleft().get(), limit)
+		finally:
+			# on a failure (e.g. of a worker) the query is aborted, so the
+			# rest of the output cannot answer the next one, and the
+			# batches under way are waited for and dropped
+			chunks.close()
+			if hasattr(lines, "close"):
+				lines.close()
+			while pending:
+				pending.popleft().wait()
+		table.sort()
+		return table
+
+	def sort(self):
+		"""
+		sort the paths by key; of paths with the same index the first
+		is kept
+		"""
+		self.interned = None
+		keys = self.keys
+		order = sorted(range(len(keys)), key=keys.__getitem__)
+		unique = [i for n, i in enumerate(order) if not n or keys[i] != keys[order[n - 1]]]
+		self.dropped += len(order) - len(unique)
+		del order
+		for name in ("keys", "best", "attrs"):
+			column = getattr(self, name)
+			setattr(self, name, array.array(column.typecode, [column[i] for i in unique]))
+
+	def rows(self):
+		"""
+		the paths again as RouteParser.parse yields them, with the peer
+		address (int) in place of the protocol
+		"""
+		for row in range(len(self.keys)):
+			key = self.keys[row]
+			yield (key >> 24, (key >> 16) & 0xff, self.peers[key & 0xffff], self.best[row],
+				self.attributes[self.attrs[row]])
+
+	@staticmethod
+	def merge(tables, limit=None):
+		"""
+		one table of the paths of several (e.g. of several bird daemons)
+		"""
+		tables = [table for table in tables if table is not None]
+		if len(tables) == 1:
+			return tables[0]
+		peers = {}
+		for table in tables:
+			peers.update((peer, peer) for peer in table.peers)
+		def rows():
+			for table in tables:
+				for row in table.rows():
+					yield row
+		return RouteTable.build(rows(), peers, limit)
+
+	def index(self, row):
+		"""
+		table index (prefix, length, peer subids) of a row
+		"""
+		key = self.keys[row]
+		return ipOctets(key >> 24) + ((key >> 16) & 0xff,) + ipOctets(self.peers[key & 0xffff])
+
+	def find(self, index):
+		"""
+		row of an index tuple, or None
+		"""
+		if len(index) != 9 or not all(0 <= i < 256 for i in index):
+			return None
+		peer = index[5] << 24 | index[6] << 16 | index[7] << 8 | index[8]
+		rank = bisect.bisect_left(self.peers, peer)
+		if rank == len(self.peers) or self.peers[rank] != peer:
+			return None
+		prefix = index[0] << 24 | index[1] << 16 | index[2] << 8 | index[3]
+		key = prefix << 24 | index[4] << 16 | rank
+		row = bisect.bisect_left(self.keys, key)
+		if row < len(self.keys) and self.keys[row] == key:
+			return row
+		return None
+
+	def successor(self, index):
+		"""
+		first row whose index follows index (any tuple of subids)
+		"""
+		low, high = 0, len(self.keys)
+		while low < high:
+			middle = (low + high) // 2
+			if self.index(middle) <= index:
+				low = middle + 1
+			else:
+				high = middle
+		return low
+
+	# bgp4PathAttrEntry columns
+	columns = range(1, 15)
+
+	def value(self, row, column):
+		"""
+		value of a bgp4PathAttrEntry column of a row
+		"""
+		key = self.keys[row]
+		if column == 1:
+			return SnmpIpAddress(ipText(self.peers[key & 0xffff]))
+		if column == 2:
+			return (key >> 16) & 0xff
+		if column == 3:
+			return SnmpIpAddress(ipText(key >> 24))
+		if column == 13:
+			return 2 if self.best[row] else 1
+		if column == 14:
+			return b""
+		attributes = self.attributes[self.attrs[row]]
+		if column == 4:
+			return attributes[RouteTable.ORIGIN]
+		if column == 5:
+			return attributes[RouteTable.ASPATH]
+		if column == 6:
+			return SnmpIpAddress(ipText(attributes[RouteTable.NEXTHOP]))
+		if column == 7:
+			return attributes[RouteTable.MED]
+		if column in (8, 12):
+			return attributes[RouteTable.LOCALPREF]
+		if column == 9:
+			return attributes[RouteTable.ATOMIC]
+		if column == 10:
+			return attributes[RouteTable.AGGREGATOR_AS]
+		return SnmpIpAddress(ipText(attributes[RouteTable.AGGREGATOR_ADDR]))
+
+def parseBatch(text, ranks):
+	"""
+	(worker) the paths of a chunk of `show route all` output as a
+	batch: their keys, best flags and attribute set ids (arrays, as
+	compact pickled), the attribute sets and the paths left out
+	"""
+	batch = RouteTable()
+	batch.add(RouteParser.parse(text.split("\n")), ranks)
+	return batch.keys, batch.best, batch.attrs, batch.attributes, batch.dropped
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def workerPool(workers):
+	"""
+	the process pool of RouteTable.buildParallel, started on first use
+	and shared; its workers are started by a fork server where
+	available, not forked from the threads of the agent
+	"""
+	global _pool
+	with _pool_lock:
+		if _pool is None:
+			context = multiprocessing
+			if hasattr(multiprocessing, "get_context") and "forkserver" in multiprocessing.get_all_start_methods():
+				context = multiprocessing.get_context("forkserver")
+			_pool = context.Pool(workers)
+		return _pool
+
+class PathAttrTable(AgentXViewTable):
+	"""
+	bgp4PathAttrTable view of a RouteTable for AgentXData
+	"""
+	__slots__ = []
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,177 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+birdsocket - client for the control socket of the bird routing daemon
+	speaks the numbered reply-code protocol of bird.ctl directly,
+	so no birdc process has to be spawned per query
+"""
+
+import socket, errno, time
+
+class BirdSocket:
+	"""
+	long-lived connection to bird's control socket
+
+	replies are returned as the lines birdc would print for them, so the
+	output parsers in birdagent work unchanged on either source.
+	the connection is (re)established on demand; a command that fails
+	because the connection broke is retried once on a fresh connection.
+	a command given a deadline (seconds for the whole reply) raises
+	socket.timeout when bird misses it; the connection is dropped then,
+	as the rest of the reply would answer the next command. the same
+	goes for a reply that is not read to its end (its consumer stopped
+	early or failed).
+	"""
+
+	def __init__(self, path="/var/run/bird/bird.ctl", timeout=None):
+		self.path = path
+		self.timeout = timeout
+		self.sock = None
+		self.buf = b""
+		# absolute time the current reply must be complete by, or None
+		self.deadline = None
+
+	def connect(self):
+		self.close()
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.settimeout(self.timeout)
+		try:
+			sock.connect(self.path)
+		except socket.error:
+			sock.close()
+			raise
+		self.sock = sock
+		# welcome message: "0001 BIRD x.y.z ready."
+		for line in self._readReply():
+			pass
+
+	def close(self):
+		if self.sock:
+			try:
+				self.sock.close()
+			except socket.error:
+				pass
+		self.sock = None
+		self.buf = b""
+
+	def _readLine(self):
+		while True:
+			pos = self.buf.find(b"\n")
+			if pos >= 0:
+				line, self.buf = self.buf[:pos], self.buf[pos+1:]
+				if not isinstance(line, str):
+					line = line.decode("utf-8", "replace")
+				return line
+			if self.deadline is not None:
+				remaining = self.deadline - time.time()
+				if remaining <= 0:
+					raise socket.timeout("bird missed the deadline")
+				self.sock.settimeout(remaining if self.timeout is None else min(self.timeout, remaining))
+			data = self.sock.recv(65536)
+			if not data:
+				raise socket.error(errno.ECONNRESET, "bird closed the control connection")
+			self.buf += data
+
+	def _readReply(self):
+		"""
+		yield the lines of one reply as birdc prints them:
+		* "NNNN-text" and "NNNN text" yield text (nothing for code 0000)
+		* " text" continues the previous code and yields text
+		* "+text" is an asynchronous message and is skipped
+		a line with a space after the code ends the reply;
+		codes 8xxx/9xxx are errors (runtime/parse) and are reported.
+		"""
+		while True:
+			line = self._readLine()
+			if line.startswith("+"):
+				continue
+			if line.startswith(" "):
+				yield line[1:]
+				continue
+			if len(line) < 5 or not line[:4].isdigit() or line[4] not in " -":
+				print("WARNING: bird socket: unexpected reply line: %s"%line)
+				continue
+			code = int(line[:4])
+			if code >= 8000:
+				print("ERROR: bird socket %s: %s"%(self.path, line[5:]))
+			elif code:
+				yield line[5:]
+			if line[4] == " ":
+				return
+
+	def _clearDeadline(self):
+		self.deadline = None
+		if self.sock:
+			self.sock.settimeout(self.timeout)
+
+	def _send(self, commands):
+		if not self.sock:
+			self.connect()
+		data = "".join(["%s\n"%cmd for cmd in commands])
+		self.sock.sendall(data.encode("utf-8"))
+
+	def iterCommand(self, command, deadline=None):
+		"""
+		run one command and yield its output line by line as it arrives
+		"""
+		self.deadline = time.time() + deadline if deadline else None
+		complete = False
+		try:
+			for attempt in (1, 2):
+				started = False
+				try:
+					self._send([command])
+					for line in self._readReply():
+						started = True
+						yield line
+					complete = True
+					return
+				except socket.timeout:
+					self.close()
+					raise
+				except socket.error:
+					self.close()
+					if started or attempt == 2:
+						raise
+		finally:
+			if not complete:
+				self.close()
+			self._clearDeadline()
+
+	def command(self, command, deadline=None):
+		"""
+		run one command, return its output lines
+		"""
+		return list(self.iterCommand(command, deadline))
+
+	def commands(self, commands, deadline=None):
+		"""
+		pipeline several commands: all are sent at once, the replies are
+		read in order; returns one list of output lines per command
+		"""
+		self.deadline = time.time() + deadline if deadline else None
+		complete = False
+		try:
+			for attempt in (1, 2):
+				try:
+					self._send(commands)
+					replies = [list(self._readReply()) for cmd in commands]
+					complete = True
+					return replies
+				except socket.timeout:
+					self.close()
+					raise
+				except socket.error:
+					self.close()
+					if attempt == 2:
+						raise
+		finally:
+			if not complete:
+				self.close()
+			self._clearDeadline()
+
+# vim:ts=4:sw=4:noexpandtab
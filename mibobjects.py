@@ -0,0 +1,655 @@
+#
+# numeric oids and SMI base types of the objects of
+#   BGP4-MIB, OSPF-MIB
+# generated by tools/compile_mibs.py from BGP4-MIB.txt, OSPF-MIB.txt - do not edit
+#
+
+# name: (oid, base type or None for tables, rows and groups)
+objects = {
+	'ospf':	((1, 3, 6, 1, 2, 1, 14), None),
+	'ospfGeneralGroup':	((1, 3, 6, 1, 2, 1, 14, 1), None),
+	'ospfRouterId':	((1, 3, 6, 1, 2, 1, 14, 1, 1), 'IpAddress'),
+	'ospfAdminStat':	((1, 3, 6, 1, 2, 1, 14, 1, 2), 'INTEGER'),
+	'ospfVersionNumber':	((1, 3, 6, 1, 2, 1, 14, 1, 3), 'INTEGER'),
+	'ospfAreaBdrRtrStatus':	((1, 3, 6, 1, 2, 1, 14, 1, 4), 'INTEGER'),
+	'ospfASBdrRtrStatus':	((1, 3, 6, 1, 2, 1, 14, 1, 5), 'INTEGER'),
+	'ospfExternLsaCount':	((1, 3, 6, 1, 2, 1, 14, 1, 6), 'Gauge32'),
+	'ospfExternLsaCksumSum':	((1, 3, 6, 1, 2, 1, 14, 1, 7), 'INTEGER'),
+	'ospfTOSSupport':	((1, 3, 6, 1, 2, 1, 14, 1, 8), 'INTEGER'),
+	'ospfOriginateNewLsas':	((1, 3, 6, 1, 2, 1, 14, 1, 9), 'Counter32'),
+	'ospfRxNewLsas':	((1, 3, 6, 1, 2, 1, 14, 1, 10), 'Counter32'),
+	'ospfExtLsdbLimit':	((1, 3, 6, 1, 2, 1, 14, 1, 11), 'INTEGER'),
+	'ospfMulticastExtensions':	((1, 3, 6, 1, 2, 1, 14, 1, 12), 'INTEGER'),
+	'ospfExitOverflowInterval':	((1, 3, 6, 1, 2, 1, 14, 1, 13), 'INTEGER'),
+	'ospfDemandExtensions':	((1, 3, 6, 1, 2, 1, 14, 1, 14), 'INTEGER'),
+	'ospfRFC1583Compatibility':	((1, 3, 6, 1, 2, 1, 14, 1, 15), 'INTEGER'),
+	'ospfOpaqueLsaSupport':	((1, 3, 6, 1, 2, 1, 14, 1, 16), 'INTEGER'),
+	'ospfReferenceBandwidth':	((1, 3, 6, 1, 2, 1, 14, 1, 17), 'Gauge32'),
+	'ospfRestartSupport':	((1, 3, 6, 1, 2, 1, 14, 1, 18), 'INTEGER'),
+	'ospfRestartInterval':	((1, 3, 6, 1, 2, 1, 14, 1, 19), 'INTEGER'),
+	'ospfRestartStrictLsaChecking':	((1, 3, 6, 1, 2, 1, 14, 1, 20), 'INTEGER'),
+	'ospfRestartStatus':	((1, 3, 6, 1, 2, 1, 14, 1, 21), 'INTEGER'),
+	'ospfRestartAge':	((1, 3, 6, 1, 2, 1, 14, 1, 22), 'Gauge32'),
+	'ospfRestartExitReason':	((1, 3, 6, 1, 2, 1, 14, 1, 23), 'INTEGER'),
+	'ospfAsLsaCount':	((1, 3, 6, 1, 2, 1, 14, 1, 24), 'Gauge32'),
+	'ospfAsLsaCksumSum':	((1, 3, 6, 1, 2, 1, 14, 1, 25), 'Gauge32'),
+	'ospfStubRouterSupport':	((1, 3, 6, 1, 2, 1, 14, 1, 26), 'INTEGER'),
+	'ospfStubRouterAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 1, 27), 'INTEGER'),
+	'ospfDiscontinuityTime':	((1, 3, 6, 1, 2, 1, 14, 1, 28), 'TimeTicks'),
+	'ospfAreaTable':	((1, 3, 6, 1, 2, 1, 14, 2), None),
+	'ospfAreaEntry':	((1, 3, 6, 1, 2, 1, 14, 2, 1), None),
+	'ospfAreaId':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 1), 'IpAddress'),
+	'ospfAuthType':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 2), 'INTEGER'),
+	'ospfImportAsExtern':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 3), 'INTEGER'),
+	'ospfSpfRuns':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 4), 'Counter32'),
+	'ospfAreaBdrRtrCount':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 5), 'Gauge32'),
+	'ospfAsBdrRtrCount':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 6), 'Gauge32'),
+	'ospfAreaLsaCount':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 7), 'Gauge32'),
+	'ospfAreaLsaCksumSum':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 8), 'INTEGER'),
+	'ospfAreaSummary':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 9), 'INTEGER'),
+	'ospfAreaStatus':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 10), 'INTEGER'),
+	'ospfAreaNssaTranslatorRole':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 11), 'INTEGER'),
+	'ospfAreaNssaTranslatorState':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 12), 'INTEGER'),
+	'ospfAreaNssaTranslatorStabilityInterval':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 13), 'INTEGER'),
+	'ospfAreaNssaTranslatorEvents':	((1, 3, 6, 1, 2, 1, 14, 2, 1, 14), 'Counter32'),
+	'ospfStubAreaTable':	((1, 3, 6, 1, 2, 1, 14, 3), None),
+	'ospfStubAreaEntry':	((1, 3, 6, 1, 2, 1, 14, 3, 1), None),
+	'ospfStubAreaId':	((1, 3, 6, 1, 2, 1, 14, 3, 1, 1), 'IpAddress'),
+	'ospfStubTOS':	((1, 3, 6, 1, 2, 1, 14, 3, 1, 2), 'INTEGER'),
+	'ospfStubMetric':	((1, 3, 6, 1, 2, 1, 14, 3, 1, 3), 'INTEGER'),
+	'ospfStubStatus':	((1, 3, 6, 1, 2, 1, 14, 3, 1, 4), 'INTEGER'),
+	'ospfStubMetricType':	((1, 3, 6, 1, 2, 1, 14, 3, 1, 5), 'INTEGER'),
+	'ospfLsdbTable':	((1, 3, 6, 1, 2, 1, 14, 4), None),
+	'ospfLsdbEntry':	((1, 3, 6, 1, 2, 1, 14, 4, 1), None),
+	'ospfLsdbAreaId':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 1), 'IpAddress'),
+	'ospfLsdbType':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 2), 'INTEGER'),
+	'ospfLsdbLsid':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 3), 'IpAddress'),
+	'ospfLsdbRouterId':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 4), 'IpAddress'),
+	'ospfLsdbSequence':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 5), 'INTEGER'),
+	'ospfLsdbAge':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 6), 'INTEGER'),
+	'ospfLsdbChecksum':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 7), 'INTEGER'),
+	'ospfLsdbAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 4, 1, 8), 'OCTET STRING'),
+	'ospfAreaRangeTable':	((1, 3, 6, 1, 2, 1, 14, 5), None),
+	'ospfAreaRangeEntry':	((1, 3, 6, 1, 2, 1, 14, 5, 1), None),
+	'ospfAreaRangeAreaId':	((1, 3, 6, 1, 2, 1, 14, 5, 1, 1), 'IpAddress'),
+	'ospfAreaRangeNet':	((1, 3, 6, 1, 2, 1, 14, 5, 1, 2), 'IpAddress'),
+	'ospfAreaRangeMask':	((1, 3, 6, 1, 2, 1, 14, 5, 1, 3), 'IpAddress'),
+	'ospfAreaRangeStatus':	((1, 3, 6, 1, 2, 1, 14, 5, 1, 4), 'INTEGER'),
+	'ospfAreaRangeEffect':	((1, 3, 6, 1, 2, 1, 14, 5, 1, 5), 'INTEGER'),
+	'ospfHostTable':	((1, 3, 6, 1, 2, 1, 14, 6), None),
+	'ospfHostEntry':	((1, 3, 6, 1, 2, 1, 14, 6, 1), None),
+	'ospfHostIpAddress':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 1), 'IpAddress'),
+	'ospfHostTOS':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 2), 'INTEGER'),
+	'ospfHostMetric':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 3), 'INTEGER'),
+	'ospfHostStatus':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 4), 'INTEGER'),
+	'ospfHostAreaID':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 5), 'IpAddress'),
+	'ospfHostCfgAreaID':	((1, 3, 6, 1, 2, 1, 14, 6, 1, 6), 'IpAddress'),
+	'ospfIfTable':	((1, 3, 6, 1, 2, 1, 14, 7), None),
+	'ospfIfEntry':	((1, 3, 6, 1, 2, 1, 14, 7, 1), None),
+	'ospfIfIpAddress':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 1), 'IpAddress'),
+	'ospfAddressLessIf':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 2), 'INTEGER'),
+	'ospfIfAreaId':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 3), 'IpAddress'),
+	'ospfIfType':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 4), 'INTEGER'),
+	'ospfIfAdminStat':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 5), 'INTEGER'),
+	'ospfIfRtrPriority':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 6), 'INTEGER'),
+	'ospfIfTransitDelay':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 7), 'INTEGER'),
+	'ospfIfRetransInterval':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 8), 'INTEGER'),
+	'ospfIfHelloInterval':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 9), 'INTEGER'),
+	'ospfIfRtrDeadInterval':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 10), 'INTEGER'),
+	'ospfIfPollInterval':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 11), 'INTEGER'),
+	'ospfIfState':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 12), 'INTEGER'),
+	'ospfIfDesignatedRouter':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 13), 'IpAddress'),
+	'ospfIfBackupDesignatedRouter':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 14), 'IpAddress'),
+	'ospfIfEvents':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 15), 'Counter32'),
+	'ospfIfAuthKey':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 16), 'OCTET STRING'),
+	'ospfIfStatus':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 17), 'INTEGER'),
+	'ospfIfMulticastForwarding':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 18), 'INTEGER'),
+	'ospfIfDemand':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 19), 'INTEGER'),
+	'ospfIfAuthType':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 20), 'INTEGER'),
+	'ospfIfLsaCount':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 21), 'Gauge32'),
+	'ospfIfLsaCksumSum':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 22), 'Gauge32'),
+	'ospfIfDesignatedRouterId':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 23), 'IpAddress'),
+	'ospfIfBackupDesignatedRouterId':	((1, 3, 6, 1, 2, 1, 14, 7, 1, 24), 'IpAddress'),
+	'ospfIfMetricTable':	((1, 3, 6, 1, 2, 1, 14, 8), None),
+	'ospfIfMetricEntry':	((1, 3, 6, 1, 2, 1, 14, 8, 1), None),
+	'ospfIfMetricIpAddress':	((1, 3, 6, 1, 2, 1, 14, 8, 1, 1), 'IpAddress'),
+	'ospfIfMetricAddressLessIf':	((1, 3, 6, 1, 2, 1, 14, 8, 1, 2), 'INTEGER'),
+	'ospfIfMetricTOS':	((1, 3, 6, 1, 2, 1, 14, 8, 1, 3), 'INTEGER'),
+	'ospfIfMetricValue':	((1, 3, 6, 1, 2, 1, 14, 8, 1, 4), 'INTEGER'),
+	'ospfIfMetricStatus':	((1, 3, 6, 1, 2, 1, 14, 8, 1, 5), 'INTEGER'),
+	'ospfVirtIfTable':	((1, 3, 6, 1, 2, 1, 14, 9), None),
+	'ospfVirtIfEntry':	((1, 3, 6, 1, 2, 1, 14, 9, 1), None),
+	'ospfVirtIfAreaId':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 1), 'IpAddress'),
+	'ospfVirtIfNeighbor':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 2), 'IpAddress'),
+	'ospfVirtIfTransitDelay':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 3), 'INTEGER'),
+	'ospfVirtIfRetransInterval':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 4), 'INTEGER'),
+	'ospfVirtIfHelloInterval':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 5), 'INTEGER'),
+	'ospfVirtIfRtrDeadInterval':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 6), 'INTEGER'),
+	'ospfVirtIfState':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 7), 'INTEGER'),
+	'ospfVirtIfEvents':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 8), 'Counter32'),
+	'ospfVirtIfAuthKey':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 9), 'OCTET STRING'),
+	'ospfVirtIfStatus':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 10), 'INTEGER'),
+	'ospfVirtIfAuthType':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 11), 'INTEGER'),
+	'ospfVirtIfLsaCount':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 12), 'Gauge32'),
+	'ospfVirtIfLsaCksumSum':	((1, 3, 6, 1, 2, 1, 14, 9, 1, 13), 'Gauge32'),
+	'ospfNbrTable':	((1, 3, 6, 1, 2, 1, 14, 10), None),
+	'ospfNbrEntry':	((1, 3, 6, 1, 2, 1, 14, 10, 1), None),
+	'ospfNbrIpAddr':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 1), 'IpAddress'),
+	'ospfNbrAddressLessIndex':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 2), 'INTEGER'),
+	'ospfNbrRtrId':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 3), 'IpAddress'),
+	'ospfNbrOptions':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 4), 'INTEGER'),
+	'ospfNbrPriority':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 5), 'INTEGER'),
+	'ospfNbrState':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 6), 'INTEGER'),
+	'ospfNbrEvents':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 7), 'Counter32'),
+	'ospfNbrLsRetransQLen':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 8), 'Gauge32'),
+	'ospfNbmaNbrStatus':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 9), 'INTEGER'),
+	'ospfNbmaNbrPermanence':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 10), 'INTEGER'),
+	'ospfNbrHelloSuppressed':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 11), 'INTEGER'),
+	'ospfNbrRestartHelperStatus':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 12), 'INTEGER'),
+	'ospfNbrRestartHelperAge':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 13), 'Gauge32'),
+	'ospfNbrRestartHelperExitReason':	((1, 3, 6, 1, 2, 1, 14, 10, 1, 14), 'INTEGER'),
+	'ospfVirtNbrTable':	((1, 3, 6, 1, 2, 1, 14, 11), None),
+	'ospfVirtNbrEntry':	((1, 3, 6, 1, 2, 1, 14, 11, 1), None),
+	'ospfVirtNbrArea':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 1), 'IpAddress'),
+	'ospfVirtNbrRtrId':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 2), 'IpAddress'),
+	'ospfVirtNbrIpAddr':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 3), 'IpAddress'),
+	'ospfVirtNbrOptions':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 4), 'INTEGER'),
+	'ospfVirtNbrState':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 5), 'INTEGER'),
+	'ospfVirtNbrEvents':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 6), 'Counter32'),
+	'ospfVirtNbrLsRetransQLen':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 7), 'Gauge32'),
+	'ospfVirtNbrHelloSuppressed':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 8), 'INTEGER'),
+	'ospfVirtNbrRestartHelperStatus':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 9), 'INTEGER'),
+	'ospfVirtNbrRestartHelperAge':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 10), 'Gauge32'),
+	'ospfVirtNbrRestartHelperExitReason':	((1, 3, 6, 1, 2, 1, 14, 11, 1, 11), 'INTEGER'),
+	'ospfExtLsdbTable':	((1, 3, 6, 1, 2, 1, 14, 12), None),
+	'ospfExtLsdbEntry':	((1, 3, 6, 1, 2, 1, 14, 12, 1), None),
+	'ospfExtLsdbType':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 1), 'INTEGER'),
+	'ospfExtLsdbLsid':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 2), 'IpAddress'),
+	'ospfExtLsdbRouterId':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 3), 'IpAddress'),
+	'ospfExtLsdbSequence':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 4), 'INTEGER'),
+	'ospfExtLsdbAge':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 5), 'INTEGER'),
+	'ospfExtLsdbChecksum':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 6), 'INTEGER'),
+	'ospfExtLsdbAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 12, 1, 7), 'OCTET STRING'),
+	'ospfRouteGroup':	((1, 3, 6, 1, 2, 1, 14, 13), None),
+	'ospfIntraArea':	((1, 3, 6, 1, 2, 1, 14, 13, 1), None),
+	'ospfInterArea':	((1, 3, 6, 1, 2, 1, 14, 13, 2), None),
+	'ospfExternalType1':	((1, 3, 6, 1, 2, 1, 14, 13, 3), None),
+	'ospfExternalType2':	((1, 3, 6, 1, 2, 1, 14, 13, 4), None),
+	'ospfAreaAggregateTable':	((1, 3, 6, 1, 2, 1, 14, 14), None),
+	'ospfAreaAggregateEntry':	((1, 3, 6, 1, 2, 1, 14, 14, 1), None),
+	'ospfAreaAggregateAreaID':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 1), 'IpAddress'),
+	'ospfAreaAggregateLsdbType':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 2), 'INTEGER'),
+	'ospfAreaAggregateNet':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 3), 'IpAddress'),
+	'ospfAreaAggregateMask':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 4), 'IpAddress'),
+	'ospfAreaAggregateStatus':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 5), 'INTEGER'),
+	'ospfAreaAggregateEffect':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 6), 'INTEGER'),
+	'ospfAreaAggregateExtRouteTag':	((1, 3, 6, 1, 2, 1, 14, 14, 1, 7), 'Gauge32'),
+	'ospfConformance':	((1, 3, 6, 1, 2, 1, 14, 15), None),
+	'ospfGroups':	((1, 3, 6, 1, 2, 1, 14, 15, 1), None),
+	'ospfBasicGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 1), None),
+	'ospfAreaGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 2), None),
+	'ospfStubAreaGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 3), None),
+	'ospfLsdbGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 4), None),
+	'ospfAreaRangeGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 5), None),
+	'ospfHostGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 6), None),
+	'ospfIfGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 7), None),
+	'ospfIfMetricGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 8), None),
+	'ospfVirtIfGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 9), None),
+	'ospfNbrGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 10), None),
+	'ospfVirtNbrGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 11), None),
+	'ospfExtLsdbGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 12), None),
+	'ospfAreaAggregateGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 13), None),
+	'ospfLocalLsdbGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 14), None),
+	'ospfVirtLocalLsdbGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 15), None),
+	'ospfAsLsdbGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 16), None),
+	'ospfBasicGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 17), None),
+	'ospfAreaGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 18), None),
+	'ospfIfGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 19), None),
+	'ospfVirtIfGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 20), None),
+	'ospfNbrGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 21), None),
+	'ospfVirtNbrGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 22), None),
+	'ospfAreaAggregateGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 23), None),
+	'ospfAreaLsaCountGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 24), None),
+	'ospfHostGroup2':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 25), None),
+	'ospfObsoleteGroup':	((1, 3, 6, 1, 2, 1, 14, 15, 1, 26), None),
+	'ospfCompliances':	((1, 3, 6, 1, 2, 1, 14, 15, 2), None),
+	'ospfCompliance':	((1, 3, 6, 1, 2, 1, 14, 15, 2, 1), None),
+	'ospfCompliance2':	((1, 3, 6, 1, 2, 1, 14, 15, 2, 2), None),
+	'ospfComplianceObsolete':	((1, 3, 6, 1, 2, 1, 14, 15, 2, 3), None),
+	'ospfLocalLsdbTable':	((1, 3, 6, 1, 2, 1, 14, 17), None),
+	'ospfLocalLsdbEntry':	((1, 3, 6, 1, 2, 1, 14, 17, 1), None),
+	'ospfLocalLsdbIpAddress':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 1), 'IpAddress'),
+	'ospfLocalLsdbAddressLessIf':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 2), 'INTEGER'),
+	'ospfLocalLsdbType':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 3), 'INTEGER'),
+	'ospfLocalLsdbLsid':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 4), 'IpAddress'),
+	'ospfLocalLsdbRouterId':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 5), 'IpAddress'),
+	'ospfLocalLsdbSequence':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 6), 'INTEGER'),
+	'ospfLocalLsdbAge':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 7), 'INTEGER'),
+	'ospfLocalLsdbChecksum':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 8), 'INTEGER'),
+	'ospfLocalLsdbAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 17, 1, 9), 'OCTET STRING'),
+	'ospfVirtLocalLsdbTable':	((1, 3, 6, 1, 2, 1, 14, 18), None),
+	'ospfVirtLocalLsdbEntry':	((1, 3, 6, 1, 2, 1, 14, 18, 1), None),
+	'ospfVirtLocalLsdbTransitArea':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 1), 'IpAddress'),
+	'ospfVirtLocalLsdbNeighbor':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 2), 'IpAddress'),
+	'ospfVirtLocalLsdbType':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 3), 'INTEGER'),
+	'ospfVirtLocalLsdbLsid':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 4), 'IpAddress'),
+	'ospfVirtLocalLsdbRouterId':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 5), 'IpAddress'),
+	'ospfVirtLocalLsdbSequence':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 6), 'INTEGER'),
+	'ospfVirtLocalLsdbAge':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 7), 'INTEGER'),
+	'ospfVirtLocalLsdbChecksum':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 8), 'INTEGER'),
+	'ospfVirtLocalLsdbAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 18, 1, 9), 'OCTET STRING'),
+	'ospfAsLsdbTable':	((1, 3, 6, 1, 2, 1, 14, 19), None),
+	'ospfAsLsdbEntry':	((1, 3, 6, 1, 2, 1, 14, 19, 1), None),
+	'ospfAsLsdbType':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 1), 'INTEGER'),
+	'ospfAsLsdbLsid':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 2), 'IpAddress'),
+	'ospfAsLsdbRouterId':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 3), 'IpAddress'),
+	'ospfAsLsdbSequence':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 4), 'INTEGER'),
+	'ospfAsLsdbAge':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 5), 'INTEGER'),
+	'ospfAsLsdbChecksum':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 6), 'INTEGER'),
+	'ospfAsLsdbAdvertisement':	((1, 3, 6, 1, 2, 1, 14, 19, 1, 7), 'OCTET STRING'),
+	'ospfAreaLsaCountTable':	((1, 3, 6, 1, 2, 1, 14, 20), None),
+	'ospfAreaLsaCountEntry':	((1, 3, 6, 1, 2, 1, 14, 20, 1), None),
+	'ospfAreaLsaCountAreaId':	((1, 3, 6, 1, 2, 1, 14, 20, 1, 1), 'IpAddress'),
+	'ospfAreaLsaCountLsaType':	((1, 3, 6, 1, 2, 1, 14, 20, 1, 2), 'INTEGER'),
+	'ospfAreaLsaCountNumber':	((1, 3, 6, 1, 2, 1, 14, 20, 1, 3), 'Gauge32'),
+	'bgp':	((1, 3, 6, 1, 2, 1, 15), None),
+	'bgpNotification':	((1, 3, 6, 1, 2, 1, 15, 0), None),
+	'bgpEstablishedNotification':	((1, 3, 6, 1, 2, 1, 15, 0, 1), None),
+	'bgpBackwardTransNotification':	((1, 3, 6, 1, 2, 1, 15, 0, 2), None),
+	'bgpVersion':	((1, 3, 6, 1, 2, 1, 15, 1), 'OCTET STRING'),
+	'bgpLocalAs':	((1, 3, 6, 1, 2, 1, 15, 2), 'INTEGER'),
+	'bgpPeerTable':	((1, 3, 6, 1, 2, 1, 15, 3), None),
+	'bgpPeerEntry':	((1, 3, 6, 1, 2, 1, 15, 3, 1), None),
+	'bgpPeerIdentifier':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 1), 'IpAddress'),
+	'bgpPeerState':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 2), 'INTEGER'),
+	'bgpPeerAdminStatus':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 3), 'INTEGER'),
+	'bgpPeerNegotiatedVersion':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 4), 'INTEGER'),
+	'bgpPeerLocalAddr':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 5), 'IpAddress'),
+	'bgpPeerLocalPort':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 6), 'INTEGER'),
+	'bgpPeerRemoteAddr':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 7), 'IpAddress'),
+	'bgpPeerRemotePort':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 8), 'INTEGER'),
+	'bgpPeerRemoteAs':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 9), 'INTEGER'),
+	'bgpPeerInUpdates':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 10), 'Counter32'),
+	'bgpPeerOutUpdates':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 11), 'Counter32'),
+	'bgpPeerInTotalMessages':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 12), 'Counter32'),
+	'bgpPeerOutTotalMessages':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 13), 'Counter32'),
+	'bgpPeerLastError':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 14), 'OCTET STRING'),
+	'bgpPeerFsmEstablishedTransitions':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 15), 'Counter32'),
+	'bgpPeerFsmEstablishedTime':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 16), 'Gauge32'),
+	'bgpPeerConnectRetryInterval':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 17), 'INTEGER'),
+	'bgpPeerHoldTime':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 18), 'INTEGER'),
+	'bgpPeerKeepAlive':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 19), 'INTEGER'),
+	'bgpPeerHoldTimeConfigured':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 20), 'INTEGER'),
+	'bgpPeerKeepAliveConfigured':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 21), 'INTEGER'),
+	'bgpPeerMinASOriginationInterval':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 22), 'INTEGER'),
+	'bgpPeerMinRouteAdvertisementInterval':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 23), 'INTEGER'),
+	'bgpPeerInUpdateElapsedTime':	((1, 3, 6, 1, 2, 1, 15, 3, 1, 24), 'Gauge32'),
+	'bgpIdentifier':	((1, 3, 6, 1, 2, 1, 15, 4), 'IpAddress'),
+	'bgpRcvdPathAttrTable':	((1, 3, 6, 1, 2, 1, 15, 5), None),
+	'bgpPathAttrEntry':	((1, 3, 6, 1, 2, 1, 15, 5, 1), None),
+	'bgpPathAttrPeer':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 1), 'IpAddress'),
+	'bgpPathAttrDestNetwork':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 2), 'IpAddress'),
+	'bgpPathAttrOrigin':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 3), 'INTEGER'),
+	'bgpPathAttrASPath':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 4), 'OCTET STRING'),
+	'bgpPathAttrNextHop':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 5), 'IpAddress'),
+	'bgpPathAttrInterASMetric':	((1, 3, 6, 1, 2, 1, 15, 5, 1, 6), 'INTEGER'),
+	'bgp4PathAttrTable':	((1, 3, 6, 1, 2, 1, 15, 6), None),
+	'bgp4PathAttrEntry':	((1, 3, 6, 1, 2, 1, 15, 6, 1), None),
+	'bgp4PathAttrPeer':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 1), 'IpAddress'),
+	'bgp4PathAttrIpAddrPrefixLen':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 2), 'INTEGER'),
+	'bgp4PathAttrIpAddrPrefix':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 3), 'IpAddress'),
+	'bgp4PathAttrOrigin':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 4), 'INTEGER'),
+	'bgp4PathAttrASPathSegment':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 5), 'OCTET STRING'),
+	'bgp4PathAttrNextHop':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 6), 'IpAddress'),
+	'bgp4PathAttrMultiExitDisc':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 7), 'INTEGER'),
+	'bgp4PathAttrLocalPref':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 8), 'INTEGER'),
+	'bgp4PathAttrAtomicAggregate':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 9), 'INTEGER'),
+	'bgp4PathAttrAggregatorAS':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 10), 'INTEGER'),
+	'bgp4PathAttrAggregatorAddr':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 11), 'IpAddress'),
+	'bgp4PathAttrCalcLocalPref':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 12), 'INTEGER'),
+	'bgp4PathAttrBest':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 13), 'INTEGER'),
+	'bgp4PathAttrUnknown':	((1, 3, 6, 1, 2, 1, 15, 6, 1, 14), 'OCTET STRING'),
+	'bgpTraps':	((1, 3, 6, 1, 2, 1, 15, 7), None),
+	'bgpEstablished':	((1, 3, 6, 1, 2, 1, 15, 7, 1), None),
+	'bgpBackwardTransition':	((1, 3, 6, 1, 2, 1, 15, 7, 2), None),
+	'bgp4MIBConformance':	((1, 3, 6, 1, 2, 1, 15, 8), None),
+	'bgp4MIBCompliances':	((1, 3, 6, 1, 2, 1, 15, 8, 1), None),
+	'bgp4MIBCompliance':	((1, 3, 6, 1, 2, 1, 15, 8, 1, 1), None),
+	'bgp4MIBDeprecatedCompliances':	((1, 3, 6, 1, 2, 1, 15, 8, 1, 2), None),
+	'bgp4MIBObsoleteCompliances':	((1, 3, 6, 1, 2, 1, 15, 8, 1, 3), None),
+	'bgp4MIBGroups':	((1, 3, 6, 1, 2, 1, 15, 8, 2), None),
+	'bgp4MIBGlobalsGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 1), None),
+	'bgp4MIBPeerGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 2), None),
+	'bgpRcvdPathAttrGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 3), None),
+	'bgp4MIBPathAttrGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 4), None),
+	'bgp4MIBTrapGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 5), None),
+	'bgp4MIBNotificationGroup':	((1, 3, 6, 1, 2, 1, 15, 8, 2, 6), None),
+}
+
+# module: names
+modules = {
+	'BGP4-MIB': (
+		'bgp',
+		'bgpNotification',
+		'bgpEstablishedNotification',
+		'bgpBackwardTransNotification',
+		'bgpVersion',
+		'bgpLocalAs',
+		'bgpPeerTable',
+		'bgpPeerEntry',
+		'bgpPeerIdentifier',
+		'bgpPeerState',
+		'bgpPeerAdminStatus',
+		'bgpPeerNegotiatedVersion',
+		'bgpPeerLocalAddr',
+		'bgpPeerLocalPort',
+		'bgpPeerRemoteAddr',
+		'bgpPeerRemotePort',
+		'bgpPeerRemoteAs',
+		'bgpPeerInUpdates',
+		'bgpPeerOutUpdates',
+		'bgpPeerInTotalMessages',
+		'bgpPeerOutTotalMessages',
+		'bgpPeerLastError',
+		'bgpPeerFsmEstablishedTransitions',
+		'bgpPeerFsmEstablishedTime',
+		'bgpPeerConnectRetryInterval',
+		'bgpPeerHoldTime',
+		'bgpPeerKeepAlive',
+		'bgpPeerHoldTimeConfigured',
+		'bgpPeerKeepAliveConfigured',
+		'bgpPeerMinASOriginationInterval',
+		'bgpPeerMinRouteAdvertisementInterval',
+		'bgpPeerInUpdateElapsedTime',
+		'bgpIdentifier',
+		'bgpRcvdPathAttrTable',
+		'bgpPathAttrEntry',
+		'bgpPathAttrPeer',
+		'bgpPathAttrDestNetwork',
+		'bgpPathAttrOrigin',
+		'bgpPathAttrASPath',
+		'bgpPathAttrNextHop',
+		'bgpPathAttrInterASMetric',
+		'bgp4PathAttrTable',
+		'bgp4PathAttrEntry',
+		'bgp4PathAttrPeer',
+		'bgp4PathAttrIpAddrPrefixLen',
+		'bgp4PathAttrIpAddrPrefix',
+		'bgp4PathAttrOrigin',
+		'bgp4PathAttrASPathSegment',
+		'bgp4PathAttrNextHop',
+		'bgp4PathAttrMultiExitDisc',
+		'bgp4PathAttrLocalPref',
+		'bgp4PathAttrAtomicAggregate',
+		'bgp4PathAttrAggregatorAS',
+		'bgp4PathAttrAggregatorAddr',
+		'bgp4PathAttrCalcLocalPref',
+		'bgp4PathAttrBest',
+		'bgp4PathAttrUnknown',
+		'bgpTraps',
+		'bgpEstablished',
+		'bgpBackwardTransition',
+		'bgp4MIBConformance',
+		'bgp4MIBCompliances',
+		'bgp4MIBCompliance',
+		'bgp4MIBDeprecatedCompliances',
+		'bgp4MIBObsoleteCompliances',
+		'bgp4MIBGroups',
+		'bgp4MIBGlobalsGroup',
+		'bgp4MIBPeerGroup',
+		'bgpRcvdPathAttrGroup',
+		'bgp4MIBPathAttrGroup',
+		'bgp4MIBTrapGroup',
+		'bgp4MIBNotificationGroup',
+	),
+	'OSPF-MIB': (
+		'ospf',
+		'ospfGeneralGroup',
+		'ospfRouterId',
+		'ospfAdminStat',
+		'ospfVersionNumber',
+		'ospfAreaBdrRtrStatus',
+		'ospfASBdrRtrStatus',
+		'ospfExternLsaCount',
+		'ospfExternLsaCksumSum',
+		'ospfTOSSupport',
+		'ospfOriginateNewLsas',
+		'ospfRxNewLsas',
+		'ospfExtLsdbLimit',
+		'ospfMulticastExtensions',
+		'ospfExitOverflowInterval',
+		'ospfDemandExtensions',
+		'ospfRFC1583Compatibility',
+		'ospfOpaqueLsaSupport',
+		'ospfReferenceBandwidth',
+		'ospfRestartSupport',
+		'ospfRestartInterval',
+		'ospfRestartStrictLsaChecking',
+		'ospfRestartStatus',
+		'ospfRestartAge',
+		'ospfRestartExitReason',
+		'ospfAsLsaCount',
+		'ospfAsLsaCksumSum',
+		'ospfStubRouterSupport',
+		'ospfStubRouterAdvertisement',
+		'ospfDiscontinuityTime',
+		'ospfAreaTable',
+		'ospfAreaEntry',
+		'ospfAreaId',
+		'ospfAuthType',
+		'ospfImportAsExtern',
+		'ospfSpfRuns',
+		'ospfAreaBdrRtrCount',
+		'ospfAsBdrRtrCount',
+		'ospfAreaLsaCount',
+		'ospfAreaLsaCksumSum',
+		'ospfAreaSummary',
+		'ospfAreaStatus',
+		'ospfAreaNssaTranslatorRole',
+		'ospfAreaNssaTranslatorState',
+		'ospfAreaNssaTranslatorStabilityInterval',
+		'ospfAreaNssaTranslatorEvents',
+		'ospfStubAreaTable',
+		'ospfStubAreaEntry',
+		'ospfStubAreaId',
+		'ospfStubTOS',
+		'ospfStubMetric',
+		'ospfStubStatus',
+		'ospfStubMetricType',
+		'ospfLsdbTable',
+		'ospfLsdbEntry',
+		'ospfLsdbAreaId',
+		'ospfLsdbType',
+		'ospfLsdbLsid',
+		'ospfLsdbRouterId',
+		'ospfLsdbSequence',
+		'ospfLsdbAge',
+		'ospfLsdbChecksum',
+		'ospfLsdbAdvertisement',
+		'ospfAreaRangeTable',
+		'ospfAreaRangeEntry',
+		'ospfAreaRangeAreaId',
+		'ospfAreaRangeNet',
+		'ospfAreaRangeMask',
+		'ospfAreaRangeStatus',
+		'ospfAreaRangeEffect',
+		'ospfHostTable',
+		'ospfHostEntry',
+		'ospfHostIpAddress',
+		'ospfHostTOS',
+		'ospfHostMetric',
+		'ospfHostStatus',
+		'ospfHostAreaID',
+		'ospfHostCfgAreaID',
+		'ospfIfTable',
+		'ospfIfEntry',
+		'ospfIfIpAddress',
+		'ospfAddressLessIf',
+		'ospfIfAreaId',
+		'ospfIfType',
+		'ospfIfAdminStat',
+		'ospfIfRtrPriority',
+		'ospfIfTransitDelay',
+		'ospfIfRetransInterval',
+		'ospfIfHelloInterval',
+		'ospfIfRtrDeadInterval',
+		'ospfIfPollInterval',
+		'ospfIfState',
+		'ospfIfDesignatedRouter',
+		'ospfIfBackupDesignatedRouter',
+		'ospfIfEvents',
+		'ospfIfAuthKey',
+		'ospfIfStatus',
+		'ospfIfMulticastForwarding',
+		'ospfIfDemand',
+		'ospfIfAuthType',
+		'ospfIfLsaCount',
+		'ospfIfLsaCksumSum',
+		'ospfIfDesignatedRouterId',
+		'ospfIfBackupDesignatedRouterId',
+		'ospfIfMetricTable',
+		'ospfIfMetricEntry',
+		'ospfIfMetricIpAddress',
+		'ospfIfMetricAddressLessIf',
+		'ospfIfMetricTOS',
+		'ospfIfMetricValue',
+		'ospfIfMetricStatus',
+		'ospfVirtIfTable',
+		'ospfVirtIfEntry',
+		'ospfVirtIfAreaId',
+		'ospfVirtIfNeighbor',
+		'ospfVirtIfTransitDelay',
+		'ospfVirtIfRetransInterval',
+		'ospfVirtIfHelloInterval',
+		'ospfVirtIfRtrDeadInterval',
+		'ospfVirtIfState',
+		'ospfVirtIfEvents',
+		'ospfVirtIfAuthKey',
+		'ospfVirtIfStatus',
+		'ospfVirtIfAuthType',
+		'ospfVirtIfLsaCount',
+		'ospfVirtIfLsaCksumSum',
+		'ospfNbrTable',
+		'ospfNbrEntry',
+		'ospfNbrIpAddr',
+		'ospfNbrAddressLessIndex',
+		'ospfNbrRtrId',
+		'ospfNbrOptions',
+		'ospfNbrPriority',
+		'ospfNbrState',
+		'ospfNbrEvents',
+		'ospfNbrLsRetransQLen',
+		'ospfNbmaNbrStatus',
+		'ospfNbmaNbrPermanence',
+		'ospfNbrHelloSuppressed',
+		'ospfNbrRestartHelperStatus',
+		'ospfNbrRestartHelperAge',
+		'ospfNbrRestartHelperExitReason',
+		'ospfVirtNbrTable',
+		'ospfVirtNbrEntry',
+		'ospfVirtNbrArea',
+		'ospfVirtNbrRtrId',
+		'ospfVirtNbrIpAddr',
+		'ospfVirtNbrOptions',
+		'ospfVirtNbrState',
+		'ospfVirtNbrEvents',
+		'ospfVirtNbrLsRetransQLen',
+		'ospfVirtNbrHelloSuppressed',
+		'ospfVirtNbrRestartHelperStatus',
+		'ospfVirtNbrRestartHelperAge',
+		'ospfVirtNbrRestartHelperExitReason',
+		'ospfExtLsdbTable',
+		'ospfExtLsdbEntry',
+		'ospfExtLsdbType',
+		'ospfExtLsdbLsid',
+		'ospfExtLsdbRouterId',
+		'ospfExtLsdbSequence',
+		'ospfExtLsdbAge',
+		'ospfExtLsdbChecksum',
+		'ospfExtLsdbAdvertisement',
+		'ospfRouteGroup',
+		'ospfIntraArea',
+		'ospfInterArea',
+		'ospfExternalType1',
+		'ospfExternalType2',
+		'ospfAreaAggregateTable',
+		'ospfAreaAggregateEntry',
+		'ospfAreaAggregateAreaID',
+		'ospfAreaAggregateLsdbType',
+		'ospfAreaAggregateNet',
+		'ospfAreaAggregateMask',
+		'ospfAreaAggregateStatus',
+		'ospfAreaAggregateEffect',
+		'ospfAreaAggregateExtRouteTag',
+		'ospfConformance',
+		'ospfGroups',
+		'ospfBasicGroup',
+		'ospfAreaGroup',
+		'ospfStubAreaGroup',
+		'ospfLsdbGroup',
+		'ospfAreaRangeGroup',
+		'ospfHostGroup',
+		'ospfIfGroup',
+		'ospfIfMetricGroup',
+		'ospfVirtIfGroup',
+		'ospfNbrGroup',
+		'ospfVirtNbrGroup',
+		'ospfExtLsdbGroup',
+		'ospfAreaAggregateGroup',
+		'ospfLocalLsdbGroup',
+		'ospfVirtLocalLsdbGroup',
+		'ospfAsLsdbGroup',
+		'ospfBasicGroup2',
+		'ospfAreaGroup2',
+		'ospfIfGroup2',
+		'ospfVirtIfGroup2',
+		'ospfNbrGroup2',
+		'ospfVirtNbrGroup2',
+		'ospfAreaAggregateGroup2',
+		'ospfAreaLsaCountGroup',
+		'ospfHostGroup2',
+		'ospfObsoleteGroup',
+		'ospfCompliances',
+		'ospfCompliance',
+		'ospfCompliance2',
+		'ospfComplianceObsolete',
+		'ospfLocalLsdbTable',
+		'ospfLocalLsdbEntry',
+		'ospfLocalLsdbIpAddress',
+		'ospfLocalLsdbAddressLessIf',
+		'ospfLocalLsdbType',
+		'ospfLocalLsdbLsid',
+		'ospfLocalLsdbRouterId',
+		'ospfLocalLsdbSequence',
+		'ospfLocalLsdbAge',
+		'ospfLocalLsdbChecksum',
+		'ospfLocalLsdbAdvertisement',
+		'ospfVirtLocalLsdbTable',
+		'ospfVirtLocalLsdbEntry',
+		'ospfVirtLocalLsdbTransitArea',
+		'ospfVirtLocalLsdbNeighbor',
+		'ospfVirtLocalLsdbType',
+		'ospfVirtLocalLsdbLsid',
+		'ospfVirtLocalLsdbRouterId',
+		'ospfVirtLocalLsdbSequence',
+		'ospfVirtLocalLsdbAge',
+		'ospfVirtLocalLsdbChecksum',
+		'ospfVirtLocalLsdbAdvertisement',
+		'ospfAsLsdbTable',
+		'ospfAsLsdbEntry',
+		'ospfAsLsdbType',
+		'ospfAsLsdbLsid',
+		'ospfAsLsdbRouterId',
+		'ospfAsLsdbSequence',
+		'ospfAsLsdbAge',
+		'ospfAsLsdbChecksum',
+		'ospfAsLsdbAdvertisement',
+		'ospfAreaLsaCountTable',
+		'ospfAreaLsaCountEntry',
+		'ospfAreaLsaCountAreaId',
+		'ospfAreaLsaCountLsaType',
+		'ospfAreaLsaCountNumber',
+	),
+}
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,155 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+mibtree - minimal SMIv2 MIB reader
+	resolves the object names of MIB files (BGP4-MIB, OSPF-MIB, ...)
+	to numeric oids without net-snmp, for the pure python transport
+"""
+
+import re
+
+class MIBTree:
+	"""
+	object names and their numeric oids, read from MIB files
+
+	only the OID assignments (`name ... ::= { parent n }`) and the
+	SYNTAX of OBJECT-TYPEs are read; that is all an agent needs.
+	"""
+
+	# well-known roots the MIBs we read are defined under
+	roots = {
+		"iso":			(1,),
+		"org":			(1, 3),
+		"dod":			(1, 3, 6),
+		"internet":		(1, 3, 6, 1),
+		"mgmt":			(1, 3, 6, 1, 2),
+		"mib-2":		(1, 3, 6, 1, 2, 1),
+		"transmission":		(1, 3, 6, 1, 2, 1, 10),
+		"experimental":		(1, 3, 6, 1, 3),
+		"private":		(1, 3, 6, 1, 4),
+		"enterprises":		(1, 3, 6, 1, 4, 1),
+		"snmpV2":		(1, 3, 6, 1, 6),
+		"snmpModules":		(1, 3, 6, 1, 6, 3),
+	}
+
+	_re_comment = re.compile("--.*?(--|$)", re.M)
+	_re_module = re.compile("^\s*([A-Za-z][A-Za-z0-9-]*)\s+DEFINITIONS\s*::=\s*BEGIN", re.M)
+	_re_assignment = re.compile(
+			"(?<![\w-])([a-z][A-Za-z0-9-]*)\s+"
+			"(OBJECT\s+IDENTIFIER|OBJECT-TYPE|MODULE-IDENTITY|OBJECT-IDENTITY|"
+			"NOTIFICATION-TYPE|OBJECT-GROUP|NOTIFICATION-GROUP|MODULE-COMPLIANCE)"
+			"(.*?)::=\s*\{\s*([A-Za-z][A-Za-z0-9-]*)\s+([0-9]+)\s*\}", re.S)
+	_re_syntax = re.compile("\sSYNTAX\s+([A-Z][A-Za-z0-9-]*(\s+STRING|\s+IDENTIFIER)?)")
+	_re_convention = re.compile(
+			"(?<![\w-])([A-Z][A-Za-z0-9-]*)\s*::=\s*TEXTUAL-CONVENTION(.*?)"
+			"\sSYNTAX\s+([A-Z][A-Za-z0-9-]*(\s+STRING|\s+IDENTIFIER)?)", re.S)
+
+	# base types of the SMI
+	base_types = {
+		"INTEGER":		"INTEGER",
+		"Integer32":		"INTEGER",
+		"Unsigned32":		"Gauge32",
+		"OCTET STRING":		"OCTET STRING",
+		"OBJECT IDENTIFIER":	"OBJECT IDENTIFIER",
+		"IpAddress":		"IpAddress",
+		"Counter32":		"Counter32",
+		"Gauge32":		"Gauge32",
+		"TimeTicks":		"TimeTicks",
+		"Counter64":		"Counter64",
+		"Opaque":		"Opaque",
+	}
+
+	# textual conventions imported by the MIBs we read
+	conventions = {
+		"TruthValue":		"INTEGER",
+		"RowStatus":		"INTEGER",
+		"TimeStamp":		"TimeTicks",
+		"DisplayString":	"OCTET STRING",
+		"InterfaceIndex":	"Integer32",
+		"InterfaceIndexOrZero":	"Integer32",
+	}
+
+	def __init__(self, *filenames):
+		# name -> (oid, syntax)
+		self.objects = {}
+		self.modules = {}
+		self.conventions = dict(self.conventions)
+		for filename in filenames:
+			self.load(filename)
+
+	def load(self, filename):
+		with open(filename, "r") as mib:
+			text = self._re_comment.sub("", mib.read())
+		match = self._re_module.search(text)
+		module = match.group(1) if match else None
+		for name, body, syntax, suffix in self._re_convention.findall(text):
+			self.conventions[name] = " ".join(syntax.split())
+		# assignments refer to their parents by name, in any order
+		pending = []
+		for name, kind, body, parent, number in self._re_assignment.findall(text):
+			syntax = None
+			if kind == "OBJECT-TYPE":
+				match = self._re_syntax.search(body)
+				if match:
+					syntax = " ".join(match.group(1).split())
+			pending.append((name, parent, int(number), syntax))
+		while pending:
+			unresolved = []
+			for name, parent, number, syntax in pending:
+				parent_oid = self.roots.get(parent) or self.objects.get(parent, (None,))[0]
+				if parent_oid is None:
+					unresolved.append((name, parent, number, syntax))
+					continue
+				self.objects[name] = (parent_oid + (number,), syntax)
+				if module:
+					self.modules.setdefault(module, set()).add(name)
+			if len(unresolved) == len(pending):
+				raise ValueError("%s: unknown parent of %s"%(filename,
+						", ".join(["%s (%s)"%(u[0], u[1]) for u in unresolved])))
+			pending = unresolved
+
+	def oid(self, name):
+		"""
+		numeric oid of "MODULE::name.instance", "name.instance" or a
+		numeric "1.3.6..." oid (instance suffixes are numeric)
+		"""
+		if "::" in name:
+			module, name = name.split("::", 1)
+		if name[:1].isdigit() or name[:1] == ".":
+			return tuple(int(i) for i in name.strip(".").split("."))
+		parts = name.split(".")
+		if parts[0] not in self.objects:
+			raise KeyError("unknown MIB object: %s"%parts[0])
+		return self.objects[parts[0]][0] + tuple(int(i) for i in parts[1:])
+
+	def syntax(self, name):
+		return self.objects[name][1]
+
+	def baseType(self, name):
+		"""
+		SMI base type (e.g. "Counter32") of an object, through its
+		textual conventions; None for tables, rows and groups
+		"""
+		syntax = self.objects[name][1]
+		seen = set()
+		while syntax in self.conventions and not syntax in seen:
+			seen.add(syntax)
+			syntax = self.conventions[syntax]
+		return self.base_types.get(syntax)
+
+	@staticmethod
+	def compiled(objects, modules):
+		"""
+		tree of precompiled tables (see tools/compile_mibs.py):
+		objects maps name -> (oid, base type), modules module -> names
+		"""
+		tree = MIBTree()
+		tree.objects = dict(objects)
+		tree.modules = dict((module, set(names)) for module, names in modules.items())
+		return tree
+
+# vim:ts=4:sw=4:noexpandtab
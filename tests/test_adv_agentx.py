@@ -0,0 +1,387 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+adv_agentx without net-snmp: the data store (GET, GETNEXT and GETBULK
+slices across scalars, tables and columns, publishing) and the GETBULK
+branch of the request handler on a mocked request chain, and refreshes
+going on when one of them fails
+"""
+
+import os, sys, time, ctypes, socket, bisect, shutil, tempfile, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import adv_agentx
+from adv_agentx import AgentXBase, AgentXData, AgentXViewTable, AgentXRefresher, OperationalError, SnmpIpAddress, SnmpCounter32
+from adv_agentx import PAX_RO, PAX_WO, PAX_RW, SNMP_MSG_GETBULK
+from adv_agentx import ASN_NULL, ASN_INTEGER, ASN_OCTET_STR, ASN_IPADDRESS, ASN_COUNTER32, ASN_UNSIGNED, ASN_PRIV_RETRY
+from adv_agentx import oid_t, netsnmp_variable_list, netsnmp_request_info, netsnmp_agent_request_info
+
+ENTRY = (1, 3, 6, 1, 2, 1, 15, 3, 1)
+PEERS = ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+def bgpData():
+	"""
+	bgpVersion, bgpLocalAs.0 and two columns of a three row bgpPeerTable
+	"""
+	axd = AgentXData()
+	axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 1), "10")
+	axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 2, 0), 65000)
+	axd.RegisterTable(ENTRY, [2, 7], [(peer, [6, SnmpIpAddress(peer)]) for peer in PEERS])
+	axd.Freeze()
+	return axd
+
+class SortedStore(object):
+	"""
+	store of an AgentXViewTable: rows of column values by index tuple
+	"""
+
+	def __init__(self, columns, rows):
+		self.columns = tuple(columns)
+		self.rows = sorted(rows)
+		self.indexes = [index for index, values in self.rows]
+
+	def __len__(self):
+		return len(self.rows)
+
+	def find(self, index):
+		row = bisect.bisect_left(self.indexes, index)
+		if row < len(self.indexes) and self.indexes[row] == index:
+			return row
+		return None
+
+	def successor(self, index):
+		return bisect.bisect_right(self.indexes, index)
+
+	def index(self, row):
+		return self.indexes[row]
+
+	def value(self, row, column):
+		return self.rows[row][1][self.columns.index(column)]
+
+class AgentXDataTest(unittest.TestCase):
+
+	def setUp(self):
+		self.axd = bgpData()
+
+	def oids(self, items):
+		return [oid for oid, value in items]
+
+	def testGet(self):
+		axd = self.axd
+		self.assertEqual(axd.Get((1, 3, 6, 1, 2, 1, 15, 1)), "10")
+		self.assertEqual(axd.Get((1, 3, 6, 1, 2, 1, 15, 2, 0)), 65000)
+		self.assertEqual(axd.Get(ENTRY + (7, 10, 0, 0, 2)), "10.0.0.2")
+		self.assertTrue(ENTRY + (2, 10, 0, 0, 3) in axd)
+		# column, entry, unknown row and column, unregistered scalar instance
+		for oid in (ENTRY + (2,), ENTRY, ENTRY + (2, 10, 0, 0, 4), ENTRY + (3, 10, 0, 0, 1),
+				(1, 3, 6, 1, 2, 1, 15, 2), (1, 3, 6, 1, 2, 1, 15, 2, 1)):
+			self.assertFalse(oid in axd)
+			self.assertRaises(KeyError, axd.Get, oid)
+		self.assertEqual(len(axd), 2 + 2 * len(PEERS))
+
+	def testGetNext(self):
+		axd = self.axd
+		for oid, noid in (
+				# into the subtree, to the first scalar
+				((1, 3, 6, 1, 2, 1, 15), (1, 3, 6, 1, 2, 1, 15, 1)),
+				((1, 3, 6, 1, 2, 1, 15, 1), (1, 3, 6, 1, 2, 1, 15, 2, 0)),
+				# unregistered object oid to its instance
+				((1, 3, 6, 1, 2, 1, 15, 2), (1, 3, 6, 1, 2, 1, 15, 2, 0)),
+				# scalar to table, table and entry oids to the first cell
+				((1, 3, 6, 1, 2, 1, 15, 2, 0), ENTRY + (2, 10, 0, 0, 1)),
+				((1, 3, 6, 1, 2, 1, 15, 3), ENTRY + (2, 10, 0, 0, 1)),
+				(ENTRY, ENTRY + (2, 10, 0, 0, 1)),
+				# unregistered column before the first one
+				(ENTRY + (1, 10, 0, 0, 9), ENTRY + (2, 10, 0, 0, 1)),
+				# next row, partial and in-between indexes
+				(ENTRY + (2, 10, 0, 0, 1), ENTRY + (2, 10, 0, 0, 2)),
+				(ENTRY + (2, 10, 0), ENTRY + (2, 10, 0, 0, 1)),
+				(ENTRY + (2, 10, 0, 0, 1, 5), ENTRY + (2, 10, 0, 0, 2)),
+				# last row of a column to the first of the next column,
+				# across an unregistered column
+				(ENTRY + (2, 10, 0, 0, 3), ENTRY + (7, 10, 0, 0, 1)),
+				(ENTRY + (4, 10, 0, 0, 1), ENTRY + (7, 10, 0, 0, 1)),
+				# last cell: end of the view
+				(ENTRY + (7, 10, 0, 0, 3), None),
+				((1, 3, 6, 1, 2, 1, 16), None)):
+			self.assertEqual(axd.GetNext(oid), noid, oid)
+
+	def testScalarAfterTable(self):
+		axd = AgentXData()
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 4, 0), SnmpIpAddress("10.0.0.254"))
+		axd.RegisterTable(ENTRY, [2], [("10.0.0.1", [6])])
+		axd.Freeze()
+		self.assertEqual(axd.GetNext(ENTRY + (2, 10, 0, 0, 1)), (1, 3, 6, 1, 2, 1, 15, 4, 0))
+		self.assertEqual(axd.GetNext(ENTRY + (9,)), (1, 3, 6, 1, 2, 1, 15, 4, 0))
+		self.assertEqual(axd.GetNext((1, 3, 6, 1, 2, 1, 15, 4, 0)), None)
+
+	def testBulk(self):
+		axd = self.axd
+		# a non-repeater and two repeating columns, as a GETBULK asks
+		self.assertEqual(axd.GetNextItems((1, 3, 6, 1, 2, 1, 15, 1), 1), [((1, 3, 6, 1, 2, 1, 15, 2, 0), 65000)])
+		self.assertEqual(self.oids(axd.GetNextItems(ENTRY + (2,), 2)),
+				[ENTRY + (2, 10, 0, 0, 1), ENTRY + (2, 10, 0, 0, 2)])
+		self.assertEqual(axd.GetNextItems(ENTRY + (7,), 2),
+				[(ENTRY + (7, 10, 0, 0, 1), "10.0.0.1"), (ENTRY + (7, 10, 0, 0, 2), "10.0.0.2")])
+		# a slice crosses columns and ends with the data
+		self.assertEqual(self.oids(axd.GetNextItems(ENTRY + (2, 10, 0, 0, 2), 10)),
+				[ENTRY + (2, 10, 0, 0, 3)] + [ENTRY + (7, 10, 0, 0, n) for n in (1, 2, 3)])
+		self.assertEqual(axd.GetNextSlice(ENTRY + (7, 10, 0, 0, 3), 5), [])
+		self.assertEqual(axd.GetNextItems((1, 3, 6, 1, 2, 1, 15), 0), [])
+		self.assertEqual(len(axd.GetNextItems((1, 3, 6, 1, 2, 1, 15), 100)), len(axd))
+
+	def testRegistrationOrder(self):
+		axd = AgentXData()
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 2, 0), 1)
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 1), "10")
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 10), 3)
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 2, 0), 2)
+		axd.Freeze()
+		# lexicographic, not by length; the last registration is kept
+		self.assertEqual(list(axd), [(1, 3, 6, 1, 2, 1, 15, 1), (1, 3, 6, 1, 2, 1, 15, 2, 0), (1, 3, 6, 1, 2, 1, 15, 10)])
+		self.assertEqual(axd.Get((1, 3, 6, 1, 2, 1, 15, 2, 0)), 2)
+
+	def testRecordTable(self):
+		axd = AgentXData()
+		records = [{"address": peer, 2: n, 7: SnmpIpAddress(peer)} for n, peer in enumerate(PEERS)]
+		table = axd.RegisterTable(ENTRY, [7, 2], reversed(records), index=lambda record: record["address"])
+		self.assertEqual(axd.Get(ENTRY + (2, 10, 0, 0, 3)), 2)
+		self.assertEqual(self.oids(axd.GetNextItems(ENTRY, 3)), [ENTRY + (2, 10, 0, 0, n) for n in (1, 2, 3)])
+		# rows are replaced, inserted and dropped by index
+		axd.UpdateTable(ENTRY, [{"address": "10.0.0.2", 2: 9, 7: SnmpIpAddress("10.0.0.2")},
+				{"address": "10.0.0.0", 2: 8, 7: SnmpIpAddress("10.0.0.0")}],
+				index=lambda record: record["address"], removed=["10.0.0.3"])
+		self.assertEqual([value for oid, value in axd.GetNextItems(ENTRY, 3)], [8, 0, 9])
+		self.assertTrue(table.rows[1] is records[0])
+		self.assertFalse(ENTRY + (2, 10, 0, 0, 3) in axd)
+		# only record tables are updated in place
+		self.assertEqual(self.axd.Copy().UpdateTable(ENTRY, [], index=lambda record: record["address"]), None)
+
+	def testViewTable(self):
+		store = SortedStore([1, 3], [((10, 0, 0, n), [n, "peer%d" % n]) for n in (3, 1, 2)])
+		axd = AgentXData()
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 2, 0), 1)
+		axd.RegisterVar(ENTRY, AgentXViewTable(ENTRY, store))
+		axd.RegisterVar((1, 3, 6, 1, 2, 1, 15, 7), 2)
+		axd.Freeze()
+		self.assertEqual(axd.Get(ENTRY + (3, 10, 0, 0, 2)), "peer2")
+		self.assertRaises(KeyError, axd.Get, ENTRY + (2, 10, 0, 0, 2))
+		self.assertRaises(KeyError, axd.Get, ENTRY + (1, 10, 0, 0, 4))
+		for oid, noid in (
+				((1, 3, 6, 1, 2, 1, 15, 2, 0), ENTRY + (1, 10, 0, 0, 1)),
+				(ENTRY + (1, 10, 0, 0, 1, 1), ENTRY + (1, 10, 0, 0, 2)),
+				(ENTRY + (1, 10, 0, 0, 3), ENTRY + (3, 10, 0, 0, 1)),
+				(ENTRY + (2,), ENTRY + (3, 10, 0, 0, 1)),
+				(ENTRY + (3, 10, 0, 0, 3), (1, 3, 6, 1, 2, 1, 15, 7))):
+			self.assertEqual(axd.GetNext(oid), noid, oid)
+		self.assertEqual(axd.GetNextItems(ENTRY + (3, 10, 0, 0, 2), 2),
+				[(ENTRY + (3, 10, 0, 0, 3), "peer3"), ((1, 3, 6, 1, 2, 1, 15, 7), 2)])
+		# the store is shared, not copied, and cannot be written
+		copy = axd.Copy()
+		self.assertRaises(OperationalError, copy.Update, ENTRY + (1, 10, 0, 0, 1), 5)
+
+	def testPublish(self):
+		ax = AgentXBase()
+		ax.Setup({}, {"RootOID": "BGP4-MIB::bgp"})
+		first = ax.NewData()
+		first.RegisterVar("bgpVersion", "10")
+		first.RegisterVar("bgpLocalAs.0", 65000)
+		ax.Publish(first)
+		self.assertTrue(ax.AXData is first)
+		self.assertEqual((first.generation, first.frozen), (1, True))
+		self.assertRaises(OperationalError, first.RegisterVar, "bgpIdentifier.0", SnmpIpAddress("10.0.0.254"))
+		self.assertRaises(OperationalError, first.Update, "bgpLocalAs.0", 65001)
+		# changes go to a copy, published with one swap
+		second = ax.AXData.Copy()
+		second.Update("bgpLocalAs.0", 65001)
+		self.assertEqual(first.Get("bgpLocalAs.0"), 65000)
+		ax.Publish(second)
+		self.assertTrue(ax.AXData is second)
+		self.assertEqual(second.generation, 2)
+		self.assertEqual(ax.AXData.Get((1, 3, 6, 1, 2, 1, 15, 2, 0)), 65001)
+		self.assertEqual(first.Get((1, 3, 6, 1, 2, 1, 15, 2, 0)), 65000)
+
+	def testCopyTables(self):
+		copy = self.axd.Copy()
+		copy.Update(ENTRY + (2, 10, 0, 0, 1), 1)
+		self.assertEqual(copy.Get(ENTRY + (2, 10, 0, 0, 1)), 1)
+		self.assertEqual(self.axd.Get(ENTRY + (2, 10, 0, 0, 1)), 6)
+
+class FakeLibrary(object):
+	"""
+	the net-snmp calls of the request handler, on the ctypes structures;
+	the values set are kept by varbind address
+	"""
+
+	def __init__(self):
+		self.values = {}
+
+	def snmp_set_var_objid(self, vb, name, length):
+		vb = vb.contents
+		for i in range(length):
+			vb.name_loc[i] = name[i]
+		vb.name = ctypes.cast(vb.name_loc, ctypes.POINTER(oid_t))
+		vb.name_length = length
+
+	def snmp_set_var_typed_value(self, vb, otype, value, size):
+		vb.contents.type = otype
+		if otype == ASN_OCTET_STR:
+			value = ctypes.string_at(value, size).decode("utf-8")
+		elif otype == ASN_IPADDRESS:
+			value = socket.inet_ntoa(ctypes.string_at(value, size))
+		elif otype == ASN_INTEGER:
+			value = ctypes.cast(value, ctypes.POINTER(ctypes.c_int))[0]
+		elif otype in (ASN_COUNTER32, ASN_UNSIGNED):
+			value = ctypes.cast(value, ctypes.POINTER(ctypes.c_uint))[0]
+		self.values[ctypes.addressof(vb.contents)] = value
+
+class FakeAgent(object):
+	"""
+	the agent object the handler serves from
+	"""
+
+	def __init__(self, axd):
+		self.AXData = axd
+		self.RequestHandlers = {PAX_RO: [], PAX_WO: [], PAX_RW: []}
+
+	def Publish(self, axd):
+		self.AXData = axd
+
+class GetBulkHandlerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.axl, self.AXObject = adv_agentx.axl, adv_agentx.AXObject
+		adv_agentx.axl = FakeLibrary()
+		adv_agentx.AXObject = FakeAgent(bgpData())
+
+	def tearDown(self):
+		adv_agentx.axl, adv_agentx.AXObject = self.axl, self.AXObject
+
+	def bulk(self, oid, repetitions):
+		"""
+		run the handler on one repeater varbind of a GETBULK as the agent
+		passes it: repetitions varbinds chained by next_variable, the
+		first one named oid; returns the request and the varbinds
+		"""
+		vbs = (netsnmp_variable_list * repetitions)()
+		for i in range(repetitions):
+			vbs[i].type = ASN_NULL
+			if i + 1 < repetitions:
+				vbs[i].next_variable = ctypes.pointer(vbs[i + 1])
+		adv_agentx.axl.snmp_set_var_objid(ctypes.pointer(vbs[0]), oid, len(oid))
+		request = netsnmp_request_info(requestvb=ctypes.pointer(vbs[0]), repeat=repetitions - 1)
+		reqinfo = netsnmp_agent_request_info(mode=SNMP_MSG_GETBULK)
+		result = adv_agentx._handler_wrapper(None, None, ctypes.pointer(reqinfo), ctypes.pointer(request))
+		self.assertEqual(result, adv_agentx.SNMP_ERR_NOERROR)
+		return request, vbs
+
+	def answers(self, vbs):
+		"""
+		(oid, type, value) of the varbinds
+		"""
+		return [(tuple(vb.name[:vb.name_length]), vb.type, adv_agentx.axl.values.get(ctypes.addressof(vb)))
+				for vb in vbs]
+
+	def testOneSlice(self):
+		# from the column oid bgpPeerState across into bgpPeerRemoteAddr
+		request, vbs = self.bulk(ENTRY + (2,), 4)
+		self.assertEqual(self.answers(vbs), [
+				(ENTRY + (2, 10, 0, 0, 1), ASN_INTEGER, 6),
+				(ENTRY + (2, 10, 0, 0, 2), ASN_INTEGER, 6),
+				(ENTRY + (2, 10, 0, 0, 3), ASN_INTEGER, 6),
+				(ENTRY + (7, 10, 0, 0, 1), ASN_IPADDRESS, "10.0.0.1")])
+		self.assertEqual(request.repeat, 0)
+		self.assertEqual(ctypes.addressof(request.requestvb.contents), ctypes.addressof(vbs[3]))
+
+	def testScalars(self):
+		request, vbs = self.bulk((1, 3, 6, 1, 2, 1, 15), 2)
+		self.assertEqual(self.answers(vbs), [
+				((1, 3, 6, 1, 2, 1, 15, 1), ASN_OCTET_STR, "10"),
+				((1, 3, 6, 1, 2, 1, 15, 2, 0), ASN_INTEGER, 65000)])
+
+	def testDataEnds(self):
+		# two objects left for five repetitions: the third varbind is
+		# left to the agent to retry on the following subtree
+		request, vbs = self.bulk(ENTRY + (7, 10, 0, 0, 1), 5)
+		answers = self.answers(vbs)
+		self.assertEqual(answers[:2], [
+				(ENTRY + (7, 10, 0, 0, 2), ASN_IPADDRESS, "10.0.0.2"),
+				(ENTRY + (7, 10, 0, 0, 3), ASN_IPADDRESS, "10.0.0.3")])
+		self.assertEqual(answers[2], (ENTRY + (7, 10, 0, 0, 3), ASN_PRIV_RETRY, None))
+		self.assertEqual([vb.type for vb in vbs[3:]], [ASN_NULL, ASN_NULL])
+		self.assertEqual(request.repeat, 2)
+		self.assertEqual(ctypes.addressof(request.requestvb.contents), ctypes.addressof(vbs[2]))
+
+	def testPastData(self):
+		oid = ENTRY + (7, 10, 0, 0, 3)
+		request, vbs = self.bulk(oid, 3)
+		self.assertEqual(self.answers(vbs)[0], (oid, ASN_NULL, None))
+		self.assertEqual(request.repeat, 2)
+		self.assertEqual(ctypes.addressof(request.requestvb.contents), ctypes.addressof(vbs[0]))
+
+	def testReadHandlers(self):
+		adv_agentx.AXObject.RequestHandlers[PAX_RO].append(
+				lambda req, ax, axd: SnmpCounter32(7) if req.oid == ENTRY + (2, 10, 0, 0, 2) else None)
+		request, vbs = self.bulk(ENTRY + (2,), 3)
+		self.assertEqual([answer[1:] for answer in self.answers(vbs)],
+				[(ASN_INTEGER, 6), (ASN_COUNTER32, 7), (ASN_INTEGER, 6)])
+
+class FailingAgent(object):
+	"""
+	refresher target whose first refresh raises
+	"""
+
+	Name = "failing"
+
+	def __init__(self):
+		self.refreshes = []
+
+	def Refresh(self, partial=False):
+		self.refreshes.append(partial)
+		if len(self.refreshes) == 1:
+			raise ValueError("first refresh")
+
+class RefreshFailureTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def testSaveFails(self):
+		# an oid with a negative sub-identifier cannot be saved
+		def onUpdate(ax, axd):
+			axd.RegisterVar("bgpVersion", (1, -1))
+			axd.RegisterVar("bgpLocalAs.0", 65000)
+		ax = AgentXBase()
+		ax.Setup({"OnUpdate": onUpdate}, {"RootOID": "BGP4-MIB::bgp",
+			"SnapshotFile": os.path.join(self.directory, "snapshot")})
+		ax.Refresh()
+		self.assertEqual(ax.AXData.generation, 1)
+		self.assertEqual(ax.AXData.Get("bgpLocalAs.0"), 65000)
+		self.assertTrue(ax.UpdateTime)
+		ax.Refresh()
+		self.assertEqual(ax.AXData.generation, 2)
+
+	def testRefresherGoesOn(self):
+		ax = FailingAgent()
+		refresher = AgentXRefresher(ax, 0.01)
+		refresher.start()
+		for i in range(100):
+			if len(ax.refreshes) >= 3:
+				break
+			time.sleep(0.01)
+		refresher.Stop()
+		refresher.join(1)
+		self.assertFalse(refresher.is_alive())
+		self.assertTrue(len(ax.refreshes) >= 3)
+
+if __name__ == '__main__':
+	unittest.main()
+
+# vim:ts=4:sw=4:noexpandtab
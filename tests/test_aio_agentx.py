@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+aio_agentx: the pdu encoding read back by PDUReader, including integers
+outside the range of their type, and a subagent session with
+tools/fakemaster.py (open, register, get, getnext, getbulk, set, notify)
+"""
+
+import os, sys, time, struct, shutil, tempfile, threading, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+from adv_agentx import SnmpIpAddress, SnmpCounter32, SnmpGauge32
+try:
+	import aio_agentx
+	from aio_agentx import EncodeOID, EncodeVarBind, EncodePDU, PDUReader, HEADER_LEN
+	from aio_agentx import AGENTX_FLAG_NETWORK_BYTE_ORDER, AGENTX_GET_PDU
+	from aio_agentx import AGENTX_INTEGER, AGENTX_OCTET_STRING, AGENTX_NULL, AGENTX_OBJECT_IDENTIFIER
+	from aio_agentx import AGENTX_IPADDRESS, AGENTX_COUNTER32, AGENTX_GAUGE32, AGENTX_TIMETICKS
+	from aio_agentx import AGENTX_COUNTER64, AGENTX_NOSUCHOBJECT, AGENTX_NOSUCHINSTANCE
+	from aio_agentx import AGENTX_GETBULK_PDU, AGENTX_TESTSET_PDU, AGENTX_COMMITSET_PDU
+	from fakemaster import FakeMaster
+except SyntaxError:
+	# python 2: no asyncio
+	aio_agentx = None
+
+BGP = (1, 3, 6, 1, 2, 1, 15)
+BGP_VERSION = BGP + (1,)
+BGP_LOCAL_AS = BGP + (2, 0)
+ENTRY = BGP + (3, 1)
+PEERS = ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+def read(data, flags=0x10):
+	"""
+	PDUReader over data, in network byte order by default
+	"""
+	return PDUReader(data, flags)
+
+@unittest.skipIf(aio_agentx is None, "aio_agentx requires python >= 3.5")
+class EncodingTest(unittest.TestCase):
+
+	def testOID(self):
+		# 1.3.6.1.2 is sent as prefix 2
+		data = EncodeOID(BGP_VERSION, 1)
+		self.assertEqual(len(data), 4 + 4 * 3)
+		self.assertEqual(struct.unpack("!BBBB", data[:4]), (3, 2, 1, 0))
+		self.assertEqual(read(data).OID(), (BGP_VERSION, 1))
+		for oid in [(), (1, 2, 3), (1, 3, 6, 1), (1, 3, 6, 1, 256, 1), (1, 3, 6, 1, 4, 1, 4294967295)]:
+			self.assertEqual(read(EncodeOID(oid)).OID(), (oid, 0))
+
+	def testVarBinds(self):
+		for value, vtype, result in [
+			(65000, AGENTX_INTEGER, 65000),
+			(-1, AGENTX_INTEGER, -1),
+			(SnmpCounter32(7), AGENTX_COUNTER32, 7),
+			(SnmpGauge32(8), AGENTX_GAUGE32, 8),
+			(SnmpIpAddress("10.0.0.1"), AGENTX_IPADDRESS, "10.0.0.1"),
+			("bgp", AGENTX_OCTET_STRING, b"bgp"),
+			(b"\0\1\2\3\4", AGENTX_OCTET_STRING, b"\0\1\2\3\4"),
+			(BGP_VERSION, AGENTX_OBJECT_IDENTIFIER, BGP_VERSION),
+			(None, AGENTX_NULL, None),
+		]:
+			reader = read(EncodeVarBind(BGP_VERSION, value))
+			self.assertEqual(reader.VarBind(), (BGP_VERSION, vtype, result))
+			self.assertFalse(reader.More())
+		reader = read(EncodeVarBind(BGP_VERSION, None, AGENTX_NOSUCHINSTANCE))
+		self.assertEqual(reader.VarBind(), (BGP_VERSION, AGENTX_NOSUCHINSTANCE, None))
+
+	def testIntegerRange(self):
+		# INTEGER and Gauge32 are clamped, counters and timeticks wrap
+		for value, vtype, result in [
+			(2**31 - 1, None, 2**31 - 1),
+			(2**31, None, 2**31 - 1),
+			(2**40, None, 2**31 - 1),
+			(-2**31, None, -2**31),
+			(-2**31 - 1, None, -2**31),
+			(SnmpGauge32(2**32 + 5), None, 2**32 - 1),
+			(SnmpGauge32(-1), None, 0),
+			(SnmpCounter32(2**32 + 5), None, 5),
+			(2**32 + 6, AGENTX_TIMETICKS, 6),
+			(2**64 + 7, AGENTX_COUNTER64, 7),
+		]:
+			oid, unused, decoded = read(EncodeVarBind(BGP_VERSION, value, vtype)).VarBind()
+			self.assertEqual(decoded, result)
+
+	def testPDU(self):
+		payload = EncodeOID(BGP_VERSION) + EncodeOID(())
+		pdu = EncodePDU(AGENTX_GET_PDU, 1, 2, 3, payload)
+		header = struct.unpack("!BBBBIIII", pdu[:HEADER_LEN])
+		self.assertEqual(header, (1, AGENTX_GET_PDU, AGENTX_FLAG_NETWORK_BYTE_ORDER, 0, 1, 2, 3, len(payload)))
+		reader = read(pdu[HEADER_LEN:], header[2])
+		self.assertEqual(reader.OID(), (BGP_VERSION, 0))
+		self.assertEqual(reader.OID(), ((), 0))
+		self.assertFalse(reader.More())
+
+	def testLittleEndian(self):
+		# masters may send in their own byte order
+		data = struct.pack("<BBBB3I", 3, 2, 0, 0, 1, 15, 1) + struct.pack("<HH", AGENTX_INTEGER, 0) \
+			+ struct.pack("<BBBB3I", 3, 2, 0, 0, 1, 15, 1) + struct.pack("<i", -2)
+		reader = read(data, 0)
+		self.assertEqual(reader.OID(), (BGP_VERSION, 0))
+		self.assertEqual(reader.VarBind(), (BGP_VERSION, AGENTX_INTEGER, -2))
+
+def onUpdate(ax, axd):
+	"""
+	bgpVersion, bgpLocalAs.0 and two columns of a three row bgpPeerTable
+	"""
+	axd.RegisterVar(BGP_VERSION, "10")
+	axd.RegisterVar(BGP_LOCAL_AS, 65000)
+	axd.RegisterTable(ENTRY, [2, 7], [(peer, [6, SnmpIpAddress(peer)]) for peer in PEERS])
+
+def peerOID(column, peer):
+	return ENTRY + (column,) + tuple(int(i) for i in peer.split("."))
+
+@unittest.skipIf(aio_agentx is None, "aio_agentx requires python >= 3.5")
+class SessionTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.master = FakeMaster(os.path.join(self.directory, "master"))
+		agents = []
+		globals = {"OnInit": lambda ax, axd: agents.append(ax), "OnUpdate": onUpdate}
+		self.thread = threading.Thread(target=aio_agentx.AgentX, args=(globals,),
+			kwargs={"Name": "test", "Socket": self.master.path, "RootOID": "BGP4-MIB::bgp",
+				"CacheInterval": 0, "TimerInterval": 60})
+		self.thread.start()
+		self.master.accept()
+		self.ax = agents[0]
+		for i in range(100):
+			if self.ax.Generation:
+				break
+			time.sleep(0.01)
+
+	def tearDown(self):
+		self.ax.Shutdown()
+		self.thread.join(5)
+		self.assertFalse(self.thread.is_alive())
+		self.master.close()
+		shutil.rmtree(self.directory)
+
+	def testRegister(self):
+		self.assertEqual(self.master.registered, [BGP])
+
+	def testWalk(self):
+		expected = [(BGP_VERSION, AGENTX_OCTET_STRING, b"10"), (BGP_LOCAL_AS, AGENTX_INTEGER, 65000)] \
+			+ [(peerOID(2, peer), AGENTX_INTEGER, 6) for peer in PEERS] \
+			+ [(peerOID(7, peer), AGENTX_IPADDRESS, peer) for peer in PEERS]
+		self.assertEqual(list(self.master.walk(BGP)), expected)
+		for bulk in (1, 3, 10):
+			self.assertEqual(list(self.master.walk(BGP, bulk)), expected)
+
+	def testBulk(self):
+		# one non-repeater, two repetitions of two columns, row by row
+		varbinds = self.master.request(AGENTX_GETBULK_PDU, struct.pack("!HH", 1, 2)
+			+ EncodeOID(BGP) + EncodeOID(()) + EncodeOID(ENTRY + (2,)) + EncodeOID(())
+			+ EncodeOID(ENTRY + (7,)) + EncodeOID(()))
+		self.assertEqual([(oid, value) for oid, vtype, value in varbinds], [
+			(BGP_VERSION, b"10"),
+			(peerOID(2, PEERS[0]), 6), (peerOID(7, PEERS[0]), PEERS[0]),
+			(peerOID(2, PEERS[1]), 6), (peerOID(7, PEERS[1]), PEERS[1]),
+		])
+
+	def testGet(self):
+		varbinds = self.master.get([BGP_LOCAL_AS, peerOID(7, "10.0.0.9"), (1, 3, 6, 1, 2, 1, 16, 1)])
+		self.assertEqual(varbinds, [
+			(BGP_LOCAL_AS, AGENTX_INTEGER, 65000),
+			(peerOID(7, "10.0.0.9"), AGENTX_NOSUCHINSTANCE, None),
+			((1, 3, 6, 1, 2, 1, 16, 1), AGENTX_NOSUCHOBJECT, None),
+		])
+
+	def testSet(self):
+		generation = self.ax.Generation
+		self.master.request(AGENTX_TESTSET_PDU, EncodeVarBind(BGP_LOCAL_AS, 65001))
+		self.master.request(AGENTX_COMMITSET_PDU, b"")
+		self.assertEqual(self.master.get([BGP_LOCAL_AS]), [(BGP_LOCAL_AS, AGENTX_INTEGER, 65001)])
+		self.assertEqual(self.ax.Generation, generation + 1)
+
+	def testTrap(self):
+		self.ax.Trap("bgpEstablishedNotification", (peerOID(7, PEERS[0]), SnmpIpAddress(PEERS[0])))
+		# notifications are collected while waiting for a response
+		self.master.get([BGP_LOCAL_AS])
+		self.assertEqual(len(self.master.notifications), 1)
+		uptime, trap, peer = self.master.notifications[0]
+		self.assertEqual(uptime[1], AGENTX_TIMETICKS)
+		self.assertEqual(trap[2], BGP + (0, 1))
+		self.assertEqual(peer, (peerOID(7, PEERS[0]), AGENTX_IPADDRESS, PEERS[0]))
+
+if __name__ == '__main__':
+	unittest.main()
+
+# vim:ts=4:sw=4:noexpandtab
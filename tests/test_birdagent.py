@@ -0,0 +1,187 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+BirdAgent against fakebird: partial refreshes polling the protocol summary,
+the bgpPeerTable rows they replace, and a configuration that fails to
+parse standing in with its last result and counted in the status file
+"""
+
+import os, sys, json, shutil, tempfile, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+from birdagent import BirdAgent, BirdCollector, SourceFailed
+from adv_agentx import AgentXBase, SnmpIpAddress
+import bird_bgp
+from fakebird import FakeBird
+from bench_parser import PROTOCOL
+
+HEADER = "name     proto    table    state  since       info"
+
+def reply(lines):
+	"""
+	raw control socket reply of lines
+	"""
+	return "".join(("1002-" if n == 0 else " ") + line + "\n" for n, line in enumerate(lines)) + "0000 \n"
+
+def protocol(i, state="Established"):
+	"""
+	`show protocols all` lines of the synthetic BGP protocol rs_i
+	"""
+	lines = PROTOCOL % {"name": "rs_%d" % i, "i": i, "a": 0, "b": i, "asn": 64512 + i}
+	return lines.replace("Established", state).rstrip("\n").split("\n")
+
+def replies(protocols):
+	"""
+	fakebird replies of protocols {i: state}: the summary, `show
+	protocols all` and `show protocols all rs_i`
+	"""
+	blocks = dict((i, protocol(i, state)) for i, state in protocols.items())
+	result = {
+		"show protocols": reply([HEADER] + [blocks[i][0] for i in sorted(blocks)]),
+		"show protocols all": reply([HEADER] + sum([blocks[i] for i in sorted(blocks)], [])),
+	}
+	for i in blocks:
+		result["show protocols all rs_%d" % i] = reply([HEADER] + blocks[i])
+	return result
+
+def peerTable(axd):
+	"""
+	the bgpPeerTable registered in axd
+	"""
+	return axd.Values[axd.OIDs.index(axd.Resolve("bgpPeerEntry"))]
+
+class RecordingBird(FakeBird):
+	"""
+	fakebird keeping the commands it received
+	"""
+
+	received = None
+
+	def reply(self, command):
+		self.received.append(command)
+		return FakeBird.reply(self, command)
+
+class SummaryPollTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.fake = RecordingBird(os.path.join(self.directory, "bird.ctl"),
+				replies({1: "Established", 2: "Established", 3: "Established"})).start()
+		self.fake.received = []
+		self.bird = BirdAgent("/dev/null", "/bin/false", birdsocket=self.fake.path, poll_summary=True)
+		self.state = self.bird.getBGPState()
+
+	def tearDown(self):
+		self.bird.birdsocket.close()
+		self.fake.stop()
+		shutil.rmtree(self.directory)
+
+	def testFullRefresh(self):
+		self.assertEqual(sorted(self.state["bgp-peers"]), ["rs_1", "rs_2", "rs_3"])
+		self.assertEqual(self.state["changed"], None)
+		self.assertEqual(self.fake.received, ["show protocols", "show protocols all"])
+
+	def testChanged(self):
+		# rs_2 went down, rs_3 is gone
+		self.fake.replies = replies({1: "Established", 2: "Active"})
+		self.fake.received = []
+		state = self.bird.getBGPState(partial=True)
+		self.assertEqual(self.fake.received, ["show protocols", "show protocols all rs_2"])
+		self.assertEqual(state["changed"], {"rs_2": SnmpIpAddress("10.0.2.2"), "rs_3": SnmpIpAddress("10.0.3.2")})
+		self.assertEqual(sorted(state["bgp-peers"]), ["rs_1", "rs_2"])
+		self.assertEqual(state["bgp-peers"]["rs_2"]["bgpPeerState"], BirdAgent.bgp_states["active"])
+		self.assertEqual(state["bgp-peers"]["rs_1"]["bgpPeerState"], BirdAgent.bgp_states["established"])
+
+	def testUnchanged(self):
+		self.fake.received = []
+		state = self.bird.getBGPState(partial=True)
+		self.assertEqual(self.fake.received, ["show protocols"])
+		self.assertEqual(state["changed"], {})
+		self.assertEqual(sorted(state["bgp-peers"]), ["rs_1", "rs_2", "rs_3"])
+
+	def testTableUpdatedInPlace(self):
+		ax = AgentXBase()
+		ax.Setup({"OnUpdate": lambda ax, axd: bird_bgp.OnUpdate(ax, axd, self.bird.getBGPState(partial=axd.partial))},
+				{"RootOID": "BGP4-MIB::bgp"})
+		ax.Refresh()
+		before = peerTable(ax.AXData)
+		self.fake.replies = replies({1: "Established", 2: "Active"})
+		ax.Refresh(partial=True)
+		self.assertTrue(ax.AXData.partial)
+		table = peerTable(ax.AXData)
+		self.assertEqual(table.indexes, [(10, 0, 1, 2), (10, 0, 2, 2)])
+		# rs_1 keeps its row, rs_2 has a new one
+		self.assertTrue(table.rows[0] is before.rows[0])
+		self.assertFalse(table.rows[1] is before.rows[1])
+		self.assertEqual(ax.AXData.Get("bgpPeerState.10.0.2.2"), BirdAgent.bgp_states["active"])
+		self.assertEqual(before.rows[1]["bgpPeerState"], BirdAgent.bgp_states["established"])
+
+CONFIG = """protocol bgp rs_1 from rs {
+	local 10.0.1.1 as 64512;
+	neighbor 10.0.1.2 as 64513;
+}
+"""
+
+class ConfigFailureTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.fake = FakeBird(os.path.join(self.directory, "bird.ctl"), replies({1: "Established"})).start()
+		self.config = os.path.join(self.directory, "bird.conf")
+		self.bird = BirdAgent(self.config, "/bin/false", birdsocket=self.fake.path)
+
+	def tearDown(self):
+		self.bird.birdsocket.close()
+		self.fake.stop()
+		shutil.rmtree(self.directory)
+
+	def testFailed(self):
+		self.assertRaises(SourceFailed, self.bird.callWithin, "config", self.bird.getBGPConfig)
+		try:
+			self.bird.callWithin("config", self.bird.getBGPConfig)
+		except SourceFailed as e:
+			self.assertTrue(isinstance(e.error, (IOError, OSError)))
+
+	def testLastResult(self):
+		with open(self.config, "w") as config:
+			config.write(CONFIG)
+		state = self.bird.getBGPState()
+		self.assertEqual(state["failed"], set())
+		self.assertEqual(state["bgpLocalAs"], 64512)
+		os.unlink(self.config)
+		state = self.bird.getBGPState()
+		self.assertEqual(state["failed"], set(["config"]))
+		self.assertEqual(self.bird.timeouts["config"], 1)
+		self.assertEqual(state["bgpLocalAs"], 64512)
+
+	def testNoResult(self):
+		state = self.bird.getBGPState()
+		self.assertEqual(state["failed"], set(["config"]))
+		self.assertEqual(self.bird.timeouts["config"], 1)
+		self.assertEqual(sorted(state["bgp-peers"]), ["rs_1"])
+
+	def testStatusFile(self):
+		status = os.path.join(self.directory, "status.json")
+		self.bird.getBGPState()
+		self.bird.getBGPState()
+		self.bird.writeStatus(status)
+		with open(status) as data:
+			written = json.load(data)
+		self.assertEqual(written["timeouts"]["config"], 2)
+		self.assertEqual(written["timeouts"]["bird"], 0)
+		self.assertEqual(written["deadlines"]["config"], BirdAgent.deadlines["config"])
+		BirdCollector([("bird", self.bird)]).writeStatus(status)
+		with open(status) as data:
+			written = json.load(data)
+		self.assertEqual(written["instances"]["bird"]["timeouts"]["config"], 2)
+		self.assertEqual(sorted(os.listdir(self.directory)), ["bird.ctl", "status.json"])
+
+if __name__ == '__main__':
+	unittest.main()
+
+# vim:ts=4:sw=4:noexpandtab
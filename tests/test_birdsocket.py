@@ -0,0 +1,60 @@
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+BirdSocket against fakebird: a reply that is not read to its end must
+not answer the next command
+"""
+
+import os, sys, shutil, tempfile, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+from birdsocket import BirdSocket
+from fakebird import FakeBird
+
+ROUTES = "".join("1007-10.%d.0.0/16 via 10.0.0.1 on eth0 [bgp1 2016-01-01] * (100) [AS65001i]\n"%n
+		for n in range(100)) + "0000 \n"
+STATUS = "1000-BIRD 1.6.3\n1011-Router ID is 10.0.0.1\n0013 Daemon is up and running\n"
+STATUS_LINES = ["BIRD 1.6.3", "Router ID is 10.0.0.1", "Daemon is up and running"]
+
+class AbandonedReplyTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.fake = FakeBird(os.path.join(self.directory, "bird.ctl"),
+				{"show route all": ROUTES, "show status": STATUS}).start()
+		self.bird = BirdSocket(self.fake.path)
+
+	def tearDown(self):
+		self.bird.close()
+		self.fake.stop()
+		shutil.rmtree(self.directory)
+
+	def testClosedStream(self):
+		lines = self.bird.iterCommand("show route all", 5)
+		self.assertTrue(next(lines).startswith("10.0.0.0/16"))
+		lines.close()
+		self.assertEqual(self.bird.command("show status", 5), STATUS_LINES)
+
+	def testFailingConsumer(self):
+		def consume():
+			for line in self.bird.iterCommand("show route all", 5):
+				raise ValueError(line)
+		self.assertRaises(ValueError, consume)
+		self.assertEqual(self.bird.command("show status", 5), STATUS_LINES)
+
+	def testCompleteStream(self):
+		self.assertEqual(len(self.bird.command("show route all", 5)), 100)
+		sock = self.bird.sock
+		self.assertEqual(self.bird.command("show status", 5), STATUS_LINES)
+		# read to its end, the connection is kept
+		self.assertTrue(self.bird.sock is sock)
+
+if __name__ == '__main__':
+	unittest.main()
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+bench_parser - micro-benchmark of the `show protocols all` parser
+	on synthetic output of a route server with many BGP protocols,
+	against the baseline it replaced: the whole output (as returned
+	by communicate()) split into lines, each matched against every
+	property regex
+
+usage: bench_parser.py [PROTOCOLS [ROUNDS]]
+"""
+
+import os, sys, re, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from birdagent import BirdAgent
+from adv_agentx import SnmpGauge32, SnmpCounter32, SnmpIpAddress
+
+PROTOCOL = """%(name)s     BGP      master   up     1475769306  Established
+  Description:    synthetic peer %(i)d
+  Preference:     100
+  Input filter:   ACCEPT
+  Output filter:  REJECT
+  Routes:         %(i)d imported, 0 exported, %(i)d preferred
+  Route change stats:     received   rejected   filtered    ignored   accepted
+    Import updates:          %(i)5d          0          0          0      %(i)5d
+    Import withdraws:            0          0        ---          0          0
+    Export updates:          %(i)5d      %(i)5d          0        ---          0
+    Export withdraws:            0        ---        ---        ---          0
+  BGP state:          Established
+    Neighbor address: 10.%(a)d.%(b)d.2
+    Neighbor AS:      %(asn)d
+    Neighbor ID:      10.%(a)d.%(b)d.2
+    Neighbor caps:    refresh restart-aware AS4
+    Session:          external route-server AS4
+    Source address:   10.%(a)d.%(b)d.1
+    Hold timer:       150/180
+    Keepalive timer:  29/60
+"""
+
+OTHER = """%(name)s  Device   master   up     1475769300
+  Preference:     240
+  Input filter:   ACCEPT
+  Output filter:  REJECT
+  Routes:         0 imported, 0 exported, 0 preferred
+"""
+
+def syntheticOutput(protocols):
+	"""
+	`show protocols all` output with the given number of BGP protocols
+	(and one non-BGP protocol per 100 BGP protocols)
+	"""
+	lines = ["name     proto    table    state  since       info"]
+	for i in range(protocols):
+		if i % 100 == 0:
+			lines.extend((OTHER%{"name": "device%d"%i}).split("\n"))
+		lines.extend((PROTOCOL%{"name": "rs_%d"%i, "i": i,
+				"a": i // 250, "b": i % 250, "asn": 64512 + i}).split("\n"))
+	return lines
+
+# the regexes and the loop of the parser before parseBGPProtocols
+_re_bgp_begin = re.compile("([a-zA-Z0-9_]+) *BGP * [a-zA-Z0-9_]+ * [a-zA-Z0-9]+ * ([a-zA-Z0-9:]+) *")
+_re_bgp_peer = {
+		"bgpPeerIdentifier": re.compile("Neighbor ID:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
+		"bgpPeerState": re.compile("BGP state:.* ([a-zA-Z]+)"),
+		"bgpPeerLocalAddr": re.compile("Source address:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
+		"bgpPeerRemoteAddr": re.compile("Neighbor address:.* ([0-9]+\.[0-9]+\.[0-9]+\.[0-9]+)"),
+		"bgpPeerRemoteAs": re.compile("Neighbor AS:.* ([0-9]+)"),
+		"bgpPeerInUpdates": re.compile("Import updates:\ +([0-9]+) .*[0-9\-]+.*[0-9\-]+.*[0-9\-]+.*[0-9\-]+"),
+		"bgpPeerOutUpdates": re.compile("Export updates:\ +([0-9]+) .*[0-9\-]+.*[0-9\-]+.*[0-9\-]+.*[0-9\-]+"),
+		"bgpPeerHoldTime": re.compile("Hold timer:.* ([0-9]+)/[0-9]+"),
+		"bgpPeerHoldTimeConfigured": re.compile("Hold timer:.* [0-9]+/([0-9]+)"),
+		"bgpPeerKeepAlive": re.compile("Keepalive timer:.* ([0-9]+)/[0-9]+"),
+		"bgpPeerKeepAliveConfigured": re.compile("Keepalive timer:.* [0-9]+/([0-9]+)"),
+		"bgpPeerLastError": re.compile("Last error:\ +[a-zA-Z0-9-_\ ]+$")
+		}
+_re_bgp_end = re.compile("^$")
+
+def regexParser(output, current_time):
+	"""
+	the baseline: BGP protocol properties by name from the whole
+	`show protocols all` output
+	"""
+	peers = {}
+	bgp_proto = None
+	for line in output.split("\n"):
+		match = _re_bgp_begin.search(line)
+		if match:
+			bgp_proto = match.group(1)
+			peers[bgp_proto] = {"bgpPeerFsmEstablishedTime": SnmpGauge32(current_time - int(match.group(2)))}
+		if bgp_proto:
+			for name, regex in _re_bgp_peer.items():
+				match = regex.search(line)
+				if match:
+					if name == "bgpPeerState":
+						peers[bgp_proto][name] = BirdAgent.bgp_states[match.group(1).lower()]
+					elif name in ("bgpPeerIdentifier", "bgpPeerLocalAddr", "bgpPeerRemoteAddr"):
+						peers[bgp_proto][name] = SnmpIpAddress(match.group(1))
+					elif name in ("bgpPeerInUpdates", "bgpPeerOutUpdates"):
+						peers[bgp_proto][name] = SnmpCounter32(match.group(1))
+					else:
+						peers[bgp_proto][name] = int(match.group(1))
+		if _re_bgp_end.search(line):
+			bgp_proto = None
+	return peers
+
+def bestOf(rounds, parse):
+	"""
+	best time of rounds runs of parse(current time), and its result
+	"""
+	best = None
+	for r in range(rounds):
+		start = time.time()
+		result = parse(int(start))
+		elapsed = time.time() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best, result
+
+if __name__ == '__main__':
+	protocols = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+	rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+	lines = syntheticOutput(protocols)
+	output = "\n".join(lines) + "\n"
+
+	print("%d protocols, %d lines, best of %d rounds:"%(protocols, len(lines), rounds))
+	for name, parse in (
+			("regex loop (baseline)", lambda now: len(regexParser(output, now))),
+			("streaming parser", lambda now: sum(1 for proto in BirdAgent.parseBGPProtocols(iter(lines), now)))):
+		best, parsed = bestOf(rounds, parse)
+		assert parsed == protocols
+		print("%-22s %8.1f ms (%.1f us/protocol, %.2f us/line)"%(name, best * 1e3,
+				best * 1e6 / protocols, best * 1e6 / len(lines)))
+
+# vim:ts=4:sw=4:noexpandtab
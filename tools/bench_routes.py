@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+bench_routes - parse time and memory use of bgp4PathAttrTable for a
+	synthetic full table dump (`show route all` of PREFIXES prefixes,
+	one path from each of PEERS peers, the first one best), and the
+	time of GET and GETNEXT lookups in it. as in a real table, the
+	prefixes share a limited number of as paths (one per ten prefixes),
+	each with its community set.
+	memory is reported per prefix, for:
+	- dict per prefix: a dict of the paths' attributes per path, in a
+	  list per prefix (measured on a sample of SAMPLE prefixes, not
+	  counting the attribute values themselves)
+	- interned: RouteTable, one attribute set id per path
+	with WORKERS processes (default: one per core) the dump is parsed
+	again by RouteTable.buildParallel; the CPU time left in the agent
+	process (reading, chunking, merging and sorting) bounds the
+	speedup more cores can give.
+
+usage: bench_routes.py [PREFIXES [PEERS [SAMPLE [WORKERS]]]]
+"""
+
+import os, sys, time, random, resource, tracemalloc, multiprocessing
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from birdroutes import RouteParser, RouteTable, PathAttrTable, ipInt, ipText, workerPool
+
+ENTRY = (1, 3, 6, 1, 2, 1, 15, 6, 1)
+
+def showRouteAll(prefixes, peers):
+	"""
+	yield the lines of `show route all` as bird 1.6 prints them
+	"""
+	random.seed(1)
+	communities = [" ".join("(65000,%d)" % random.randrange(100) for n in range(random.randrange(4)))
+		for i in range(50)]
+	aspaths = [(" ".join(str(64512 + random.randrange(1000)) for hop in range(random.randrange(1, 6))),
+		random.choice(communities)) for i in range(max(1, prefixes // 10))]
+	for i in range(prefixes):
+		prefix = "%s/24" % ipText((1 << 24) + (i << 8))
+		for n in range(peers):
+			peer = "10.0.%d.2" % n
+			aspath, community = random.choice(aspaths)
+			path = "%d %s" % (65001 + n, aspath)
+			yield "%-18s via %s on eth0 [rs_%d 2016-01-01 from %s]%s (100) [AS%si]" % (
+				prefix if not n else "", peer, n, peer, " *" if not n else "", path.split()[-1])
+			yield "\tType: BGP unicast univ"
+			yield "\tBGP.origin: IGP"
+			yield "\tBGP.as_path: %s" % path
+			yield "\tBGP.next_hop: %s" % peer
+			yield "\tBGP.local_pref: 100"
+			if n % 2:
+				yield "\tBGP.med: %d" % n
+			yield "\tBGP.community: %s" % community
+
+def dictPerPrefix(routes):
+	"""
+	the paths as dicts of their attributes, a list of them per prefix
+	"""
+	names = ("origin", "aspath", "nexthop", "med", "localpref", "atomic", "aggregator_as",
+		"aggregator_addr", "communities")
+	store = {}
+	for prefix, length, protocol, best, attributes in routes:
+		path = dict(zip(names, attributes))
+		path["peer"], path["best"] = protocol, best
+		store.setdefault("%s/%d" % (ipText(prefix), length), []).append(path)
+	return store
+
+def tableSize(routes):
+	"""
+	bytes of the arrays and attribute sets of a RouteTable
+	"""
+	objects = {}
+	for attributes in routes.attributes:
+		for value in (attributes, attributes[RouteTable.ASPATH], attributes[RouteTable.COMMUNITIES]):
+			objects[id(value)] = value
+	return sum(sys.getsizeof(value) for value in [routes.keys, routes.best, routes.attrs,
+		routes.attributes, routes.peers] + list(objects.values()))
+
+if __name__ == '__main__':
+	prefixes = int(sys.argv[1]) if len(sys.argv) > 1 else 900000
+	peers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+	sample = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+	workers = int(sys.argv[4]) if len(sys.argv) > 4 else multiprocessing.cpu_count()
+	protocols = dict(("rs_%d" % n, ipInt("10.0.%d.2" % n)) for n in range(peers))
+
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	start = time.time()
+	routes = RouteTable.build(RouteParser.parse(showRouteAll(prefixes, peers)), protocols)
+	elapsed = time.time() - start
+	peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+	print("%d prefixes, %d paths of %d peers, %d attribute sets" % (prefixes, len(routes), peers, len(routes.attributes)))
+	print("parsed in %.1f s (%d paths/s), peak while building: %.1f bytes/prefix" % (
+		elapsed, len(routes) / elapsed, float(peak) / prefixes))
+
+	if workers:
+		pool = workerPool(workers)
+		start, cpu = time.time(), time.process_time()
+		parallel = RouteTable.buildParallel(showRouteAll(prefixes, peers), protocols, pool, workers)
+		elapsed, cpu = time.time() - start, time.process_time() - cpu
+		del parallel
+		source = time.process_time()
+		for line in showRouteAll(prefixes, peers):
+			pass
+		source = time.process_time() - source
+		print("%d workers: parsed in %.1f s (%d paths/s), %.1f s CPU in the agent process" % (
+			workers, elapsed, len(routes) / elapsed, cpu))
+		print("(generating the synthetic dump takes %.1f s of that and of the parse times)" % source)
+
+	parsed = list(RouteParser.parse(showRouteAll(min(sample, prefixes), peers)))
+	tracemalloc.start()
+	store = dictPerPrefix(parsed)
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del store, parsed
+	print("%-16s %16s" % ("store", "bytes/prefix"))
+	print("%-16s %16.1f" % ("dict per prefix", float(size) / min(sample, prefixes)))
+	print("%-16s %16.1f" % ("interned", float(tableSize(routes)) / prefixes))
+
+	table = PathAttrTable(ENTRY, routes)
+	lookups = 100000
+	rows = [random.randrange(len(routes)) for i in range(lookups)]
+	oids = [ENTRY + (5,) + routes.index(row) for row in rows]
+	start = time.time()
+	for oid in oids:
+		table.Find(oid)
+	elapsed = time.time() - start
+	print("GET: %.1f us" % (elapsed * 1e6 / lookups))
+	start = time.time()
+	for oid in oids:
+		next(table.Items(oid))
+	elapsed = time.time() - start
+	print("GETNEXT: %.1f us" % (elapsed * 1e6 / lookups))
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+bench_shards - latency of fetching `show protocols all` of a route
+	server with PROTOCOLS BGP protocols from fakebird, in one query and
+	sharded by protocol name patterns over concurrent sessions (see
+	BirdAgent.getShardedProtocols). fakebird takes DELAY microseconds
+	per line to render a reply, in each session.
+
+usage: bench_shards.py [PROTOCOLS [DELAY [ROUNDS]]]
+"""
+
+import os, sys, time, fnmatch, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from birdagent import BirdAgent
+from fakebird import FakeBird
+from bench_parser import syntheticOutput
+
+def protocolBlocks(lines):
+	"""
+	the header line and the (name, lines) blocks of `show protocols all`
+	"""
+	blocks = []
+	for line in lines[1:]:
+		if line and not line.startswith(" "):
+			blocks.append((line.split()[0], []))
+		if blocks:
+			blocks[-1][1].append(line)
+	return lines[0], blocks
+
+def rawReply(lines):
+	return "".join(("1002-" if i == 0 else " ") + line + "\n" for i, line in enumerate(lines)) + "0000 \n"
+
+class ProtocolReplies:
+	"""
+	fakebird replies to `show protocols` and `show protocols all`, with
+	or without a name pattern, rendered in delay seconds per line
+	"""
+
+	def __init__(self, protocols, delay):
+		self.header, self.blocks = protocolBlocks(syntheticOutput(protocols))
+		self.delay = delay
+
+	def get(self, command, default=None):
+		return self.reply if command.startswith("show protocols") else default
+
+	def reply(self, command):
+		words = command.split(None, 3)
+		pattern = words[3].strip('"') if len(words) > 3 else "*"
+		matched = [block for name, block in self.blocks if fnmatch.fnmatchcase(name, pattern)]
+		if len(words) > 2 and words[2] == "all":
+			lines = [self.header] + [line for block in matched for line in block]
+		else:
+			lines = [self.header] + [block[0] for block in matched]
+		time.sleep(self.delay * len(lines))
+		return rawReply(lines)
+
+if __name__ == '__main__':
+	protocols = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+	delay = float(sys.argv[2]) / 1000000 if len(sys.argv) > 2 else 0.00001
+	rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+	path = os.path.join(tempfile.mkdtemp(), "bird.ctl")
+	fake = FakeBird(path, ProtocolReplies(protocols, delay)).start()
+	print("%d BGP protocols, %.0f us per line" % (protocols, delay * 1000000))
+	print("%-8s %-9s %10s %9s" % ("shards", "sessions", "latency s", "protocols"))
+	try:
+		for shards, sessions in ((1, 1), (2, 2), (4, 4), (8, 4), (8, 8), (16, 16)):
+			bird = BirdAgent("/dev/null", "/bin/false", birdsocket=path, shards=shards, shard_sessions=sessions)
+			times = []
+			for i in range(rounds):
+				start = time.time()
+				result = bird.getBGPProtocols(int(start))
+				times.append(time.time() - start)
+			print("%-8d %-9d %10.3f %9d" % (shards, sessions, min(times), len(result)))
+	finally:
+		fake.stop()
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+bench_store - memory use of the AgentX data store per thousand table
+	rows, for a synthetic bgpPeerTable (24 columns per row):
+	- dict per oid: the former layout, a dict entry keyed by the
+	  text oid ("BGP4-MIB::bgpPeerState.10.0.0.2") and a
+	  {'value': ..., 'noid': ...} dict per oid, each linking to the
+	  text oid registered after it
+	- RegisterVar: one sorted (oid, value) slot per cell
+	- RegisterTable: one index and one value tuple per row
+	- records: one index and a reference to the (existing) row
+	  record per row, values are read from the record on request
+
+usage: bench_store.py [ROWS]
+"""
+
+import os, sys, time, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adv_agentx import AgentXData, SnmpIpAddress, SnmpCounter32
+from birdagent import BirdAgent
+
+ENTRY = (1, 3, 6, 1, 2, 1, 15, 3, 1)
+COLUMNS = list(range(1, 25))
+
+def peers(count):
+	"""
+	(index text, column values) of count synthetic peers
+	"""
+	rows = []
+	for i in range(count):
+		address = "10.%d.%d.2"%(i // 256, i % 256)
+		values = [SnmpIpAddress(address), 6, 2, 4, SnmpIpAddress("10.0.0.1"), 179,
+			SnmpIpAddress(address), 50000, 64512 + i, SnmpCounter32(i), SnmpCounter32(i),
+			SnmpCounter32(i), SnmpCounter32(i), "0000", SnmpCounter32(1), i, 30, 180, 60,
+			180, 60, 30, 5, i]
+		rows.append((address, values))
+	return rows
+
+def dictPerOID(rows):
+	"""
+	the former AgentXData: RegisterVar of the column and of each cell
+	by text oid, in the order of bird_bgp.OnUpdate
+	"""
+	store, last = {}, None
+	for column in COLUMNS:
+		name = BirdAgent.bgp_keys[column - 1]
+		for oid, value in [(name, 0)] + [("%s.%s"%(name, address), values[column - 1])
+				for address, values in rows]:
+			oid = "BGP4-MIB::%s"%oid
+			if last is not None:
+				store[last]["noid"] = oid
+			last = oid
+			store[oid] = {"value": value, "noid": None}
+	return store
+
+def registerVar(rows):
+	axd = AgentXData()
+	for column in COLUMNS:
+		for address, values in rows:
+			axd.RegisterVar(ENTRY + (column,) + tuple(int(i) for i in address.split(".")), values[column - 1])
+	axd.Freeze()
+	return axd
+
+def registerTable(rows):
+	axd = AgentXData()
+	axd.RegisterTable(ENTRY, COLUMNS, rows)
+	axd.Freeze()
+	return axd
+
+def registerRecords(records):
+	axd = AgentXData()
+	axd.RegisterTable(ENTRY, COLUMNS, records, index=lambda record: record["address"])
+	axd.Freeze()
+	return axd
+
+def measure(build, rows):
+	"""
+	bytes allocated by the store build(rows) returns, build seconds
+	"""
+	tracemalloc.start()
+	start = time.time()
+	store = build(rows)
+	elapsed = time.time() - start
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	del store
+	return size, elapsed
+
+if __name__ == '__main__':
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	rows = peers(count)
+	print("%d rows x %d columns" % (count, len(COLUMNS)))
+	print("%-16s %15s %10s %9s" % ("store", "bytes/1000 rows", "bytes/cell", "build s"))
+	# records, as the collector returns them
+	records = [dict([("address", address)] + list(zip(COLUMNS, values))) for address, values in rows]
+	for name, build, data in (("dict per oid", dictPerOID, rows), ("RegisterVar", registerVar, rows),
+			("RegisterTable", registerTable, rows), ("records", registerRecords, records)):
+		size, elapsed = measure(build, data)
+		print("%-16s %15d %10.1f %9.3f" % (name, size * 1000 // count, float(size) / (count * len(COLUMNS)), elapsed))
+
+# vim:ts=4:sw=4:noexpandtab
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+compile_mibs - compile MIB files into a python module of numeric oids
+	and SMI base types, so the agents resolve names without reading
+	any MIB text (or loading net-snmp's MIB parser) at startup
+
+usage: compile_mibs.py OUTPUT MIBFILE...
+	e.g. compile_mibs.py mibobjects.py data/BGP4-MIB.txt data/OSPF-MIB.txt
+
+all objects of the given MIB modules are compiled (a few hundred for
+BGP4-MIB and OSPF-MIB), so newly served columns need no recompilation.
+"""
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mibtree import MIBTree
+
+HEADER = """#
+# numeric oids and SMI base types of the objects of
+#   %(modules)s
+# generated by tools/compile_mibs.py from %(files)s - do not edit
+#
+"""
+
+def compileMIBs(filenames):
+	"""
+	python source of the compiled tables of filenames
+	"""
+	tree = MIBTree(*filenames)
+	lines = [HEADER%{"modules": ", ".join(sorted(tree.modules)),
+			"files": ", ".join(os.path.basename(name) for name in filenames)}]
+	lines.append("# name: (oid, base type or None for tables, rows and groups)")
+	lines.append("objects = {")
+	for name, (oid, syntax) in sorted(tree.objects.items(), key=lambda item: item[1][0]):
+		lines.append("\t%r:\t(%r, %r),"%(name, oid, tree.baseType(name)))
+	lines.append("}")
+	lines.append("")
+	lines.append("# module: names")
+	lines.append("modules = {")
+	for module, names in sorted(tree.modules.items()):
+		lines.append("\t%r: ("%module)
+		for name in sorted(names, key=lambda name: tree.objects[name][0]):
+			lines.append("\t\t%r,"%name)
+		lines.append("\t),")
+	lines.append("}")
+	lines.append("")
+	lines.append("# vim:ts=4:sw=4:noexpandtab")
+	return "\n".join(lines) + "\n"
+
+if __name__ == '__main__':
+	if len(sys.argv) < 3:
+		print(__doc__)
+		sys.exit(1)
+	source = compileMIBs(sys.argv[2:])
+	with open(sys.argv[1], "w") as output:
+		output.write(source)
+
+# vim:ts=4:sw=4:noexpandtab
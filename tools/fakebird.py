@@ -0,0 +1,120 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+fakebird - stand-in for bird's control socket replaying recorded replies
+
+recording format: a line "<<< command" starts the raw reply (as sent on
+the socket, e.g. "1002-..." / " ..." / "0000 ") to that command:
+
+	<<< show protocols all
+	2002-name     proto    table    state  since       info
+	1002-bgp1     BGP      master   up     1475769306  Established
+	1006-  Preference:     100
+	 ...
+	0000
+
+usage: fakebird.py SOCKETPATH RECORDING
+"""
+
+import os, sys, socket, threading, time
+
+WELCOME = "0001 BIRD 1.6.3 ready.\n"
+UNKNOWN = "9001 syntax error\n"
+
+def loadRecording(filename):
+	"""
+	read a recording file into a dict: command -> raw reply
+	"""
+	replies = {}
+	command = None
+	with open(filename, "r") as recording:
+		for line in recording:
+			if line.startswith("<<< "):
+				command = line[4:].strip()
+				replies[command] = ""
+			elif command is not None:
+				replies[command] += line
+	return replies
+
+class FakeBird:
+	"""
+	unix socket server answering commands from a dict of raw replies;
+	replies may also be callables taking the command. a delay per
+	command emulates the time bird needs to render a reply.
+	"""
+
+	def __init__(self, path, replies, delay=0):
+		self.path = path
+		self.replies = replies
+		self.delay = delay
+		self.commands = 0
+		if os.path.exists(path):
+			os.unlink(path)
+		self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.sock.bind(path)
+		self.sock.listen(64)
+		self.running = True
+
+	def reply(self, command):
+		reply = self.replies.get(command, UNKNOWN)
+		if callable(reply):
+			reply = reply(command)
+		return reply
+
+	def serveClient(self, conn):
+		conn.sendall(WELCOME.encode("utf-8"))
+		buf = b""
+		try:
+			while self.running:
+				data = conn.recv(4096)
+				if not data:
+					break
+				buf += data
+				while b"\n" in buf:
+					line, buf = buf.split(b"\n", 1)
+					self.commands += 1
+					if self.delay:
+						time.sleep(self.delay)
+					conn.sendall(self.reply(line.decode("utf-8").strip()).encode("utf-8"))
+		except socket.error:
+			pass
+		conn.close()
+
+	def serve(self):
+		while self.running:
+			try:
+				conn, addr = self.sock.accept()
+			except socket.error:
+				break
+			client = threading.Thread(target=self.serveClient, args=(conn,))
+			client.daemon = True
+			client.start()
+
+	def start(self):
+		server = threading.Thread(target=self.serve)
+		server.daemon = True
+		server.start()
+		return self
+
+	def stop(self):
+		self.running = False
+		self.sock.close()
+		if os.path.exists(self.path):
+			os.unlink(self.path)
+
+if __name__ == '__main__':
+	if len(sys.argv) != 3:
+		print(__doc__)
+		sys.exit(1)
+	fake = FakeBird(sys.argv[1], loadRecording(sys.argv[2]))
+	try:
+		fake.serve()
+	except KeyboardInterrupt:
+		fake.stop()
+
+# vim:ts=4:sw=4:noexpandtab
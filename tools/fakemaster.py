@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2016 Travelping GmbH <copyright@travelping.com>
+#
+# This code is licensed under the GPLv3 (see COPYING.GPLv3).
+#
+
+"""
+fakemaster - minimal AgentX master agent for testing the asyncio subagent
+	accepts one subagent session, answers its open/register requests and
+	walks the registered subtrees with getnext or getbulk, printing
+	"oid type value" per object.
+
+usage: fakemaster.py SOCKETPATH [bulk]
+"""
+
+import os, sys, socket, struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from aio_agentx import PDUReader, EncodeOID, EncodePDU, HEADER_LEN
+from aio_agentx import AGENTX_FLAG_NETWORK_BYTE_ORDER, AGENTX_ENDOFMIBVIEW
+from aio_agentx import AGENTX_OPEN_PDU, AGENTX_REGISTER_PDU, AGENTX_GET_PDU, AGENTX_GETNEXT_PDU
+from aio_agentx import AGENTX_GETBULK_PDU, AGENTX_NOTIFY_PDU, AGENTX_RESPONSE_PDU
+
+class FakeMaster:
+	"""
+	blocking AgentX master side of one subagent connection
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		if os.path.exists(path):
+			os.unlink(path)
+		self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.sock.bind(path)
+		self.sock.listen(1)
+		self.conn = None
+		self.buf = b""
+		self.session = 1
+		self.packet = 0
+		self.registered = []
+		self.notifications = []
+
+	def _read(self, size):
+		while len(self.buf) < size:
+			data = self.conn.recv(65536)
+			if not data:
+				raise EOFError("subagent closed the connection")
+			self.buf += data
+		data, self.buf = self.buf[:size], self.buf[size:]
+		return data
+
+	def readPDU(self):
+		header = self._read(HEADER_LEN)
+		order = "!" if header[2] & AGENTX_FLAG_NETWORK_BYTE_ORDER else "<"
+		header = struct.unpack(order + "BBBBIIII", header)
+		return header, PDUReader(self._read(header[7]), header[2])
+
+	def respond(self, header, error=0):
+		self.conn.sendall(EncodePDU(AGENTX_RESPONSE_PDU, self.session, header[5], header[6],
+			struct.pack("!IHH", 0, error, 0)))
+
+	def accept(self):
+		"""
+		accept a subagent and serve it until it has registered
+		"""
+		self.conn, addr = self.sock.accept()
+		header, reader = self.readPDU()
+		assert header[1] == AGENTX_OPEN_PDU, "expected open pdu, got %d"%header[1]
+		self.respond(header)
+		# a subagent registers all its subtrees right after the open,
+		# registration is over when it falls silent
+		self.conn.settimeout(1)
+		try:
+			while True:
+				header, reader = self.readPDU()
+				assert header[1] == AGENTX_REGISTER_PDU, "expected register pdu, got %d"%header[1]
+				timeout, priority, range_subid, reserved = reader.Unpack("BBBB", 4)
+				self.registered.append(reader.OID()[0])
+				self.respond(header)
+		except socket.timeout:
+			pass
+		self.conn.settimeout(None)
+
+	def request(self, ptype, payload):
+		"""
+		send a request, return the varbinds (oid, type, value) of the response;
+		notifications arriving meanwhile are collected
+		"""
+		self.packet += 1
+		self.conn.sendall(EncodePDU(ptype, self.session, self.packet, self.packet, payload))
+		while True:
+			header, reader = self.readPDU()
+			if header[1] == AGENTX_NOTIFY_PDU:
+				self.notifications.append([reader.VarBind() for i in iter(reader.More, False)])
+				self.respond(header)
+				continue
+			uptime, error, index = reader.Unpack("IHH", 8)
+			if error:
+				raise Exception("agentx error %d at %d"%(error, index))
+			return [reader.VarBind() for i in iter(reader.More, False)]
+
+	def walk(self, root, bulk=0):
+		"""
+		yield (oid, type, value) below root, with getbulk if bulk > 0
+		"""
+		oid = root
+		while True:
+			if bulk:
+				varbinds = self.request(AGENTX_GETBULK_PDU,
+					struct.pack("!HH", 0, bulk) + EncodeOID(oid) + EncodeOID(()))
+			else:
+				varbinds = self.request(AGENTX_GETNEXT_PDU, EncodeOID(oid) + EncodeOID(()))
+			for oid, vtype, value in varbinds:
+				if vtype == AGENTX_ENDOFMIBVIEW or oid[:len(root)] != root:
+					return
+				yield oid, vtype, value
+
+	def get(self, oids):
+		return self.request(AGENTX_GET_PDU, b"".join([EncodeOID(oid) + EncodeOID(()) for oid in oids]))
+
+	def close(self):
+		if self.conn:
+			self.conn.close()
+		self.sock.close()
+		if os.path.exists(self.path):
+			os.unlink(self.path)
+
+if __name__ == '__main__':
+	if len(sys.argv) not in (2, 3):
+		print(__doc__)
+		sys.exit(1)
+	master = FakeMaster(sys.argv[1])
+	bulk = 10 if sys.argv[2:] == ["bulk"] else 0
+	try:
+		master.accept()
+		for root in master.registered:
+			for oid, vtype, value in master.walk(root, bulk):
+				print("%s %d %r"%(".".join(map(str, oid)), vtype, value))
+	finally:
+		master.close()
+
+# vim:ts=4:sw=4:noexpandtab